@@ -1,12 +1,18 @@
 #!/usr/bin/env/python3
 # File name   : robot.py
 # Description : Robot interfaces.
+import array
+import asyncio
 import atexit
 import base64
-import datetime
+import functools
+import importlib.util
 import json
 import logging
 import os
+import select
+import termios
+import threading
 import time
 
 import serial
@@ -28,10 +34,24 @@ logger = logging.getLogger("robot")
 
 # Initialize OpenAI client
 try:
-    from openai import OpenAI
+    import httpx
+    from openai import AsyncOpenAI, OpenAI
+
+    # Long-lived pooled HTTP clients so repeated uploads reuse the same TCP+TLS session;
+    # HTTP/2 is used when the optional h2 package is installed
+    _http2 = importlib.util.find_spec("h2") is not None
+    _http_limits = httpx.Limits(max_keepalive_connections=4, keepalive_expiry=60)
+    _http_timeout = httpx.Timeout(60.0, connect=5.0)
 
     # Initialize with API key from environment variables
-    client = OpenAI(api_key=os.environ.get("OPENAI_API_KEY"))
+    client = OpenAI(
+        api_key=os.environ.get("OPENAI_API_KEY"),
+        http_client=httpx.Client(http2=_http2, limits=_http_limits, timeout=_http_timeout),
+    )
+    async_client = AsyncOpenAI(
+        api_key=os.environ.get("OPENAI_API_KEY"),
+        http_client=httpx.AsyncClient(http2=_http2, limits=_http_limits, timeout=_http_timeout),
+    )
     openai_available = True
 except ImportError:
     logger.warning("OpenAI library not installed. Vision features will be disabled.")
@@ -40,6 +60,18 @@ except Exception as e:
     logger.error(f"Error initializing OpenAI client: {e}")
     openai_available = False
 
+# Prefer orjson for the serial JSON hot paths, falling back to the standard library
+try:
+    import orjson
+
+    _dumps = orjson.dumps
+    _loads = orjson.loads
+except ImportError:
+    def _dumps(obj):
+        return json.dumps(obj).encode()
+
+    _loads = json.loads
+
 # Add numpy and OpenCV imports at the top
 try:
     import numpy as np
@@ -48,18 +80,141 @@ except ImportError:
     logger.warning("NumPy or OpenCV is not installed. Camera functionality will be limited.")
 
 # Initialize serial connection
-ser = serial.Serial("/dev/ttyS0", 115200)
+# Reads block inside pyserial for at most GYRO_READ_TIMEOUT instead of spinning on in_waiting
+GYRO_READ_TIMEOUT = 0.05
+ser = serial.Serial("/dev/ttyS0", 115200, timeout=GYRO_READ_TIMEOUT)
+
+
+def enable_low_latency(port):
+    """
+    Ask the tty driver to push received bytes immediately instead of batching them
+
+    Parameters:
+    - port: Open serial.Serial instance
+
+    Returns:
+    - bool: True if low latency mode was enabled
+    """
+    try:
+        port.set_low_latency_mode(True)
+        return True
+    except AttributeError:
+        # Older pyserial without the helper, fall back to the raw TIOCSSERIAL ioctl
+        pass
+    except (IOError, OSError, NotImplementedError, ValueError) as e:
+        # pyserial reports a tty without TIOCSSERIAL support (e.g. USB CDC-ACM, pty) as ValueError
+        logger.warning(f"Could not enable serial low latency mode: {e}")
+        return False
+
+    try:
+        import fcntl
+        buf = array.array('i', [0] * 32)
+        fcntl.ioctl(port.fd, getattr(termios, 'TIOCGSERIAL', 0x541E), buf)
+        buf[4] |= 0x2000  # ASYNC_LOW_LATENCY
+        fcntl.ioctl(port.fd, getattr(termios, 'TIOCSSERIAL', 0x541F), buf)
+        return True
+    except (IOError, OSError) as e:
+        logger.warning(f"Could not enable serial low latency mode: {e}")
+        return False
+
+
+enable_low_latency(ser)
+
+# pyserial already opens the tty with O_NOCTTY|O_NONBLOCK; register it with epoll once so
+# waiting for reply bytes is a single syscall that honours the caller's deadline exactly
+_rx_poll = None
+if hasattr(select, "epoll"):
+    _rx_poll = select.epoll()
+    _rx_poll.register(ser.fileno(), select.EPOLLIN)
 dataCMD = json.dumps({'var': "", 'val': 0, 'ip': ""})
 upperGlobalIP = 'UPPER IP'
 
+
+
+# CPU core reserved for the camera grabber thread (the Pi 4 has cores 0-3)
+CAMERA_CPU = 2
+
+
+def _pin_current_thread(cpu):
+    """Pin the calling thread to a single CPU core when the platform supports it"""
+    if not hasattr(os, "sched_setaffinity"):
+        return
+    try:
+        if cpu in os.sched_getaffinity(0):
+            os.sched_setaffinity(0, {cpu})
+    except OSError as e:
+        logger.warning(f"Could not pin thread to CPU {cpu}: {e}")
+
+
+def _open_camera(index=0):
+    """Open the camera with a single-frame driver buffer and MJPG to keep frames fresh and cheap"""
+    cap = cv2.VideoCapture(index)
+    if cap.isOpened():
+        cap.set(cv2.CAP_PROP_BUFFERSIZE, 1)
+        cap.set(cv2.CAP_PROP_FOURCC, cv2.VideoWriter_fourcc(*'MJPG'))
+    return cap
+
+
+class _FrameGrabber(threading.Thread):
+    """
+    Background thread that keeps draining the camera so the newest frame is always at hand.
+
+    Frames are grabbed continuously so OpenCV's queue never fills with stale ones, but only
+    decoded (retrieved) when a caller asks for one, so discarded frames cost no decode time.
+    """
+
+    def __init__(self, cap):
+        super().__init__(daemon=True)
+        self.cap = cap
+        self.cond = threading.Condition()
+        self.latest_frame = None
+        self.generation = 0
+        self.requested = False
+        self.running = True
+
+    def run(self):
+        # Keep capture off the cores used by the serial reader and the interpreter's main thread
+        _pin_current_thread(CAMERA_CPU)
+        while self.running and self.cap.isOpened():
+            if not self.cap.grab():
+                time.sleep(0.01)
+                continue
+            if not self.requested:
+                continue
+            ret, frame = self.cap.retrieve()
+            if ret:
+                with self.cond:
+                    self.latest_frame = frame
+                    self.generation += 1
+                    self.requested = False
+                    self.cond.notify_all()
+
+    def latest(self, timeout=2.0):
+        """Return (ret, frame) for a frame grabbed after this call, waiting up to timeout"""
+        with self.cond:
+            target = self.generation + 1
+            self.requested = True
+            if not self.cond.wait_for(lambda: self.generation >= target, timeout):
+                return False, None
+            return True, self.latest_frame
+
+    def stop(self):
+        self.running = False
+        if self.is_alive():
+            self.join(1.0)
+
+
 # Initialize camera globally for faster access
 print("Initializing camera...")
 camera = None
+grabber = None
 try:
-    camera = cv2.VideoCapture(0)
+    camera = _open_camera(0)
     if not camera.isOpened():
         print("Warning: Could not open camera on startup")
     else:
+        grabber = _FrameGrabber(camera)
+        grabber.start()
         print("Camera initialized successfully")
 except Exception as e:
     print(f"Error initializing camera: {e}")
@@ -67,6 +222,8 @@ except Exception as e:
 
 # Function to clean up resources when the script exits
 def cleanup():
+    if grabber is not None:
+        grabber.stop()
     if camera is not None and camera.isOpened():
         camera.release()
         print("Camera released during cleanup")
@@ -78,126 +235,176 @@ atexit.register(cleanup)
 pitch, roll = 0, 0
 
 
+# Serialized command frames, encoded once at import instead of on every call
+_CMD = {
+    'forward': json.dumps({'var': "move", 'val': 1}).encode(),
+    'backward': json.dumps({'var': "move", 'val': 5}).encode(),
+    'left': json.dumps({'var': "move", 'val': 2}).encode(),
+    'right': json.dumps({'var': "move", 'val': 4}).encode(),
+    'stopLR': json.dumps({'var': "move", 'val': 6}).encode(),
+    'stopFB': json.dumps({'var': "move", 'val': 3}).encode(),
+    'lookUp': json.dumps({'var': "ges", 'val': 1}).encode(),
+    'lookDown': json.dumps({'var': "ges", 'val': 2}).encode(),
+    'lookStopUD': json.dumps({'var': "ges", 'val': 3}).encode(),
+    'lookLeft': json.dumps({'var': "ges", 'val': 4}).encode(),
+    'lookRight': json.dumps({'var': "ges", 'val': 5}).encode(),
+    'lookStopLR': json.dumps({'var': "ges", 'val': 6}).encode(),
+    'steadyMode': json.dumps({'var': "funcMode", 'val': 1}).encode(),
+    'jump': json.dumps({'var': "funcMode", 'val': 4}).encode(),
+    'handShake': json.dumps({'var': "funcMode", 'val': 3}).encode(),
+}
+
+# Light color name to firmware color number
+_COLOR_NUM = {'off': 0, 'blue': 1, 'red': 2, 'green': 3, 'yellow': 4, 'cyan': 5, 'magenta': 6, 'cyber': 7}
+_LIGHT_FRAMES = {name: json.dumps({'var': "light", 'val': num}).encode() for name, num in _COLOR_NUM.items()}
+
+
+def send_batch(*names):
+    """
+    Send several fixed commands in one serial write
+
+    Parameters:
+    - names: Command names from _CMD, e.g. send_batch('lookUp', 'forward')
+    """
+    ser.write(b''.join(_CMD[name] for name in names))
+
+
 def setUpperIP(ipInput):
     global upperGlobalIP
     upperGlobalIP = ipInput
 
 
 def forward(speed=100):
-    dataCMD = json.dumps({'var': "move", 'val': 1})
-    ser.write(dataCMD.encode())
+    ser.write(_CMD['forward'])
     print('robot-forward')
 
 
 def backward(speed=100):
-    dataCMD = json.dumps({'var': "move", 'val': 5})
-    ser.write(dataCMD.encode())
+    ser.write(_CMD['backward'])
     print('robot-backward')
 
 
 def left(speed=100):
-    dataCMD = json.dumps({'var': "move", 'val': 2})
-    ser.write(dataCMD.encode())
+    ser.write(_CMD['left'])
     print('robot-left')
 
 
 def right(speed=100):
-    dataCMD = json.dumps({'var': "move", 'val': 4})
-    ser.write(dataCMD.encode())
+    ser.write(_CMD['right'])
     print('robot-right')
 
 
 def stopLR():
-    dataCMD = json.dumps({'var': "move", 'val': 6})
-    ser.write(dataCMD.encode())
+    ser.write(_CMD['stopLR'])
     print('robot-stop')
 
 
 def stopFB():
-    dataCMD = json.dumps({'var': "move", 'val': 3})
-    ser.write(dataCMD.encode())
+    ser.write(_CMD['stopFB'])
     print('robot-stop')
 
 
 def lookUp():
-    dataCMD = json.dumps({'var': "ges", 'val': 1})
-    ser.write(dataCMD.encode())
+    ser.write(_CMD['lookUp'])
     print('robot-lookUp')
 
 
 def lookDown():
-    dataCMD = json.dumps({'var': "ges", 'val': 2})
-    ser.write(dataCMD.encode())
+    ser.write(_CMD['lookDown'])
     print('robot-lookDown')
 
 
 def lookStopUD():
-    dataCMD = json.dumps({'var': "ges", 'val': 3})
-    ser.write(dataCMD.encode())
+    ser.write(_CMD['lookStopUD'])
     print('robot-lookStopUD')
 
 
 def lookLeft():
-    dataCMD = json.dumps({'var': "ges", 'val': 4})
-    ser.write(dataCMD.encode())
+    ser.write(_CMD['lookLeft'])
     print('robot-lookLeft')
 
 
 def lookRight():
-    dataCMD = json.dumps({'var': "ges", 'val': 5})
-    ser.write(dataCMD.encode())
+    ser.write(_CMD['lookRight'])
     print('robot-lookRight')
 
 
 def lookStopLR():
-    dataCMD = json.dumps({'var': "ges", 'val': 6})
-    ser.write(dataCMD.encode())
+    ser.write(_CMD['lookStopLR'])
     print('robot-lookStopLR')
 
 
 def steadyMode():
-    dataCMD = json.dumps({'var': "funcMode", 'val': 1})
-    ser.write(dataCMD.encode())
+    ser.write(_CMD['steadyMode'])
     print('robot-steady')
 
 
 def jump():
-    dataCMD = json.dumps({'var': "funcMode", 'val': 4})
-    ser.write(dataCMD.encode())
+    ser.write(_CMD['jump'])
     print('robot-jump')
 
 
 def handShake():
-    dataCMD = json.dumps({'var': "funcMode", 'val': 3})
-    ser.write(dataCMD.encode())
+    ser.write(_CMD['handShake'])
     print('robot-handshake')
 
 
 def lightCtrl(colorName, cmdInput):
-    colorNum = 0
-    if colorName == 'off':
-        colorNum = 0
-    elif colorName == 'blue':
-        colorNum = 1
-    elif colorName == 'red':
-        colorNum = 2
-    elif colorName == 'green':
-        colorNum = 3
-    elif colorName == 'yellow':
-        colorNum = 4
-    elif colorName == 'cyan':
-        colorNum = 5
-    elif colorName == 'magenta':
-        colorNum = 6
-    elif colorName == 'cyber':
-        colorNum = 7
-    dataCMD = json.dumps({'var': "light", 'val': colorNum})
-    ser.write(dataCMD.encode())
+    ser.write(_LIGHT_FRAMES.get(colorName, _LIGHT_FRAMES['off']))
 
 
 def buzzerCtrl(buzzerCtrl, cmdInput):
-    dataCMD = json.dumps({'var': "buzzer", 'val': buzzerCtrl})
-    ser.write(dataCMD.encode())
+    ser.write(_dumps({'var': "buzzer", 'val': buzzerCtrl}))
+
+
+# Bytes received from the UART that do not yet form a complete line
+_rx_buf = bytearray()
+
+# Largest single read once epoll reports the UART readable; a GYRO_DATA line is about 120 bytes
+RX_CHUNK_SIZE = 256
+
+
+def _read_line(deadline):
+    """
+    Return the next complete line received on the UART, or None once the deadline passes
+
+    Partial lines stay in _rx_buf for the next call instead of being flushed, so a reply
+    that is already in flight is never lost.
+    """
+    while True:
+        end = _rx_buf.find(b'\n')
+        if end >= 0:
+            line = bytes(_rx_buf[:end + 1])
+            del _rx_buf[:end + 1]
+            return line
+        remaining = deadline - time.time()
+        if remaining <= 0:
+            return None
+        if _rx_poll is not None:
+            if not _rx_poll.poll(remaining):
+                return None
+            # Readable, so one non-blocking read takes whatever has arrived without asking
+            # the driver how much that is first; b'' here means the device hung up
+            try:
+                chunk = os.read(ser.fd, RX_CHUNK_SIZE)
+            except BlockingIOError:
+                continue
+            if not chunk:
+                return None
+        else:
+            # Without epoll this blocks up to ser.timeout for the first byte
+            chunk = ser.read(1)
+        _rx_buf.extend(chunk)
+
+
+def _flush_input():
+    """Drop all buffered input; only used after a hard error"""
+    ser.reset_input_buffer()
+    _rx_buf.clear()
+
+
+# Keys every GYRO_DATA reply must carry; a frozenset subset check runs in C
+_GYRO_FIELDS = frozenset(('gyro_x', 'gyro_y', 'gyro_z', 'angle_x', 'angle_y', 'angle_z'))
 
 
 def getGyroDataSingle():
@@ -205,46 +412,43 @@ def getGyroDataSingle():
     Single attempt to request gyroscope data from the robot
     Returns a dictionary with gyro data or None on error
     """
-    # Clear any existing data in the buffer
-    ser.reset_input_buffer()
-
     # Send request command for gyroscope data
-    ser.write("GET_GYRO\n".encode())
+    ser.write(b"GET_GYRO\n")
 
-    # Wait for response with timeout
-    start_time = time.time()
-    timeout = 0.05  # Short timeout for quicker retries
+    # Wait for a response line; lines without the GYRO_DATA prefix are skipped
+    deadline = time.time() + GYRO_READ_TIMEOUT
+
+    while True:
+        line = _read_line(deadline)
+        if line is None:
+            break
+
+        try:
+            response = line.decode('utf-8').strip()
+        except UnicodeDecodeError:
+            # Corrupt data on the line, resynchronise
+            _flush_input()
+            continue
+
+        # Check for the identifier prefix to ensure we're reading the right message
+        if response.startswith("GYRO_DATA:"):
+            # Extract the JSON part
+            json_data = response[len("GYRO_DATA:"):]
 
-    while (time.time() - start_time) < timeout:
-        if ser.in_waiting:
             try:
-                response = ser.readline().decode('utf-8').strip()
-
-                # Check for the identifier prefix to ensure we're reading the right message
-                if response.startswith("GYRO_DATA:"):
-                    # Extract the JSON part
-                    json_data = response[len("GYRO_DATA:"):]
-
-                    try:
-                        # Parse JSON response
-                        gyro_data = json.loads(json_data)
-
-                        # Validate that the response has the expected fields
-                        required_fields = ['gyro_x', 'gyro_y', 'gyro_z', 'angle_x', 'angle_y', 'angle_z']
-                        if all(key in gyro_data for key in required_fields):
-                            return gyro_data
-                        else:
-                            print("Error: Incomplete gyroscope data received")
-                            return None
-                    except json.JSONDecodeError:
-                        print(f"Error: Failed to parse gyroscope data JSON: {json_data}")
-                        return None
-            except UnicodeDecodeError:
-                # Bad data, continue looking
-                pass
-
-        # Small delay to prevent CPU overload
-        time.sleep(0.005)
+                # Parse JSON response
+                gyro_data = _loads(json_data)
+
+                # Validate that the response has the expected fields
+                if _GYRO_FIELDS.issubset(gyro_data):
+                    return gyro_data
+                else:
+                    print("Error: Incomplete gyroscope data received")
+                    return None
+            except json.JSONDecodeError:
+                print(f"Error: Failed to parse gyroscope data JSON: {json_data}")
+                _flush_input()
+                return None
 
     # If we get here, we timed out
     return None
@@ -263,10 +467,9 @@ def getGyroData():
         if gyro_data:
             return gyro_data
 
-        # If not the last attempt, print message and wait a tiny bit before retry
+        # The failed attempt already waited in the kernel for the reply, so retry straight away
         if attempt < max_attempts:
             print(f"Retry {attempt}/{max_attempts} for gyro data")
-            time.sleep(0.01)  # Small delay between retries
 
     print(f"Error: Failed to get gyro data after {max_attempts} attempts")
     return None
@@ -274,32 +477,37 @@ def getGyroData():
 
 def resetGyroAngles():
     """Reset the cumulative gyroscope angles on the robot"""
-    ser.reset_input_buffer()
-    ser.write("RESET_GYRO\n".encode())
+    _flush_input()
+    ser.write(b"RESET_GYRO\n")
 
     # Wait for acknowledgement
-    start_time = time.time()
-    timeout = 1.0
+    deadline = time.time() + 1.0
 
-    while (time.time() - start_time) < timeout:
-        if ser.in_waiting:
-            response = ser.readline().decode('utf-8').strip()
-            if response == "ACK:GYRO_RESET":
-                return True
-        time.sleep(0.01)
+    while True:
+        line = _read_line(deadline)
+        if line is None:
+            break
+        if line.decode('utf-8', errors='replace').strip() == "ACK:GYRO_RESET":
+            return True
 
     print("Error: No acknowledgement received for gyro reset")
     return False
 
 
+DOG_EYES_PROMPT_PATH = os.path.join(os.path.dirname(os.path.dirname(__file__)), "dog_eyes.md")
+
+
+@functools.lru_cache(maxsize=1)
 def read_dog_eyes_prompt():
     """
     Read the prompt content from dog_eyes.md file
 
+    The file is read once and cached for the rest of the run; call reload_prompt() after editing it.
+
     Returns:
     - str: The content of the file or a default prompt if file cannot be read
     """
-    prompt_path = os.path.join(os.path.dirname(os.path.dirname(__file__)), "dog_eyes.md")
+    prompt_path = DOG_EYES_PROMPT_PATH
 
     try:
         if not os.path.exists(prompt_path):
@@ -315,6 +523,58 @@ def read_dog_eyes_prompt():
         return "Please describe what you see in this image in detail, focusing on objects and their positions."
 
 
+def reload_prompt():
+    """Drop the cached dog_eyes.md prompt and read it again"""
+    read_dog_eyes_prompt.cache_clear()
+    return read_dog_eyes_prompt()
+
+
+JPEG_QUALITY = 85
+
+# Base64 of recently saved screenshots, keyed by path, so sending them does not read the file back
+_screenshot_b64 = {}
+_SCREENSHOT_B64_LIMIT = 8
+
+
+def frame_to_jpeg(frame):
+    """
+    JPEG encode a frame in memory
+
+    Parameters:
+    - frame: BGR image as returned by the camera
+
+    Returns:
+    - numpy.ndarray: JPEG data as a flat uint8 buffer, or None if encoding failed
+    """
+    ok, buf = cv2.imencode('.jpg', frame, [int(cv2.IMWRITE_JPEG_QUALITY), JPEG_QUALITY])
+    if not ok:
+        return None
+    # Callers write or base64 encode the array through the buffer protocol, no bytes copy needed
+    return buf
+
+
+def frame_to_b64(frame):
+    """
+    JPEG encode a frame in memory and base64 encode it, without touching the disk
+
+    Parameters:
+    - frame: BGR image as returned by the camera
+
+    Returns:
+    - str: Base64 encoded JPEG, or None if encoding failed
+    """
+    jpeg = frame_to_jpeg(frame)
+    if jpeg is None:
+        return None
+    return base64.b64encode(jpeg).decode("utf-8")
+
+
+def _cache_screenshot_b64(path, base64_image):
+    _screenshot_b64[path] = base64_image
+    while len(_screenshot_b64) > _SCREENSHOT_B64_LIMIT:
+        _screenshot_b64.pop(next(iter(_screenshot_b64)))
+
+
 def encode_image(image_path):
     """
     Encode an image as base64
@@ -325,22 +585,45 @@ def encode_image(image_path):
     Returns:
     - str: Base64 encoded image
     """
+    cached = _screenshot_b64.get(image_path)
+    if cached is not None:
+        return cached
+
     try:
-        with open(image_path, "rb") as image_file:
-            return base64.b64encode(image_file.read()).decode("utf-8")
+        # np.fromfile reads the file into a single buffer that b64encode consumes directly
+        return base64.b64encode(np.fromfile(image_path, dtype=np.uint8)).decode("utf-8")
     except Exception as e:
         logger.error(f"Error encoding image {image_path}: {e}")
         return None
 
 
-def sendImageToLLM(image_path, custom_prompt=None, model="gpt-4o"):
+def _build_vision_messages(prompt, base64_image):
+    """Build the chat messages for a single base64 JPEG image and its prompt"""
+    return [
+        {
+            "role": "user",
+            "content": [
+                {"type": "text", "text": prompt},
+                {
+                    "type": "image_url",
+                    "image_url": {
+                        "url": f"data:image/jpeg;base64,{base64_image}",
+                    },
+                },
+            ],
+        }
+    ]
+
+
+def sendImageToLLM(image_path, custom_prompt=None, model="gpt-4o", frame=None):
     """
     Send an image to OpenAI's GPT-4 Vision model for analysis
 
     Parameters:
-    - image_path: Path to the image file
+    - image_path: Path to the image file (ignored when frame is given)
     - custom_prompt: Optional custom prompt to use instead of dog_eyes.md
     - model: OpenAI model to use (defaults to GPT-4 Vision)
+    - frame: Optional camera frame to encode in memory instead of reading image_path
 
     Returns:
     - str: The model's response or error message
@@ -349,13 +632,13 @@ def sendImageToLLM(image_path, custom_prompt=None, model="gpt-4o"):
         return "Error: OpenAI library not available. Cannot process image."
 
     # Check if image exists
-    if not os.path.exists(image_path):
+    if frame is None and image_path not in _screenshot_b64 and not os.path.exists(image_path):
         logger.error(f"Image file not found: {image_path}")
         return f"Error: Image file not found: {image_path}"
 
     try:
         # Encode the image
-        base64_image = encode_image(image_path)
+        base64_image = frame_to_b64(frame) if frame is not None else encode_image(image_path)
         if not base64_image:
             return "Error: Could not encode image"
 
@@ -367,20 +650,7 @@ def sendImageToLLM(image_path, custom_prompt=None, model="gpt-4o"):
         # Send request to OpenAI
         completion = client.chat.completions.create(
             model=model,
-            messages=[
-                {
-                    "role": "user",
-                    "content": [
-                        {"type": "text", "text": prompt},
-                        {
-                            "type": "image_url",
-                            "image_url": {
-                                "url": f"data:image/jpeg;base64,{base64_image}",
-                            },
-                        },
-                    ],
-                }
-            ],
+            messages=_build_vision_messages(prompt, base64_image),
         )
 
         # Extract and return the response
@@ -393,6 +663,25 @@ def sendImageToLLM(image_path, custom_prompt=None, model="gpt-4o"):
         return f"Error processing image with OpenAI: {str(e)}"
 
 
+def _ensure_camera():
+    """Make sure the global camera is open and its frame grabber is running"""
+    global camera, grabber
+
+    if camera is None or not camera.isOpened():
+        print("Camera not available, attempting to initialize...")
+        camera = _open_camera(0)
+        if not camera.isOpened():
+            print("Error: Could not open camera")
+            return False
+
+    if grabber is None or not grabber.is_alive() or grabber.cap is not camera:
+        if grabber is not None:
+            grabber.stop()
+        grabber = _FrameGrabber(camera)
+        grabber.start()
+    return True
+
+
 def takeScreenshot(num_screenshots=1, delay=1, save_dir=None):
     """
     Capture screenshots using the pre-initialized camera
@@ -405,8 +694,6 @@ def takeScreenshot(num_screenshots=1, delay=1, save_dir=None):
     Returns:
     - List of saved screenshot paths
     """
-    global camera
-
     # Set up default save directory
     if save_dir is None:
         save_dir = 'screenshots'
@@ -415,32 +702,35 @@ def takeScreenshot(num_screenshots=1, delay=1, save_dir=None):
     os.makedirs(save_dir, exist_ok=True)
 
     # Check if camera is initialized and open
-    if camera is None or not camera.isOpened():
-        print("Camera not available, attempting to initialize...")
-        camera = cv2.VideoCapture(0)
-        if not camera.isOpened():
-            print("Error: Could not open camera")
-            return []
+    if not _ensure_camera():
+        return []
 
     saved_paths = []
+    # Formatted once per call; the frame index keeps filenames unique within the batch
+    timestamp = time.strftime("%Y%m%d_%H%M%S")
 
     try:
         for i in range(num_screenshots):
             # Capture frame
             print(f"Capturing image {i + 1}/{num_screenshots}...")
-            ret, frame = camera.read()
+            ret, frame = grabber.latest()
 
             if not ret:
                 print(f"Error: Could not capture frame {i + 1}")
                 continue
 
-            # Generate filename with timestamp
-            timestamp = datetime.datetime.now().strftime("%Y%m%d_%H%M%S")
+            # Generate filename from the capture batch timestamp and frame index
             filename = f"screenshot_{timestamp}_{i + 1}.jpg"
             filepath = os.path.join(save_dir, filename)
 
-            # Save image
-            cv2.imwrite(filepath, frame)
+            # Encode once in memory, write those bytes and keep the base64 for sendImageToLLM
+            jpeg = frame_to_jpeg(frame)
+            if jpeg is None:
+                print(f"Error: Could not encode frame {i + 1}")
+                continue
+            with open(filepath, "wb") as f:
+                f.write(jpeg)
+            _cache_screenshot_b64(filepath, base64.b64encode(jpeg).decode("utf-8"))
             print(f"Saved: {filepath}")
             saved_paths.append(filepath)
 
@@ -454,6 +744,116 @@ def takeScreenshot(num_screenshots=1, delay=1, save_dir=None):
     return saved_paths
 
 
+async def sendImageToLLMAsync(base64_image, custom_prompt=None, model="gpt-4o"):
+    """
+    Send a base64 encoded JPEG to OpenAI's vision model without blocking the event loop
+
+    Parameters:
+    - base64_image: Base64 encoded JPEG image
+    - custom_prompt: Optional custom prompt to use instead of dog_eyes.md
+    - model: OpenAI model to use (defaults to GPT-4 Vision)
+
+    Returns:
+    - str: The model's response or error message
+    """
+    if not openai_available:
+        return "Error: OpenAI library not available. Cannot process image."
+
+    try:
+        prompt = custom_prompt if custom_prompt else read_dog_eyes_prompt()
+        completion = await async_client.chat.completions.create(
+            model=model,
+            messages=_build_vision_messages(prompt, base64_image),
+        )
+        return completion.choices[0].message.content
+    except Exception as e:
+        logger.error(f"Error in sendImageToLLMAsync: {e}", exc_info=True)
+        return f"Error processing image with OpenAI: {str(e)}"
+
+
+def _put_drop_oldest(q, item):
+    """Put item on a bounded asyncio queue, discarding the oldest entry when full"""
+    if q.full():
+        q.get_nowait()
+        logger.debug("Vision pipeline queue full, dropped oldest entry")
+    q.put_nowait(item)
+
+
+async def _capture_stage(capture_q, num_frames, delay):
+    loop = asyncio.get_running_loop()
+    for i in range(num_frames):
+        ret, frame = await loop.run_in_executor(None, grabber.latest)
+        if ret:
+            _put_drop_oldest(capture_q, (i, frame))
+        else:
+            print(f"Error: Could not capture frame {i + 1}")
+        if i < num_frames - 1:
+            await asyncio.sleep(delay)
+    await capture_q.put(None)
+
+
+async def _encode_stage(capture_q, encode_q, num_workers):
+    loop = asyncio.get_running_loop()
+    while True:
+        item = await capture_q.get()
+        if item is None:
+            break
+        index, frame = item
+        base64_image = await loop.run_in_executor(None, frame_to_b64, frame)
+        if base64_image:
+            _put_drop_oldest(encode_q, (index, base64_image))
+    for _ in range(num_workers):
+        await encode_q.put(None)
+
+
+async def _infer_stage(encode_q, results, custom_prompt, model):
+    while True:
+        item = await encode_q.get()
+        if item is None:
+            break
+        index, base64_image = item
+        results.append((index, await sendImageToLLMAsync(base64_image, custom_prompt, model)))
+
+
+async def analyzeFramesAsync(num_frames=1, delay=1, custom_prompt=None, model="gpt-4o", num_workers=2):
+    """
+    Capture, encode and analyze frames as an overlapping pipeline
+
+    Capture, JPEG/base64 encoding and the OpenAI requests run as separate stages joined
+    by bounded queues, so several frames can be in flight while the camera keeps capturing.
+    When a stage falls behind, the oldest queued frame is dropped.
+
+    Parameters:
+    - num_frames: Number of frames to capture
+    - delay: Time in seconds between captures
+    - custom_prompt: Optional custom prompt to use instead of dog_eyes.md
+    - model: OpenAI model to use
+    - num_workers: Number of concurrent OpenAI requests
+
+    Returns:
+    - List of model responses in capture order
+    """
+    if not _ensure_camera():
+        return []
+
+    capture_q = asyncio.Queue(maxsize=2)
+    encode_q = asyncio.Queue(maxsize=2)
+    results = []
+
+    await asyncio.gather(
+        _capture_stage(capture_q, num_frames, delay),
+        _encode_stage(capture_q, encode_q, num_workers),
+        *(_infer_stage(encode_q, results, custom_prompt, model) for _ in range(num_workers)),
+    )
+
+    return [response for _, response in sorted(results, key=lambda r: r[0])]
+
+
+def analyzeFrames(num_frames=1, delay=1, custom_prompt=None, model="gpt-4o", num_workers=2):
+    """Synchronous wrapper around analyzeFramesAsync for callers without an event loop"""
+    return asyncio.run(analyzeFramesAsync(num_frames, delay, custom_prompt, model, num_workers))
+
+
 def test_camera(num_screenshots=1, delay=1, save_dir=None):
     """
     Legacy method that now uses the new takeScreenshot method.
@@ -4,11 +4,35 @@ Utility to monitor gyroscope data from the robot over time.
 This demonstrates more robust communication and shows the cumulative angles.
 """
 
+import asyncio
 import json
+import os
 import time
 import sys
 import robot  # Import the robot module
 
+# Seconds between screen refreshes; gyro reads run as fast as the serial link allows
+REFRESH_INTERVAL = 0.1
+
+# Cursor home + clear to end of screen, then the whole frame; \r\n because stdin/stdout are in raw mode
+_SCREEN_TEMPLATE = "\r\n".join([
+    "\033[H\033[JRunning for: {elapsed:.1f} seconds",
+    "Success rate: {ok}/{total} ({rate:.1f}%)",
+    "",
+    "Instantaneous Rates (degrees/sec):",
+    "X-axis: {gyro_x:+8.4f}°/s",
+    "Y-axis: {gyro_y:+8.4f}°/s",
+    "Z-axis: {gyro_z:+8.4f}°/s",
+    "",
+    "Cumulative Angles (degrees):",
+    "X-axis: {angle_x:+8.4f}°",
+    "Y-axis: {angle_y:+8.4f}°",
+    "Z-axis: {angle_z:+8.4f}°",
+    "",
+    "Press 'r' to reset angles, Ctrl+C to exit",
+    "",
+])
+
 class GyroMonitor:
     def __init__(self):
         self.running = True
@@ -29,56 +53,74 @@ class GyroMonitor:
         else:
             print("Failed to reset gyroscope angles")
     
+    def render(self, start_time):
+        """Draw the latest gyro values in place with a single write"""
+        gyro_data = self.last_gyro
+        total = self.success_count + self.fail_count
+        sys.stdout.write(_SCREEN_TEMPLATE.format_map(dict(
+            gyro_data,
+            elapsed=time.time() - start_time,
+            ok=self.success_count,
+            total=total,
+            rate=self.success_count / total * 100,
+        )))
+        sys.stdout.flush()
+
+    async def _gyro_task(self, loop):
+        """Read gyro data back to back in a worker thread"""
+        while self.running:
+            gyro_data = await loop.run_in_executor(None, robot.getGyroData)
+            if gyro_data:
+                self.last_gyro = gyro_data
+                self.success_count += 1
+            else:
+                self.fail_count += 1
+
+    async def _ui_task(self, start_time):
+        """Refresh the screen at a fixed rate independent of the gyro reads"""
+        while self.running:
+            if self.success_count:
+                self.render(start_time)
+            await asyncio.sleep(REFRESH_INTERVAL)
+
+    def _on_key(self, loop, stdin_fd):
+        """Handle every key pressed since stdin became readable"""
+        # os.read() on the fd, not sys.stdin: its buffer could hold keys that no longer make the
+        # fd readable, so e.g. a 'q' typed together with 'r' would go unnoticed
+        keys = os.read(stdin_fd, 64)
+        if not keys:
+            # stdin closed
+            self.running = False
+        for key in keys.decode(errors='ignore'):
+            if key == 'r':
+                print("Resetting angles...")
+                loop.run_in_executor(None, self.reset_gyro)
+            elif key in ('\x03', 'q'):
+                # Raw mode delivers Ctrl+C as a character instead of SIGINT
+                self.running = False
+
+    async def _run_async(self):
+        loop = asyncio.get_running_loop()
+        stdin_fd = sys.stdin.fileno()
+        loop.add_reader(stdin_fd, self._on_key, loop, stdin_fd)
+        try:
+            await asyncio.gather(self._gyro_task(loop), self._ui_task(time.time()))
+        finally:
+            loop.remove_reader(stdin_fd)
+
     def run(self):
         """Main monitoring loop"""
         print("Starting gyroscope monitoring. Press Ctrl+C to exit.")
         print("Resetting gyroscope angles...")
         self.reset_gyro()
-        
-        start_time = time.time()
-        
+
         try:
-            while self.running:
-                gyro_data = robot.getGyroData()
-                
-                if gyro_data:
-                    self.last_gyro = gyro_data
-                    self.success_count += 1
-                    
-                    # Clear screen and print current values
-                    print("\033c", end="")  # Clear the screen
-                    print(f"Running for: {time.time() - start_time:.1f} seconds")
-                    print(f"Success rate: {self.success_count}/{self.success_count + self.fail_count} " +
-                          f"({self.success_count/(self.success_count + self.fail_count)*100:.1f}%)")
-                    print("\nInstantaneous Rates (degrees/sec):")
-                    print(f"X-axis: {gyro_data['gyro_x']:+8.4f}°/s")
-                    print(f"Y-axis: {gyro_data['gyro_y']:+8.4f}°/s")
-                    print(f"Z-axis: {gyro_data['gyro_z']:+8.4f}°/s")
-                    
-                    print("\nCumulative Angles (degrees):")
-                    print(f"X-axis: {gyro_data['angle_x']:+8.4f}°")
-                    print(f"Y-axis: {gyro_data['angle_y']:+8.4f}°")
-                    print(f"Z-axis: {gyro_data['angle_z']:+8.4f}°")
-                    
-                    print("\nPress 'r' to reset angles, Ctrl+C to exit")
-                else:
-                    self.fail_count += 1
-                
-                # Check for keyboard input
-                if sys.stdin in select.select([sys.stdin], [], [], 0)[0]:
-                    key = sys.stdin.read(1)
-                    if key == 'r':
-                        print("Resetting angles...")
-                        self.reset_gyro()
-                
-                time.sleep(0.1)  # Short delay between updates
-                    
+            asyncio.run(self._run_async())
         except KeyboardInterrupt:
-            print("\nExiting gyroscope monitor.")
-            return
+            pass
+        print("\nExiting gyroscope monitor.")
 
 if __name__ == "__main__":
-    import select
     import termios
     import tty
     
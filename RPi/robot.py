@@ -1,32 +1,37 @@
 #!/usr/bin/env/python3
 # File name   : robot.py
 # Description : Robot interfaces and core movement controls.
+import collections
+import functools
+import importlib
+import importlib.util
 import json
 import logging
 import sys
 import time
 import os
 import queue
+import re
 import threading
+from concurrent.futures import ThreadPoolExecutor
+from types import SimpleNamespace
 
-from dotenv import load_dotenv
-from serial_manager import SerialManager, init_serial_manager
+from serial_manager import SerialManager, configure_logging, init_serial_manager
 
 # Add OpenAI import
+import httpx
 from openai import OpenAI
 
-# Load environment variables from .env file
-load_dotenv()
+# Prefer orjson for parsing tool arguments and tool_descriptions.json, falling back to the standard library
+try:
+    import orjson
+
+    _loads = orjson.loads
+except ImportError:
+    _loads = json.loads
 
 # Configure logging
-logging.basicConfig(
-    level=logging.INFO,
-    format='%(asctime)s - %(name)s - %(levelname)s - %(message)s',
-    handlers=[
-        logging.StreamHandler(),
-        logging.FileHandler("robot.log")
-    ]
-)
+configure_logging()
 logger = logging.getLogger("robot")
 
 # Initialize serial manager
@@ -53,6 +58,10 @@ MOVE_FORWARD_SPEED = 70  # Reduced speed for more controlled movement
 MOVE_BACKWARD_SPEED = 70
 TURN_SPEED = 60  # Reduced speed for more precise rotation
 
+# Tools that move the robot; a batch containing any of these is executed sequentially
+SERIAL_TOOLS = {"move_distance", "rotate_to_angle", "change_posture"}
+MAX_TOOL_WORKERS = 4
+
 # Constants for time-based movement (cm/sec)
 FORWARD_SPEED_CM_PER_SEC = 15
 BACKWARD_SPEED_CM_PER_SEC = 20
@@ -66,6 +75,301 @@ except ImportError as e:
     audio_available = False
     logger.error(f"Failed to import audio processing module: {e}")
 
+# Resolved once at import so request handling never has to touch os.path
+_HERE = os.path.dirname(os.path.abspath(__file__))
+TOOL_DESCRIPTIONS_PATH = os.path.join(_HERE, 'tool_descriptions.json')
+DOG_ACTIONS_PROMPT_PATH = os.path.join(os.path.dirname(_HERE), 'dog_actions.md')
+
+@functools.lru_cache(maxsize=1)
+def _get_tools():
+    """Load and cache the tool list from tool_descriptions.json (errors are not cached)"""
+    with open(TOOL_DESCRIPTIONS_PATH, 'rb') as f:
+        return _loads(f.read()).get('tools', [])
+
+@functools.lru_cache(maxsize=1)
+def _get_prompt():
+    """Load and cache the dog_actions.md system prompt (errors are not cached)"""
+    with open(DOG_ACTIONS_PROMPT_PATH, 'r') as f:
+        return f.read()
+
+_openai_client = None
+
+def get_openai_client():
+    """
+    Return the shared OpenAI client, creating it on first use
+    
+    The client keeps a pooled keep-alive httpx session (HTTP/2 when the h2 package is
+    installed), so the up to 5 completions of a tool loop reuse one TLS connection.
+    """
+    global _openai_client
+    if _openai_client is None:
+        # .env is only read when a client is actually needed, not on every import of this module
+        from dotenv import load_dotenv
+        load_dotenv()
+        
+        http_client = httpx.Client(
+            http2=importlib.util.find_spec("h2") is not None,
+            limits=httpx.Limits(max_keepalive_connections=4, keepalive_expiry=60),
+            timeout=httpx.Timeout(60.0, connect=5.0),
+        )
+        _openai_client = OpenAI(api_key=os.environ.get("OPENAI_API_KEY"), http_client=http_client)
+    return _openai_client
+
+def warm_openai_connection(client):
+    """
+    Open (or refresh) the client's pooled HTTPS connection with a cheap request
+    
+    Called while the user is still speaking, so the TCP/TLS handshake is already done when the
+    chat completion is sent.
+    """
+    try:
+        client.with_options(timeout=5.0, max_retries=0).models.list()
+    except Exception as e:
+        logger.debug("OpenAI connection warmup failed: %s", e)
+
+# Approximate prompt token budget for the voice conversation history, excluding the system prompt
+HISTORY_TOKEN_BUDGET = 3000
+# Once over budget, trim down to this fraction of it so the cached prompt prefix stays put for several turns
+HISTORY_TRIM_TARGET = 0.6
+# Cheap model that folds trimmed exchanges into a running summary; None drops them outright
+HISTORY_SUMMARY_MODEL = "gpt-4o-mini"
+HISTORY_SUMMARY_MAX_TOKENS = 200
+
+try:
+    import tiktoken
+    _token_encoding = tiktoken.encoding_for_model("gpt-4o")
+
+    def _count_tokens(text):
+        return len(_token_encoding.encode(text))
+except (ImportError, KeyError):
+    # Rough estimate of ~4 characters per token when tiktoken is unavailable
+    def _count_tokens(text):
+        return len(text) // 4 + 1
+
+def _message_tokens(message):
+    """Estimate the prompt tokens one chat message costs"""
+    tokens = 4  # per-message framing overhead
+    if message.get("content"):
+        tokens += _count_tokens(message["content"])
+    for tool_call in message.get("tool_calls") or ():
+        function = tool_call["function"]
+        tokens += _count_tokens(function["name"]) + _count_tokens(function["arguments"])
+    return tokens
+
+def summarize_history(client, previous_summary, messages):
+    """
+    Fold trimmed history messages into a short running summary
+    
+    Parameters:
+    - previous_summary: The summary so far, or None
+    - messages: The trimmed messages, oldest first
+    
+    Returns:
+    - str: The updated summary
+    """
+    lines = [f"Summary so far: {previous_summary}"] if previous_summary else []
+    lines += [f"{message['role']}: {message['content']}" for message in messages if message.get("content")]
+    response = client.chat.completions.create(
+        model=HISTORY_SUMMARY_MODEL,
+        messages=[
+            {"role": "system", "content": "Summarize this conversation between a user and a robot dog in a few "
+                                          "sentences. Keep names, preferences and anything the user asked the "
+                                          "robot to remember; drop small talk."},
+            {"role": "user", "content": "\n".join(lines)},
+        ],
+        max_tokens=HISTORY_SUMMARY_MAX_TOKENS,
+    )
+    return response.choices[0].message.content
+
+class ChatHistory:
+    """
+    Voice conversation history: a pinned system prompt followed by a deque of messages
+    
+    Each message's token estimate is computed once when it is appended and kept in a parallel
+    deque with a running total, so trimming is a popleft() from the head instead of a list pop
+    that shifts everything after the system prompt. With a summarizer, trimmed messages are
+    folded into a summary (on a background thread, off the reply path) that is sent right after
+    the system prompt, so older context survives at a bounded token cost.
+    """
+    
+    def __init__(self, system_prompt, budget=HISTORY_TOKEN_BUDGET, summarizer=None):
+        self.system = {"role": "system", "content": system_prompt}
+        self.budget = budget
+        self.entries = collections.deque()
+        self.tokens = collections.deque()
+        self.total = 0
+        self.summarizer = summarizer  # callable(previous_summary, messages) -> summary
+        self.summary = None
+        self.summary_lock = threading.Lock()  # one fold at a time, each building on the last
+    
+    def append(self, message):
+        count = _message_tokens(message)
+        self.entries.append(message)
+        self.tokens.append(count)
+        self.total += count
+    
+    def messages(self):
+        """Build the request message list: the system prompt, the summary if any, then the history"""
+        summary = self.summary
+        if summary:
+            return [self.system, {"role": "system", "content": f"Earlier in this conversation: {summary}"},
+                    *self.entries]
+        return [self.system, *self.entries]
+    
+    def _popleft(self):
+        self.total -= self.tokens.popleft()
+        return self.entries.popleft()
+    
+    def _fold(self, trimmed):
+        with self.summary_lock:
+            try:
+                self.summary = self.summarizer(self.summary, trimmed)
+            except Exception as e:
+                logger.warning(f"Could not summarize trimmed history: {e}")
+    
+    def trim(self):
+        """
+        Drop the oldest exchanges once the history exceeds the token budget
+        
+        Trimming always continues up to the next user message so no tool result is left without
+        its tool call. The history is cut well below the budget (HISTORY_TRIM_TARGET) rather than
+        by one exchange per turn, so the message prefix sent to the API only changes every few
+        turns and OpenAI's prompt cache keeps hitting in between.
+        """
+        if self.total <= self.budget:
+            return
+        target = self.budget * HISTORY_TRIM_TARGET
+        trimmed = []
+        while self.entries and self.total > target:
+            trimmed.append(self._popleft())
+            while self.entries and self.entries[0]["role"] != "user":
+                trimmed.append(self._popleft())
+        if trimmed and self.summarizer:
+            threading.Thread(target=self._fold, args=(trimmed,), daemon=True).start()
+
+# Whitespace that follows sentence-ending punctuation
+_SENTENCE_BREAK = re.compile(r'(?<=[.!?])\s+')
+
+def stream_completion(client, on_sentence, **kwargs):
+    """
+    Run a streaming chat completion and pass each finished sentence to on_sentence
+    
+    Speech can start on the first sentence while the rest of the reply is still being generated.
+    Tool call deltas are accumulated by index and rebuilt once the stream ends.
+    
+    Returns:
+    - SimpleNamespace with content and tool_calls, attribute-compatible with the SDK's message
+    """
+    content_parts = []
+    pending = ""
+    partial_calls = {}
+    
+    for chunk in client.chat.completions.create(stream=True, stream_options={"include_usage": True}, **kwargs):
+        if chunk.usage:
+            # The final chunk carries usage; cached_tokens shows how much of the prompt prefix hit the cache
+            details = getattr(chunk.usage, "prompt_tokens_details", None)
+            cached = getattr(details, "cached_tokens", 0) or 0
+            logger.info("Prompt tokens: %d (%d cached)", chunk.usage.prompt_tokens, cached)
+        if not chunk.choices:
+            continue
+        delta = chunk.choices[0].delta
+        
+        if delta.content:
+            content_parts.append(delta.content)
+            *sentences, pending = _SENTENCE_BREAK.split(pending + delta.content)
+            for sentence in sentences:
+                on_sentence(sentence)
+        
+        for call_delta in delta.tool_calls or ():
+            call = partial_calls.setdefault(call_delta.index, {"id": None, "name": "", "arguments": ""})
+            if call_delta.id:
+                call["id"] = call_delta.id
+            if call_delta.function:
+                call["name"] += call_delta.function.name or ""
+                call["arguments"] += call_delta.function.arguments or ""
+    
+    if pending.strip():
+        on_sentence(pending)
+    
+    tool_calls = [
+        SimpleNamespace(id=call["id"], type="function",
+                        function=SimpleNamespace(name=call["name"], arguments=call["arguments"]))
+        for _, call in sorted(partial_calls.items())
+    ]
+    return SimpleNamespace(content="".join(content_parts) or None, tool_calls=tool_calls or None)
+
+def assistant_message(message):
+    """Build the history entry for an assistant reply, including tool calls only when present"""
+    entry = {"role": "assistant", "content": message.content}
+    if message.tool_calls:
+        entry["tool_calls"] = [
+            {
+                "id": tool_call.id,
+                "type": "function",
+                "function": {"name": tool_call.function.name, "arguments": tool_call.function.arguments},
+            }
+            for tool_call in message.tool_calls
+        ]
+    return entry
+
+# Follow-up commands spoken within FOLLOWUP_WINDOW seconds of each other are sent as one request
+MAX_BATCHED_COMMANDS = 3
+FOLLOWUP_WINDOW = 1.5
+
+def batch_commands(commands):
+    """Combine several spoken commands into one numbered user message"""
+    steps = " ".join(f"{i}) {command}" for i, command in enumerate(commands, 1))
+    return f"Plan tool calls for all of these commands, in order: {steps}"
+
+# Spoken numbers Vosk emits for the distances and angles people usually ask for
+_SPOKEN_NUMBERS = {
+    "ten": 10, "twenty": 20, "thirty": 30, "forty": 40, "forty five": 45, "fifty": 50,
+    "sixty": 60, "seventy": 70, "eighty": 80, "ninety": 90, "one hundred": 100,
+    "a hundred": 100, "one hundred eighty": 180, "a hundred eighty": 180,
+}
+_NUMBER = r'(\d+|' + '|'.join(sorted(_SPOKEN_NUMBERS, key=len, reverse=True)) + r')'
+
+# Fixed postures that never need the LLM to interpret
+_FAST_PATH_POSTURES = {
+    "shake hands": "shake_hands",
+    "shake hand": "shake_hands",
+    "stay low": "stay_low",
+    "get low": "stay_low",
+}
+_FAST_PATH_MOVE = re.compile(r'^(?:move |go )?(forward|backward|back) ' + _NUMBER + r'(?: centimeters?| cm)?$')
+_FAST_PATH_TURN = re.compile(r'^(?:turn|rotate) (left|right) ' + _NUMBER + r'(?: degrees?)?$')
+
+def match_fast_path(command_text):
+    """
+    Map a handful of unambiguous commands straight to a tool call, skipping the LLM round-trip
+
+    Parameters:
+    - command_text: Recognized command text
+
+    Returns:
+    - (tool name, arguments dict) on a match, otherwise None
+    """
+    text = " ".join(command_text.lower().strip(" .!?").split())
+
+    posture = _FAST_PATH_POSTURES.get(text)
+    if posture:
+        return "change_posture", {"posture": posture}
+
+    match = _FAST_PATH_MOVE.match(text)
+    if match:
+        direction, amount = match.groups()
+        distance = int(_SPOKEN_NUMBERS.get(amount, amount))
+        return "move_distance", {"distance_cm": distance if direction == "forward" else -distance}
+
+    match = _FAST_PATH_TURN.match(text)
+    if match:
+        direction, amount = match.groups()
+        angle = int(_SPOKEN_NUMBERS.get(amount, amount))
+        # Negative angles rotate clockwise (right), positive counter-clockwise (left)
+        return "rotate_to_angle", {"target_angle": angle if direction == "left" else -angle}
+
+    return None
+
 def diagnoseSerialIssues():
     """Run a comprehensive diagnostic on serial communication"""
     print("\n===== Serial Connection Diagnostics =====")
@@ -88,7 +392,7 @@ def diagnoseSerialIssues():
     # 2. Test basic connectivity
     print("\nTesting basic serial connectivity...")
     ping_result = serial_manager.send_command_sync('text', 'PING', retry_count=5)
-    if ping_result.get('success', False):
+    if ping_result.success:
         print("✓ Communication test passed")
     else:
         print("❌ Communication test failed!")
@@ -171,74 +475,108 @@ def run_bot():
     openai_client = audio_components["openai_client"]
     tts_engine = audio_components["tts_engine"]
     recognizer = audio_components["recognizer"]
+    wake_recognizer = audio_components["wake_recognizer"]
     audio_queue = audio_components["audio_queue"]
     stop_event = audio_components["stop_event"]
     
     # Load tools from the tools description file
-    tool_file_path = os.path.join(os.path.dirname(os.path.abspath(__file__)), 'tool_descriptions.json')
     try:
-        with open(tool_file_path, 'r') as f:
-            tool_data = json.load(f)
-            tools = tool_data.get('tools', [])
-            if not tools:
-                logger.warning("No tools found in tool_descriptions.json")
-                print("⚠️ Warning: No tools found in tool_descriptions.json")
-                return False
+        tools = _get_tools()
+        if not tools:
+            logger.warning("No tools found in tool_descriptions.json")
+            print("⚠️ Warning: No tools found in tool_descriptions.json")
+            return False
     except (FileNotFoundError, json.JSONDecodeError) as e:
         logger.error(f"Error loading tool descriptions: {e}")
         print(f"❌ Error loading tool descriptions: {e}")
         return False
     
     # Load the dog_actions prompt
-    prompt_file_path = os.path.join(os.path.dirname(os.path.dirname(__file__)), 'dog_actions.md')
     try:
-        with open(prompt_file_path, 'r') as f:
-            prompt_content = f.read()
+        prompt_content = _get_prompt()
     except FileNotFoundError:
-        logger.error(f"Prompt file not found at {prompt_file_path}")
-        print(f"❌ Error: Prompt file not found at {prompt_file_path}")
+        logger.error(f"Prompt file not found at {DOG_ACTIONS_PROMPT_PATH}")
+        print(f"❌ Error: Prompt file not found at {DOG_ACTIONS_PROMPT_PATH}")
         return False
     
+    # Move the TTS and recognizer first-use costs out of the first interaction
+    robot_audio.warm_up(tts_engine, wake_recognizer, recognizer)
+    
+    # All speech goes through a worker thread so the loop never blocks on runAndWait()
+    speech = robot_audio.SpeechWorker(tts_engine)
+    speculator = ToolSpeculator(openai_client)
+    # Serial and network work that can run while the main thread is listening
+    background = ThreadPoolExecutor(max_workers=2)
+    
     time.sleep(5)
-    tts_engine.say("Robot is starting up")
-    tts_engine.runAndWait()
+    speech.say("Robot is starting up")
     
     try:
         print("Voice assistant is now listening for the wake phrase...")
-        tts_engine.say("Robot is ready and listening")
-        tts_engine.runAndWait()
+        speech.say("Robot is ready and listening")
         
         # Initialize conversation history with system prompt
-        messages = [
-            {"role": "system", "content": prompt_content}
-        ]
+        summarizer = functools.partial(summarize_history, openai_client) if HISTORY_SUMMARY_MODEL else None
+        history = ChatHistory(prompt_content, summarizer=summarizer)
         
         running = True
         while running:
             try:
                 # 1. Wait for the wake word
-                robot_audio.wait_for_wake_word(recognizer, audio_queue)
-                print("Wake word detected!")
+                robot_audio.wait_for_wake_word(wake_recognizer, audio_queue)
+                logger.info("Wake word detected!")
                 
-                # Optional: Visual or sound indication that wake word was detected
-                try:
-                    lightCtrl("blue", 0)  # Blue light to indicate active listening
-                except:
-                    pass
+                # Overlap the serial round-trip for the light and the OpenAI connection setup with
+                # listening for the command, instead of doing them one after another
+                background.submit(lightCtrl, "blue", 0)  # Blue light to indicate active listening
+                background.submit(warm_openai_connection, openai_client)
                 
                 # 2. Listen for the command
-                command_text = robot_audio.listen_for_command(recognizer, audio_queue, tts_engine)
+                command_text = robot_audio.listen_for_command(recognizer, audio_queue, speech)
                 if not command_text:
-                    print("No command detected. Listening for wake word again...")
+                    logger.info("No command detected. Listening for wake word again...")
                     robot_audio.flush_audio_queue(audio_queue)
                     recognizer.Reset()
                     continue
                 
-                print(f"Command received: '{command_text}'")
+                logger.info("Command received: '%s'", command_text)
                 
-                # 3. Add user command to message history
-                messages.append({"role": "user", "content": command_text})
+                # Collect any commands spoken straight after this one so they share a single request
+                commands = [command_text]
+                while len(commands) < MAX_BATCHED_COMMANDS:
+                    followup = robot_audio.listen_for_followup(recognizer, audio_queue, FOLLOWUP_WINDOW)
+                    if not followup:
+                        break
+                    commands.append(followup)
+                if len(commands) > 1:
+                    logger.info("Batching %d commands into one request", len(commands))
+                    command_text = batch_commands(commands)
                 
+                # 3. Add user command to message history
+                history.append({"role": "user", "content": command_text})
+
+                # Common, unambiguous commands go straight to their tool without an API call
+                fast_path = match_fast_path(command_text) if len(commands) == 1 else None
+                if fast_path:
+                    name, args = fast_path
+                    logger.info("Fast path: %s(%s)", name, args)
+                    try:
+                        result = call_function(name, args)
+                        logger.info("Tool result: %s", result)
+                        speech.say("Done")
+                    except Exception as e:
+                        logger.error(f"Error executing fast path {name}: {e}", exc_info=True)
+                        result = f"Error: {e}"
+                        speech.say("Error executing command")
+                    history.append({"role": "assistant", "content": f"Called {name} with {json.dumps(args, sort_keys=True)}: {result}"})
+
+                    speech.runAndWait()
+                    robot_audio.flush_audio_queue(audio_queue)
+                    recognizer.Reset()
+                    history.trim()
+                    logger.info("Command cycle complete. Listening for wake word again...")
+                    continue
+
                 # 4. Make the tool calling request to OpenAI and process all tool calls
                 try:
                     # Initialize a flag to track if we need to continue tool processing
@@ -250,128 +588,123 @@ def run_bot():
                     while has_pending_tools and tool_iteration < max_tool_iterations:
                         tool_iteration += 1
                         
-                        print(f"\nProcessing tool iteration {tool_iteration}/{max_tool_iterations}...")
+                        logger.info("Processing tool iteration %d/%d...", tool_iteration, max_tool_iterations)
+                        
+                        request_messages = history.messages()
                         
-                        # Make the tool calling request to OpenAI
-                        completion = openai_client.chat.completions.create(
+                        # On the first iteration let the planner model start a likely read-only tool early
+                        speculation = speculator.start(request_messages, tools) if tool_iteration == 1 else None
+                        
+                        # Make the tool calling request to OpenAI, speaking each sentence as soon as it is complete
+                        message = stream_completion(
+                            openai_client,
+                            speech.say,
                             model="gpt-4-1106-preview",
-                            messages=messages,
+                            messages=request_messages,
                             tools=tools,
                             max_tokens=4096,
                         )
                         
-                        # Process and display the response
-                        message = completion.choices[0].message
-                        print("\nLLM Response:")
-                        print(message)
+                        # Display the response
+                        logger.debug("LLM response: %s", message)
                         
                         # Add assistant's response to the message history
-                        messages.append({
-                            "role": "assistant",
-                            "content": message.content,
-                            **({"tool_calls": message.tool_calls} if message.tool_calls else {})
-                        })
-                        
-                        # Only speak the response on the first iteration
-                        tts_engine.say(message.content)
-                        tts_engine.runAndWait()
+                        history.append(assistant_message(message))
                         
                         # Check if there are tool calls
                         if message.tool_calls:
-                            print(f"\nTool Calls Received (Iteration {tool_iteration}):")
+                            logger.info("Tool calls received (iteration %d): %s", tool_iteration,
+                                        ", ".join(tool_call.function.name for tool_call in message.tool_calls))
                             has_pending_tools = True
                             
-                            for tool_call in message.tool_calls:
-                                print(f"Tool ID: {tool_call.id}")
-                                print(f"Function: {tool_call.function.name}")
-                                print(f"Arguments: {tool_call.function.arguments}")
-                                
-                                # Execute the tool call
-                                try:
-                                    name = tool_call.function.name
-                                    args = json.loads(tool_call.function.arguments) if tool_call.function.arguments.strip() else {}
-                                    
-                                    # Call the function and get the result
-                                    result = call_function(name, args)
-                                    
+                            if logger.isEnabledFor(logging.DEBUG):
+                                for tool_call in message.tool_calls:
+                                    logger.debug("Tool %s: %s(%s)", tool_call.id, tool_call.function.name,
+                                                 tool_call.function.arguments)
+                            
+                            # Execute the tool calls, concurrently when they are independent
+                            completed = speculator.claim(speculation, message.tool_calls)
+                            for tool_call, result, error in execute_tool_calls(message.tool_calls, completed):
+                                if error is None:
                                     # Add the result to the message history
-                                    messages.append({
+                                    history.append({
                                         "role": "tool",
                                         "tool_call_id": tool_call.id,
                                         "content": str(result)
                                     })
                                     
-                                    print(f"Tool result: {result}")
+                                    logger.info("Tool result: %s", result)
                                     
                                     # Only provide audio feedback for the final result or first iteration
                                     if (tool_iteration == 1 or not has_pending_tools) and isinstance(result, str) and len(result) < 100:
-                                        tts_engine.say(f"Task complete: {result}")
-                                        tts_engine.runAndWait()
+                                        speech.say(f"Task complete: {result}")
                                     
-                                except Exception as e:
-                                    error_msg = f"Error processing tool call: {str(e)}"
-                                    logger.error(error_msg, exc_info=True)
-                                    messages.append({
+                                else:
+                                    error_msg = f"Error processing tool call: {str(error)}"
+                                    logger.error(error_msg, exc_info=error)
+                                    history.append({
                                         "role": "tool",
                                         "tool_call_id": tool_call.id,
                                         "content": f"Error: {error_msg}"
                                     })
-                                    tts_engine.say("Error executing command")
-                                    tts_engine.runAndWait()
+                                    speech.say("Error executing command")
                         else:
+                            speculator.claim(speculation, None)
                             # No more tool calls, we're done with this cycle
-                            print("\nNo more tool calls for this command.")
+                            logger.info("No more tool calls for this command.")
                             has_pending_tools = False
                             break
                     
                     # Provide feedback if we hit the iteration limit
                     if tool_iteration >= max_tool_iterations and has_pending_tools:
-                        print(f"\nReached maximum tool iterations ({max_tool_iterations}), stopping.")
-                        tts_engine.say("Action sequence too long. Some steps may not have completed.")
-                        tts_engine.runAndWait()
+                        logger.warning("Reached maximum tool iterations (%d), stopping.", max_tool_iterations)
+                        speech.say("Action sequence too long. Some steps may not have completed.")
                         
                     # Final confirmation once all tool chains are complete
                     if tool_iteration > 1:  # Only if we ran multiple tool iterations
-                        tts_engine.say("All actions completed")
-                        tts_engine.runAndWait()
+                        speech.say("All actions completed")
                         
                 except Exception as e:
                     logger.error(f"Error in LLM tool calling: {e}", exc_info=True)
-                    print(f"❌ Error in LLM tool calling: {e}")
-                    tts_engine.say("I encountered an error processing your request")
-                    tts_engine.runAndWait()
+                    speech.say("I encountered an error processing your request")
                     
-                # Flush the audio queue and reset the recognizer for the next command
+                # Let queued speech finish so the microphone does not pick it up as the next command,
+                # then flush the audio queue and reset the recognizer
+                speech.runAndWait()
                 robot_audio.flush_audio_queue(audio_queue)
                 recognizer.Reset()
                 
                 # Add clear feedback that we're ready for the next command
-                print("\n-----------------------------------------")
-                print("✓ Command cycle complete. Listening for wake word again...")
+                logger.info("Command cycle complete. Listening for wake word again...")
                 # tts_engine.say("Ready for next command")
                 # tts_engine.runAndWait()
                 
-                # Periodically trim conversation history to prevent it from getting too long
-                if len(messages) > 100:  # Keep system message plus last 9 exchanges
-                    system_message = messages[0]
-                    messages = [system_message] + messages[-99:]
+                # Drop the oldest exchanges once the history exceeds the token budget
+                history.trim()
+                
+                if audio_queue.dropped:
+                    logger.info("Audio queue overflow: %d stale frames dropped so far", audio_queue.dropped)
                 
             except KeyboardInterrupt:
                 print("\nKeyboard interrupt received. Exiting...")
                 running = False
             except Exception as e:
                 logger.error(f"Error in voice control loop: {e}", exc_info=True)
-                print(f"❌ Error in voice control loop: {e}")
                 # Try to recover and continue
+                speech.runAndWait()
                 robot_audio.flush_audio_queue(audio_queue)
                 recognizer.Reset()
                 
     finally:
         # Clean up resources
-        stop_event.set()  # Signal the audio callback to stop
+        speech.close()
+        speculator.close()
+        background.shutdown(wait=False)
+        stop_event.set()  # Signal the audio capture thread to stop
         robot_audio.cleanup_audio(audio_components["stream"], 
                                  audio_components["pyaudio"], 
-                                 audio_components["tts_engine"])
+                                 audio_components["tts_engine"],
+                                 audio_components["capture_thread"])
         try:
             lightCtrl("off", 0)  # Turn off any lights
         except:
@@ -386,34 +719,29 @@ def run_bot_non_voice():
     
     # Initialize OpenAI client
     try:
-        client = OpenAI(api_key=os.environ.get("OPENAI_API_KEY"))
+        client = get_openai_client()
     except Exception as e:
         logger.error(f"Failed to initialize OpenAI client: {e}")
         print(f"❌ Error initializing OpenAI client: {e}")
         return False
     
     # Load tools from the tools description file
-    tool_file_path = os.path.join(os.path.dirname(os.path.abspath(__file__)), 'tool_descriptions.json')
     try:
-        with open(tool_file_path, 'r') as f:
-            tool_data = json.load(f)
-            tools = tool_data.get('tools', [])
-            if not tools:
-                logger.warning("No tools found in tool_descriptions.json")
-                print("⚠️ Warning: No tools found in tool_descriptions.json")
+        tools = _get_tools()
+        if not tools:
+            logger.warning("No tools found in tool_descriptions.json")
+            print("⚠️ Warning: No tools found in tool_descriptions.json")
     except (FileNotFoundError, json.JSONDecodeError) as e:
         logger.error(f"Error loading tool descriptions: {e}")
         print(f"❌ Error loading tool descriptions: {e}")
         return False
     
     # Load the dog_actions prompt
-    prompt_file_path = os.path.join(os.path.dirname(os.path.dirname(__file__)), 'dog_actions.md')
     try:
-        with open(prompt_file_path, 'r') as f:
-            prompt_content = f.read()
+        prompt_content = _get_prompt()
     except FileNotFoundError:
-        logger.error(f"Prompt file not found at {prompt_file_path}")
-        print(f"❌ Error: Prompt file not found at {prompt_file_path}")
+        logger.error(f"Prompt file not found at {DOG_ACTIONS_PROMPT_PATH}")
+        print(f"❌ Error: Prompt file not found at {DOG_ACTIONS_PROMPT_PATH}")
         return False
     
     # Initialize message history
@@ -457,15 +785,10 @@ def run_bot_non_voice():
                     print(f"Tool ID: {tool_call.id}")
                     print(f"Function: {tool_call.function.name}")
                     print(f"Arguments: {tool_call.function.arguments}")
-                    
-                    # Execute the tool call
-                    try:
-                        name = tool_call.function.name
-                        args = json.loads(tool_call.function.arguments) if tool_call.function.arguments.strip() else {}
-                        
-                        # Call the function and get the result
-                        result = call_function(name, args)
-
+                
+                # Execute the tool calls, concurrently when they are independent
+                for tool_call, result, error in execute_tool_calls(message.tool_calls):
+                    if error is None:
                         print(result)
                         
                         # Add the result to the message history
@@ -476,9 +799,9 @@ def run_bot_non_voice():
                         })
                         
                         print(f"Tool result: {result}")
-                    except Exception as e:
-                        error_msg = f"Error processing tool call: {str(e)}"
-                        logger.error(error_msg, exc_info=True)
+                    else:
+                        error_msg = f"Error processing tool call: {str(error)}"
+                        logger.error(error_msg, exc_info=error)
                         messages.append({
                             "role": "tool",
                             "tool_call_id": tool_call.id,
@@ -500,17 +823,169 @@ def run_bot_non_voice():
     print("\n===== LLM Tool Calling Complete =====")
     return True
 
+def _run_tool_call(tool_call):
+    """Parse the arguments of one tool call and execute it, returning (result, error)"""
+    try:
+        name = tool_call.function.name
+        args = _loads(tool_call.function.arguments) if tool_call.function.arguments.strip() else {}
+        return call_function(name, args), None
+    except Exception as e:
+        return None, e
+
+def execute_tool_calls(tool_calls, completed=None):
+    """
+    Execute the tool calls from one LLM response
+    
+    Independent calls run concurrently on a thread pool. If any call is in SERIAL_TOOLS the
+    whole batch runs sequentially in the order the model gave, since movements must not overlap.
+    
+    Parameters:
+    - tool_calls: Tool calls from the assistant message
+    - completed: Optional dict of tool_call.id -> (result, error) for calls that already ran
+    
+    Returns:
+    - list of (tool_call, result, error) tuples in the original order
+    """
+    completed = completed or {}
+    
+    def run(tc):
+        return completed[tc.id] if tc.id in completed else _run_tool_call(tc)
+    
+    if len(tool_calls) < 2 or any(tc.function.name in SERIAL_TOOLS for tc in tool_calls):
+        outcomes = [run(tc) for tc in tool_calls]
+    else:
+        with ThreadPoolExecutor(max_workers=min(MAX_TOOL_WORKERS, len(tool_calls))) as executor:
+            outcomes = list(executor.map(run, tool_calls))
+    return [(tc, result, error) for tc, (result, error) in zip(tool_calls, outcomes)]
+
+# Cheaper model used to guess the first tool call while the main model is still deciding
+PLANNER_MODEL = "gpt-4o-mini"
+# Only read-only tools are run speculatively; a wrong guess is simply discarded
+SPECULATIVE_TOOLS = {"view_surroundings"}
+MAX_SPECULATION_DIVERGENCE = 0.2
+MIN_SPECULATION_SAMPLES = 5
+
+def _same_call(a, b):
+    """Check whether two tool calls name the same function with the same arguments"""
+    if a.function.name != b.function.name:
+        return False
+    try:
+        return _loads(a.function.arguments or "{}") == _loads(b.function.arguments or "{}")
+    except ValueError:
+        return False
+
+class ToolSpeculator:
+    """
+    Run the planner model's first tool call early, while the main model is still deciding.
+    
+    start() asks PLANNER_MODEL for a plan in the background and, if its first call is in
+    SPECULATIVE_TOOLS, executes it straight away. claim() hands that result over when the main
+    model asks for the same call. Speculation turns itself off once more than
+    MAX_SPECULATION_DIVERGENCE of the speculated calls turn out to be wrong.
+    """
+    
+    def __init__(self, client):
+        self.client = client
+        self.executor = ThreadPoolExecutor(max_workers=1)
+        self.hits = 0
+        self.misses = 0
+    
+    @property
+    def enabled(self):
+        samples = self.hits + self.misses
+        return samples < MIN_SPECULATION_SAMPLES or self.misses / samples <= MAX_SPECULATION_DIVERGENCE
+    
+    def _plan(self, messages, tools):
+        response = self.client.chat.completions.create(
+            model=PLANNER_MODEL,
+            messages=messages,
+            tools=tools,
+            max_tokens=256,
+        )
+        tool_calls = response.choices[0].message.tool_calls
+        if not tool_calls or tool_calls[0].function.name not in SPECULATIVE_TOOLS:
+            return None
+        tool_call = tool_calls[0]
+        logger.info("Speculatively running %s(%s)", tool_call.function.name, tool_call.function.arguments)
+        return tool_call, _run_tool_call(tool_call)
+    
+    def start(self, messages, tools):
+        """Start planning in the background, returning a future or None when speculation is off"""
+        if not self.enabled:
+            return None
+        return self.executor.submit(self._plan, messages, tools)
+    
+    def claim(self, future, tool_calls):
+        """
+        Match a speculative result against the main model's tool calls
+        
+        Returns:
+        - dict of tool_call.id -> (result, error) for execute_tool_calls, empty on a miss
+        """
+        if future is None:
+            return {}
+        try:
+            speculated = future.result()
+        except Exception as e:
+            logger.warning(f"Planner request failed: {e}")
+            return {}
+        if speculated is None:
+            return {}
+        
+        planned_call, outcome = speculated
+        if tool_calls and _same_call(planned_call, tool_calls[0]):
+            self.hits += 1
+            return {tool_calls[0].id: outcome}
+        
+        self.misses += 1
+        if not self.enabled:
+            logger.info(f"Disabling tool speculation after {self.misses}/{self.hits + self.misses} misses")
+        return {}
+    
+    def close(self):
+        self.executor.shutdown(wait=False)
+
+# tools imports this module, so it is imported on first use rather than at the top, then cached
+_tools_mod = None
+
+def _get_tools_module():
+    """Import the tools module once and return the cached module object"""
+    global _tools_mod
+    if _tools_mod is None:
+        _tools_mod = importlib.import_module("tools")
+    return _tools_mod
+
+_tool_dispatch = None
+
+def _get_tool_dispatch():
+    """Build the tool name -> callable table once from tools.available_tools and tool_descriptions.json"""
+    global _tool_dispatch
+    if _tool_dispatch is None:
+        tools_mod = _get_tools_module()
+        dispatch = dict(getattr(tools_mod, "available_tools", {}))
+        try:
+            declared = [tool["function"]["name"] for tool in _get_tools()]
+        except (FileNotFoundError, json.JSONDecodeError, KeyError) as e:
+            logger.warning(f"Could not read tool names from tool_descriptions.json: {e}")
+            declared = []
+        for name in declared:
+            if name in dispatch:
+                continue
+            function = getattr(tools_mod, name, None)
+            if callable(function):
+                dispatch[name] = function
+            else:
+                logger.warning(f"Tool {name} is declared in tool_descriptions.json but not defined in tools")
+        _tool_dispatch = dispatch
+    return _tool_dispatch
+
 # Make call_function available at module level for audio-based operation
 def call_function(name, args):
     print(f"Executing function: {name} with args: {args}")
     try:
-        # Import tools module dynamically to avoid circular imports
-        sys.path.append(os.path.dirname(os.path.abspath(__file__)))
-        import tools
-        
-        # Check if the function exists in the tools module
-        if hasattr(tools, name):
-            function = getattr(tools, name)
+        # Look the function up in the prebuilt dispatch table
+        function = _get_tool_dispatch().get(name)
+        if function is not None:
             return function(**args)
         else:
             error_msg = f"Function {name} not found in tools module"
@@ -523,179 +998,163 @@ def call_function(name, args):
 
 # rotate_to_angle and move_distance functions have been moved to tools.py
 
-if __name__ == '__main__':
-    if len(sys.argv) > 1:
-        # Process command line arguments
-        if sys.argv[1] == "diagnose":
-            # Run diagnostic tests
-            diagnoseSerialIssues()
-            sys.exit(0)
-        elif sys.argv[1] == "test_serial":
-            # Just test serial connection
-            testSerialConnection()
-            sys.exit(0)
-        elif sys.argv[1] == "reset_gyro":
-            # Reset gyroscope angles
-            if resetGyroAngles():
-                print("Gyroscope angles reset successfully")
-            else:
-                print("Failed to reset gyroscope angles")
-            sys.exit(0)
-        elif sys.argv[1] == "run_bot":
-            # Run the robot with LLM tool calling
-            if run_bot():
-                print("Robot run successfully completed.")
-            else:
-                print("Robot run encountered errors.")
-            sys.exit(0)
-        elif sys.argv[1] == "voice_control":
-            # Run the robot with voice control
-            if run_bot_voice_control():
-                print("Voice control session ended successfully.")
-            else:
-                print("Voice control encountered errors.")
-            sys.exit(0)
-        elif sys.argv[1] == "test_movement":
-            # Run movement test
-            try:
-                # Import tools dynamically to avoid circular imports
-                sys.path.append(os.path.dirname(os.path.abspath(__file__)))
-                from tools import move_distance, rotate_to_angle
-                
-                print("\n===== Testing Robot Movement =====")
-                
-                # # Test sequence: forward 1 meter, rotate 45 degrees, rotate back -45 degrees
-                # print("\n1. Moving forward 100 cm (1 meter)...")
-                # result = move_distance(100)
-                # print(f"Result: {result}")
-                
-                # Wait between movements
-                print("Waiting 2 seconds...")
-                time.sleep(2)
-                
-                print("\n2. Rotating 45 degrees clockwise...")
-                result = rotate_to_angle(45)
-                print(f"Result: {result}")
-                
-                # Wait between movements
-                print("Waiting 2 seconds...")
-                time.sleep(2)
-                
-                print("\n3. Rotating 45 degrees counter-clockwise...")
-                result = rotate_to_angle(-45)
-                print(f"Result: {result}")
-                
-                print("\n===== Movement Test Complete =====")
-                
-                sys.exit(0)
-            except ImportError as e:
-                print(f"Error importing tools module: {e}")
-                logger.error(f"Error importing tools module: {e}")
-                sys.exit(1)
-            except Exception as e:
-                print(f"Error during movement test: {e}")
-                logger.error(f"Error during movement test: {e}", exc_info=True)
-                sys.exit(1)
-        elif sys.argv[1] == "test_sequence":
-            try:
-                test_movement_sequence()
-                sys.exit(0)
-            except ImportError:
-                print("Error: Could not import movement tools from tools.py")
-                sys.exit(1)
-            except Exception as e:
-                print(f"Error during movement sequence: {e}")
-                sys.exit(1)
-    
-    # Default behavior - improved diagnostics and monitoring
-    print("\nRunning basic serial diagnostics first...")
+def cli_diagnose(args):
+    """Run serial diagnostics"""
     diagnoseSerialIssues()
-    
-    print("\nStarting continuous gyro monitoring (Ctrl+C to exit)...")
-    while True:
-        try:
-            # Get and print gyroscope data
-            gyro = getGyroData()
-            if gyro:
-                print("\nGyroscope Data:")
-                print(f"  Rotation rates (°/s): X={gyro['gyro_x']:+8.4f}, Y={gyro['gyro_y']:+8.4f}, Z={gyro['gyro_z']:+8.4f}")
-                print(f"  Cumulative angles (°): X={gyro['angle_x']:+8.4f}, Y={gyro['angle_y']:+8.4f}, Z={gyro['angle_z']:+8.4f}")
-            else:
-                print("No gyroscope data received, trying again...")
-            time.sleep(2)  # Short delay between data requests
-        except KeyboardInterrupt:
-            print("\nExiting...")
-            break
-        except Exception as e:
-            print(f"Error: {e}")
-            logger.error(f"Error in monitoring loop: {e}", exc_info=True)
-            time.sleep(2)  # Add delay to avoid rapid error loops
-    
-    # Check for command line arguments
-    if len(sys.argv) > 1 and sys.argv[1] == "test_movement":
-        # Import tools for testing movement
-        try:
-            from tools import rotate_to_angle, move_distance
-            
-            print("\n===== Testing Robot Movement =====")
-            
-            # Test sequence: forward 1 meter, rotate 45 degrees, rotate back -45 degrees
-            print("\n1. Moving forward 100 cm (1 meter)...")
-            result = move_distance(100)
-            print(f"Result: {result}")
-            
-            # Wait between movements
-            print("Waiting 2 seconds...")
-            time.sleep(2)
-            
-            print("\n2. Rotating 45 degrees clockwise...")
-            result = rotate_to_angle(45)
-            print(f"Result: {result}")
-            
-            # Wait between movements
-            print("Waiting 2 seconds...")
-            time.sleep(2)
-            
-            print("\n3. Rotating 45 degrees counter-clockwise...")
-            result = rotate_to_angle(-45)
-            print(f"Result: {result}")
-            
-            print("\n===== Movement Test Complete =====")
-            
-            sys.exit(0)
-        except ImportError:
-            print("Error: Could not import movement tools from tools.py")
-            sys.exit(1)
-        except Exception as e:
-            print(f"Error during movement test: {e}")
-            sys.exit(1)
-    
-    # Default camera test if no specific test is requested
-    # Import tools only when needed
-    from tools import test_camera, view_surroundings
+    return 0
 
-    # Parse optional arguments for number of screenshots and delay
-    num_screenshots = 1
-    delay = 1
+def cli_test_serial(args):
+    """Test the serial connection"""
+    testSerialConnection()
+    return 0
 
-    if len(sys.argv) > 2:
-        try:
-            num_screenshots = int(sys.argv[2])
-        except ValueError:
-            pass
+def cli_reset_gyro(args):
+    """Reset gyroscope angles"""
+    if resetGyroAngles():
+        print("Gyroscope angles reset successfully")
+    else:
+        print("Failed to reset gyroscope angles")
+    return 0
 
-    if len(sys.argv) > 3:
-        try:
-            delay = float(sys.argv[3])
-        except ValueError:
-            pass
+def cli_run_bot(args):
+    """Run the robot with LLM tool calling"""
+    if run_bot():
+        print("Robot run successfully completed.")
+    else:
+        print("Robot run encountered errors.")
+    return 0
 
-    test_camera(num_screenshots, delay)
+def cli_test_movement(args):
+    """Run the gyro-based rotation test"""
+    try:
+        # Import tools lazily to avoid circular imports
+        tools_mod = _get_tools_module()
+        move_distance, rotate_to_angle = tools_mod.move_distance, tools_mod.rotate_to_angle
+        
+        print("\n===== Testing Robot Movement =====")
+        
+        # # Test sequence: forward 1 meter, rotate 45 degrees, rotate back -45 degrees
+        # print("\n1. Moving forward 100 cm (1 meter)...")
+        # result = move_distance(100)
+        # print(f"Result: {result}")
+        
+        # Wait between movements
+        print("Waiting 2 seconds...")
+        time.sleep(2)
+        
+        print("\n2. Rotating 45 degrees clockwise...")
+        result = rotate_to_angle(45)
+        print(f"Result: {result}")
+        
+        # Wait between movements
+        print("Waiting 2 seconds...")
+        time.sleep(2)
+        
+        print("\n3. Rotating 45 degrees counter-clockwise...")
+        result = rotate_to_angle(-45)
+        print(f"Result: {result}")
+        
+        print("\n===== Movement Test Complete =====")
+        return 0
+    except ImportError as e:
+        print(f"Error importing tools module: {e}")
+        logger.error(f"Error importing tools module: {e}")
+        return 1
+    except Exception as e:
+        print(f"Error during movement test: {e}")
+        logger.error(f"Error during movement test: {e}", exc_info=True)
+        return 1
+
+def cli_test_sequence(args):
+    """Run the raw serial movement sequence"""
+    try:
+        test_movement_sequence()
+        return 0
+    except Exception as e:
+        print(f"Error during movement sequence: {e}")
+        return 1
 
+def cli_camera(args):
+    """Take screenshots and describe the surroundings"""
+    # cv2/numpy are only imported when the camera test is actually requested
+    tools_mod = _get_tools_module()
+    
+    tools_mod.test_camera(args.num_screenshots, args.delay)
+    
     # Test view_surroundings function
     try:
         print("\nTesting view_surroundings function:")
-        description = view_surroundings()
+        description = tools_mod.view_surroundings()
         print(description)
     except Exception as e:
         print(f"Error testing view_surroundings: {e}")
+    return 0
+
+def cli_monitor(args):
+    """Run serial diagnostics, then print gyro data as it arrives until Ctrl+C"""
+    print("\nRunning basic serial diagnostics first...")
+    diagnoseSerialIssues()
+    
+    if not serial_manager:
+        print("Serial manager not initialized, cannot monitor the gyro")
+        return 1
+    
+    # The serial worker thread pushes every gyro packet it reads into this queue
+    gyro_queue = queue.Queue()
+    serial_manager.subscribe_gyro(gyro_queue.put)
+    
+    print("\nStarting continuous gyro monitoring (Ctrl+C to exit)...")
+    # While no data arrives, report less and less often (2 s doubling up to 30 s)
+    backoff = 2.0
+    try:
+        while True:
+            try:
+                gyro = gyro_queue.get(timeout=backoff)
+            except queue.Empty:
+                print(f"No gyroscope data received for {backoff:.0f}s, still waiting...")
+                backoff = min(backoff * 2, 30.0)
+                continue
+            backoff = 2.0
+            print("\nGyroscope Data:")
+            print(f"  Rotation rates (°/s): X={gyro['gyro_x']:+8.4f}, Y={gyro['gyro_y']:+8.4f}, Z={gyro['gyro_z']:+8.4f}")
+            print(f"  Cumulative angles (°): X={gyro['angle_x']:+8.4f}, Y={gyro['angle_y']:+8.4f}, Z={gyro['angle_z']:+8.4f}")
+    except KeyboardInterrupt:
+        print("\nExiting...")
+        return 0
+    finally:
+        serial_manager.unsubscribe_gyro(gyro_queue.put)
+
+def build_arg_parser():
+    """Build the command line parser; each subcommand sets its handler as args.handler"""
+    import argparse
+    
+    parser = argparse.ArgumentParser(description="Robot control and diagnostics")
+    parser.add_argument("--verbose", action="store_true",
+                        help="Log raw LLM responses and per-tool-call details")
+    parser.set_defaults(handler=cli_monitor)
+    subparsers = parser.add_subparsers(dest="command")
+    
+    commands = {
+        "diagnose": (cli_diagnose, cli_diagnose.__doc__),
+        "test_serial": (cli_test_serial, cli_test_serial.__doc__),
+        "reset_gyro": (cli_reset_gyro, cli_reset_gyro.__doc__),
+        "run_bot": (cli_run_bot, cli_run_bot.__doc__),
+        "voice_control": (cli_run_bot, "Run the voice-controlled robot (same as run_bot)"),
+        "test_movement": (cli_test_movement, cli_test_movement.__doc__),
+        "test_sequence": (cli_test_sequence, cli_test_sequence.__doc__),
+        "monitor": (cli_monitor, cli_monitor.__doc__),
+    }
+    for name, (handler, help_text) in commands.items():
+        subparsers.add_parser(name, help=help_text).set_defaults(handler=handler)
+    
+    camera = subparsers.add_parser("camera", help=cli_camera.__doc__)
+    camera.add_argument("num_screenshots", nargs="?", type=int, default=1)
+    camera.add_argument("delay", nargs="?", type=float, default=1)
+    camera.set_defaults(handler=cli_camera)
+    return parser
+
+if __name__ == '__main__':
+    args = build_arg_parser().parse_args()
+    if args.verbose:
+        logger.setLevel(logging.DEBUG)
+    sys.exit(args.handler(args) or 0)
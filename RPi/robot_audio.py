@@ -2,37 +2,104 @@
 # File name   : robot_audio.py
 # Description : Audio processing tools for voice commands
 
+import hashlib
+import importlib.util
+import json
 import os
+import re
+import sqlite3
+import unicodedata
+from collections import deque
+from concurrent.futures import Future
 import queue
 import threading
 import time
+import httpx
 import numpy as np
 import pyaudio
 import pyttsx3
 from openai import OpenAI
 from vosk import Model, KaldiRecognizer
 from dotenv import load_dotenv
-from functools import partial
+
+# Prefer orjson for parsing Vosk's JSON results, falling back to the standard library
+try:
+    import orjson
+
+    _loads = orjson.loads
+except ImportError:
+    _loads = json.loads
 
 # Global Configuration
 WAKE_WORD = "hello robot"  # wake word (in lower-case for matching)
 SAMPLE_RATE = 16000         # audio sample rate
 CHUNK = 4096
 MODEL_PATH = "./vosk-model-small-en-us-0.15"  # path to Vosk model directory
+WAKE_GRAMMAR = json.dumps([WAKE_WORD, "[unk]"])  # vocabulary of the wake-word recognizer
 PROMPT_PATHS = ["dog_response.md", "dog_actions.md"]
+OPENAI_USER = "robot-dog"   # stable end-user id sent with every request, so prompt-cache routing stays on one key
+WARMUP = True               # run warm_up() before the first interaction
+AUDIO_QUEUE_MAXSIZE = 20    # ~5 s of CHUNK-sized frames; older audio is dropped when full
+RESPONSE_CACHE = True       # reuse replies to exactly repeated requests
+RESPONSE_CACHE_PATH = "response_cache.sqlite3"
+RESPONSE_CACHE_TTL = 7 * 24 * 3600  # seconds before a cached reply expires
+RESPONSE_CACHE_SIZE = 1000  # entries kept; least recently used are evicted
+SILENCE_TIMEOUT = 1.0       # seconds without new words that end a command
+SEMANTIC_CACHE = True       # reuse replies to near-identical earlier commands
+EMBEDDING_MODEL = "text-embedding-3-small"
+SEMANTIC_CACHE_THRESHOLD = 0.95  # cosine similarity needed for a hit; strict so "turn left" never answers "turn right"
+SEMANTIC_CACHE_SIZE = 256   # entries kept per prompt
+# Prompts whose reply depends on the command alone; dog_response.md replies also depend on the
+# conversation history, so a similar command there can need a different answer
+SEMANTIC_CACHE_PROMPTS = frozenset(["dog_actions.md"])
+
+_openai_client = None
 
 def init_openai_client():
-    """Initialize the OpenAI client using API key from environment variables"""
-    load_dotenv()
-    api_key = os.getenv("OPENAI_API_KEY")
-    return OpenAI(api_key=api_key)
+    """
+    Initialize the OpenAI client using API key from environment variables
+
+    One client is shared by every caller in the process. Its httpx pool keeps connections alive
+    and, when the h2 package is installed, speaks HTTP/2, so the parallel prompts of
+    process_command_threaded multiplex over a single TLS connection. SDK retries are disabled:
+    a reply that arrives after a retry backoff is too late to be spoken, so errors fall through
+    to the caller's apology instead.
+    """
+    global _openai_client
+    if _openai_client is None:
+        load_dotenv()
+        api_key = os.getenv("OPENAI_API_KEY")
+        http_client = httpx.Client(
+            http2=importlib.util.find_spec("h2") is not None,
+            timeout=30.0,
+            limits=httpx.Limits(max_keepalive_connections=16, max_connections=32),
+        )
+        _openai_client = OpenAI(api_key=api_key, http_client=http_client, max_retries=0)
+    return _openai_client
+
+_model = None
+
+def get_model():
+    """Load the Vosk model on first use and share it between all recognizers"""
+    global _model
+    if _model is None:
+        _model = Model(MODEL_PATH)
+    return _model
 
 def init_vosk_recognizer():
     """Initialize the Vosk speech recognition model"""
-    model = Model(MODEL_PATH)
-    recognizer = KaldiRecognizer(model, SAMPLE_RATE)
+    recognizer = KaldiRecognizer(get_model(), SAMPLE_RATE)
     return recognizer
 
+def init_wake_recognizer(model):
+    """
+    Initialize a recognizer restricted to the wake word
+
+    Decoding against a two-entry grammar (the wake word and "[unk]" for everything else) is far
+    cheaper than open-vocabulary decoding, and wake-word listening runs most of the time.
+    """
+    return KaldiRecognizer(model, SAMPLE_RATE, WAKE_GRAMMAR)
+
 def init_tts_engine():
     """Initialize text-to-speech engine"""
     engine = pyttsx3.init()
@@ -40,6 +107,69 @@ def init_tts_engine():
     engine.setProperty('volume', 1.0)  # volume: 0.0 to 1.0
     return engine
 
+class SpeechWorker:
+    """
+    Speak text on a dedicated thread so callers are not blocked while the robot talks.
+
+    Mirrors the pyttsx3 engine's say()/runAndWait() pair: say() only queues the text and
+    runAndWait() blocks until everything queued so far has been spoken. The engine itself is
+    only ever used from the worker thread.
+    """
+
+    def __init__(self, engine):
+        self.engine = engine
+        self.queue = queue.Queue()
+        self.thread = threading.Thread(target=self._run, daemon=True)
+        self.thread.start()
+
+    def _run(self):
+        while True:
+            text = self.queue.get()
+            try:
+                if text is None:
+                    return
+                self.engine.say(text)
+                self.engine.runAndWait()
+            except Exception as e:
+                print(f"Error speaking text: {e}")
+            finally:
+                self.queue.task_done()
+
+    def say(self, text):
+        """Queue text to be spoken"""
+        if text:
+            self.queue.put(text)
+
+    def runAndWait(self):
+        """Block until all queued text has been spoken"""
+        self.queue.join()
+
+    def close(self, timeout=5.0):
+        """Finish the queued speech and stop the worker thread"""
+        self.queue.put(None)
+        self.thread.join(timeout)
+
+def warm_up(tts_engine, *recognizers):
+    """
+    Pay the one-time startup costs of the TTS engine and recognizers before the first command.
+
+    Speaks an empty string (voice enumeration, espeak startup) and feeds one second of silence
+    to each recognizer, then resets it.
+    """
+    if not WARMUP:
+        return
+    start_time = time.time()
+    try:
+        tts_engine.say("")
+        tts_engine.runAndWait()
+    except Exception as e:
+        print(f"TTS warmup failed: {e}")
+    silence = b"\x00" * (SAMPLE_RATE * 2)  # 1 s of 16-bit silence
+    for recognizer in recognizers:
+        recognizer.AcceptWaveform(silence)
+        recognizer.Reset()
+    print(f"Audio warmup finished in {time.time() - start_time:.2f}s")
+
 def init_audio_stream():
     """Initialize audio input stream, preferring ReSpeaker if available"""
     p = pyaudio.PyAudio()
@@ -73,8 +203,8 @@ def init_audio_stream():
                         frames_per_buffer=CHUNK,
                         input_device_index=device_index)
         
-        recognizer = KaldiRecognizer(Model(MODEL_PATH), SAMPLE_RATE)
-        return p, stream, device_index, channels, multi_channel, recognizer
+        recognizer = init_vosk_recognizer()
+        return p, stream, device_index, channels, multi_channel, recognizer, init_wake_recognizer(get_model())
     except OSError as e:
         print(f"Error opening audio stream: {e}")
         print("Trying default audio device...")
@@ -88,46 +218,115 @@ def init_audio_stream():
                             input=True,
                             frames_per_buffer=CHUNK,
                             input_device_index=device_index)
-            recognizer = KaldiRecognizer(Model(MODEL_PATH), SAMPLE_RATE)
-            return p, stream, device_index, channels, multi_channel, recognizer
+            recognizer = init_vosk_recognizer()
+            return p, stream, device_index, channels, multi_channel, recognizer, init_wake_recognizer(get_model())
         except OSError as e:
             print(f"Failed to open audio stream with default device: {e}")
             raise
 
-def audio_callback(in_data, frame_count, time_info, status, multi_channel, channels, stop_event, audio_queue):
-    """Callback function for continuous audio capture."""
+class AudioBuffer:
+    """
+    Single-producer/single-consumer buffer of audio frames from the capture thread to the recognizer.
+
+    Backed by a bounded deque, whose append() and popleft() are atomic without taking a lock, so
+    the capture thread never contends with the consumer; once full, the oldest frame is dropped
+    to keep the most recent audio. An Event wakes a consumer waiting on an empty buffer.
+    """
+
+    def __init__(self, maxlen=AUDIO_QUEUE_MAXSIZE):
+        self.frames = deque(maxlen=maxlen)
+        self.data_ready = threading.Event()
+        self.dropped = 0  # frames discarded because the buffer was full
+
+    def push(self, frame):
+        """Append a frame (producer side)"""
+        if len(self.frames) == self.frames.maxlen:
+            self.dropped += 1
+        self.frames.append(frame)
+        self.data_ready.set()
+
+    def pop(self, timeout=None):
+        """
+        Remove and return the oldest frame (consumer side)
+
+        Parameters:
+        - timeout: Seconds to wait for a frame, or None to wait indefinitely
+
+        Returns:
+        - The frame, or None if nothing arrived within the timeout
+        """
+        deadline = None if timeout is None else time.monotonic() + timeout
+        while True:
+            try:
+                return self.frames.popleft()
+            except IndexError:
+                pass
+            self.data_ready.clear()
+            if self.frames:
+                # A frame was pushed between popleft() and clear()
+                continue
+            remaining = None if deadline is None else deadline - time.monotonic()
+            if remaining is not None and remaining <= 0:
+                return None
+            if not self.data_ready.wait(remaining):
+                return None
+
+    def clear(self):
+        """Discard all buffered frames"""
+        self.frames.clear()
+
+def capture_audio(stream, multi_channel, channels, stop_event, audio_queue):
+    """
+    Read frames from a blocking-mode stream and push them (as mono) to an AudioBuffer until
+    stop_event is set.
+
+    Runs on its own thread instead of a PortAudio stream callback: PortAudio's real-time thread
+    only fills the stream's C buffer, and stream.read() releases the GIL while it waits, so
+    downmixing, queueing and garbage collection never stall audio capture.
+    """
     if multi_channel:
-        # Downmix to single channel (use first channel)
-        audio_data = np.frombuffer(in_data, dtype=np.int16)
-        mono_data = audio_data[0::channels]
-        in_data = mono_data.tobytes()
-    if stop_event.is_set():
-        return (None, pyaudio.paContinue)
-    audio_queue.put(in_data)
-    return (None, pyaudio.paContinue)
+        # Scratch buffers reused for every frame; only the queued bytes are allocated
+        mix = np.empty(CHUNK, dtype=np.int32)
+        mono = np.empty(CHUNK, dtype=np.int16)
+    while not stop_event.is_set():
+        try:
+            in_data = stream.read(CHUNK, exception_on_overflow=False)
+        except OSError as e:
+            print(f"Audio capture stopped: {e}")
+            break
+        if multi_channel:
+            # Downmix to a single channel by averaging all microphones (in int32 to avoid overflow)
+            frames = np.frombuffer(in_data, dtype=np.int16).reshape(-1, channels)
+            np.sum(frames, axis=1, dtype=np.int32, out=mix)
+            np.floor_divide(mix, channels, out=mix)
+            np.copyto(mono, mix, casting='unsafe')
+            in_data = mono.tobytes()
+        audio_queue.push(in_data)
 
 def wait_for_wake_word(recognizer, audio_queue):
-    """Listen until the wake word is detected."""
+    """Listen until the wake word is detected, leaving the recognizer reset for the next wait."""
     print("Listening for wake word...")
-    text = ""
+    # Vosk's English models emit lower-case text, so no per-chunk lower() is needed.
+    # Only the end of the previous final result is kept, to catch a wake word split across two
+    # results without concatenating an ever-growing transcript.
+    tail = ""
     while True:
-        data = audio_queue.get()  # Blocking call
+        data = audio_queue.pop()  # Blocking call
         if recognizer.AcceptWaveform(data):
             result = recognizer.Result()  # JSON string
-            result_text = eval(result).get("text", "")
-            text += (" " + result_text).strip()
-            if WAKE_WORD in text.lower():
-                break
-            text = ""
+            result_text = _loads(result).get("text", "")
+            window = f"{tail} {result_text}" if tail else result_text
+            if WAKE_WORD in window:
+                recognizer.Reset()
+                return True
+            tail = window[-len(WAKE_WORD):]
         else:
             partial_result = recognizer.PartialResult()
-            partial_text = eval(partial_result).get("partial", "").lower()
+            partial_text = _loads(partial_result).get("partial", "")
             if WAKE_WORD in partial_text:
                 # Low latency wake-up
-                text = WAKE_WORD
                 recognizer.Reset()
-                break
-    return True
+                return True
 
 def listen_for_command(recognizer, audio_queue, tts_engine=None):
     """After wake word detection, capture the spoken command."""
@@ -138,84 +337,381 @@ def listen_for_command(recognizer, audio_queue, tts_engine=None):
         flush_audio_queue(audio_queue)
     recognizer.Reset()  # Start fresh for command capture
     command_text = ""
-    silence_duration = 0
     max_command_time = 10.0  # seconds
-    start_time = time.time()
+    start_time = time.monotonic()
+    deadline = start_time + max_command_time
+    # Frames arrive continuously whether or not anyone speaks, so silence is measured from the
+    # last new recognized word rather than from the last frame
+    last_speech_time = start_time
 
     print("\nHearing: ", end='', flush=True)  # Start the hearing line
     last_partial = ""  # Keep track of last partial text
     
-    while time.time() - start_time < max_command_time:
-        try:
-            data = audio_queue.get(timeout=0.5)
-        except queue.Empty:
-            silence_duration += 0.5
-            if silence_duration >= 1.0:  # 1 second of silence
-                break
-            continue
+    while True:
+        now = time.monotonic()
+        timeout = deadline - now
+        if command_text:
+            timeout = min(timeout, last_speech_time + SILENCE_TIMEOUT - now)
+        if timeout <= 0:
+            break
 
-        silence_duration = 0  # reset silence timer
+        # Wakes as soon as the capture thread pushes a frame
+        data = audio_queue.pop(timeout=timeout)
+        if data is None:
+            continue
 
         if recognizer.AcceptWaveform(data):
             result = recognizer.Result()
-            result_text = eval(result).get("text", "")
+            result_text = _loads(result).get("text", "")
             if result_text:  # Only add non-empty results
-                command_text += (" " + result_text).strip()
+                command_text = f"{command_text} {result_text}".strip()
+                last_speech_time = time.monotonic()
                 print(f"\rHearing: {command_text}", end='', flush=True)
+            last_partial = ""
         else:
             # Show partial results in real-time
             partial_result = recognizer.PartialResult()
-            partial_text = eval(partial_result).get("partial", "")
+            partial_text = _loads(partial_result).get("partial", "")
             if partial_text and partial_text != last_partial:
+                last_speech_time = time.monotonic()
                 print(f"\rHearing: {command_text + ' ' + partial_text}", end='', flush=True)
                 last_partial = partial_text
 
     print("\n")  # Add a newline after we're done listening
     return command_text.strip()
 
-# Global conversation history
-conversation_history = []
+def listen_for_followup(recognizer, audio_queue, window=1.5, max_command_time=10.0):
+    """
+    Capture one more utterance if the user keeps talking right after a command.
+
+    Parameters:
+    - window: Seconds to wait for speech to start before giving up
+    - max_command_time: Upper bound on the length of the follow-up utterance
+
+    Returns:
+    - The recognized text, or "" when no speech started within the window
+    """
+    recognizer.Reset()
+    deadline = time.time() + window
+    speaking = False
+
+    while time.time() < deadline:
+        data = audio_queue.pop(timeout=0.5)
+        if data is None:
+            continue
+
+        if recognizer.AcceptWaveform(data):
+            result_text = _loads(recognizer.Result()).get("text", "")
+            if result_text:
+                print(f"Also heard: {result_text}")
+                return result_text
+            speaking = False
+            deadline = time.time() + window
+        elif not speaking and _loads(recognizer.PartialResult()).get("partial", ""):
+            # Speech has started, so let the utterance finish
+            speaking = True
+            deadline = time.time() + max_command_time
+
+    return ""
+
+class ResponseCache:
+    """
+    Exact-match cache of chat replies in SQLite, keyed by a SHA-256 of the model and messages.
+
+    User messages are NFC-normalized and lower-cased for the key only, so "Sit" and "sit" share
+    an entry. Entries expire ttl_seconds after they were stored; beyond max_entries the least
+    recently used ones are evicted.
+    """
+
+    def __init__(self, path=RESPONSE_CACHE_PATH, ttl_seconds=RESPONSE_CACHE_TTL, max_entries=RESPONSE_CACHE_SIZE):
+        self.path = path
+        self.ttl_seconds = ttl_seconds
+        self.max_entries = max_entries
+        self.conn = None  # opened on first use
+        self.lock = threading.Lock()
+
+    def _connect(self):
+        if self.conn is None:
+            self.conn = sqlite3.connect(self.path, check_same_thread=False)
+            self.conn.execute(
+                "CREATE TABLE IF NOT EXISTS replies "
+                "(key BLOB PRIMARY KEY, reply TEXT NOT NULL, created REAL NOT NULL, used REAL NOT NULL)"
+            )
+        return self.conn
+
+    @staticmethod
+    def key(model, messages):
+        """Hash a request into a cache key"""
+        normalized = [
+            {"role": "user", "content": unicodedata.normalize("NFC", message["content"]).lower()}
+            if message["role"] == "user" else message
+            for message in messages
+        ]
+        payload = json.dumps({"m": model, "msgs": normalized}, sort_keys=True, separators=(',', ':'))
+        return hashlib.sha256(payload.encode()).digest()
+
+    def get(self, key):
+        """Return the cached reply for key, or None if absent or expired"""
+        now = time.time()
+        with self.lock:
+            conn = self._connect()
+            row = conn.execute("SELECT reply, created FROM replies WHERE key = ?", (key,)).fetchone()
+            if row is None:
+                return None
+            if now - row[1] > self.ttl_seconds:
+                conn.execute("DELETE FROM replies WHERE key = ?", (key,))
+                conn.commit()
+                return None
+            conn.execute("UPDATE replies SET used = ? WHERE key = ?", (now, key))
+            conn.commit()
+            return row[0]
+
+    def put(self, key, reply):
+        """Store a reply and evict the least recently used entries beyond max_entries"""
+        now = time.time()
+        with self.lock:
+            conn = self._connect()
+            conn.execute("INSERT OR REPLACE INTO replies VALUES (?, ?, ?, ?)", (key, reply, now, now))
+            conn.execute(
+                "DELETE FROM replies WHERE key IN "
+                "(SELECT key FROM replies ORDER BY used DESC LIMIT -1 OFFSET ?)",
+                (self.max_entries,),
+            )
+            conn.commit()
+
+response_cache = ResponseCache()
+
+class SemanticCache:
+    """
+    Replies to earlier commands, looked up by embedding similarity.
+
+    A hit costs one embedding request instead of a full chat completion. Entries are kept
+    separately per prompt path, since the same command gets a different reply from each prompt.
+    """
+
+    def __init__(self, threshold=SEMANTIC_CACHE_THRESHOLD, max_entries=SEMANTIC_CACHE_SIZE):
+        self.threshold = threshold
+        self.max_entries = max_entries
+        self.entries = {}  # prompt_path -> (unit embeddings, shape (n, d), list of n replies)
+        self.lock = threading.Lock()  # process_command_threaded runs prompts in parallel
+
+    def embed(self, openai_client, text):
+        """Return the unit-length embedding of text"""
+        response = openai_client.embeddings.create(model=EMBEDDING_MODEL, input=text)
+        vector = np.asarray(response.data[0].embedding, dtype=np.float32)
+        return vector / np.linalg.norm(vector)
+
+    def lookup(self, prompt_path, embedding):
+        """Return the reply of the most similar cached command, or None if none is close enough"""
+        with self.lock:
+            vectors, replies = self.entries.get(prompt_path, (None, None))
+            if not replies:
+                return None
+            scores = vectors @ embedding
+            best = int(np.argmax(scores))
+            return replies[best] if scores[best] >= self.threshold else None
+
+    def add(self, prompt_path, embedding, reply):
+        """Cache a reply, dropping the oldest entry once max_entries is reached"""
+        with self.lock:
+            vectors, replies = self.entries.get(prompt_path, (np.empty((0, embedding.size), np.float32), []))
+            vectors = np.vstack((vectors, embedding))[-self.max_entries:]
+            replies = (replies + [reply])[-self.max_entries:]
+            self.entries[prompt_path] = (vectors, replies)
+
+semantic_cache = SemanticCache()
+
+def _lookup_cached_reply(openai_client, prompt_path, command_text):
+    """
+    Check the semantic cache for a command
+
+    Returns:
+    - (embedding, reply): reply is None on a miss; embedding is None if the cache is disabled or
+      the embedding request failed, in which case the reply should not be cached either
+    """
+    if not SEMANTIC_CACHE:
+        return None, None
+    try:
+        embedding = semantic_cache.embed(openai_client, command_text)
+    except Exception as e:
+        print(f"Semantic cache unavailable: {e}")
+        return None, None
+    return embedding, semantic_cache.lookup(prompt_path, embedding)
+
+_system_prompts = {}
+
+def get_system_prompt(prompt_path):
+    """
+    Return the contents of a prompt file, read once and then reused verbatim
+
+    Sending the byte-identical system message first on every request gives OpenAI's prompt
+    cache a stable prefix to match.
+    """
+    prompt = _system_prompts.get(prompt_path)
+    if prompt is None:
+        with open(prompt_path, "rb") as f:
+            prompt = _system_prompts[prompt_path] = f.read().decode("utf-8")
+    return prompt
+
+def preload_system_prompts(prompt_paths=PROMPT_PATHS):
+    """Read the prompt files at startup so the first command does not wait on disk"""
+    for prompt_path in prompt_paths:
+        try:
+            get_system_prompt(prompt_path)
+        except OSError as e:
+            print(f"Could not preload prompt {prompt_path}: {e}")
+
+# Whitespace that follows sentence-ending punctuation
+_SENTENCE_BREAK = re.compile(r'(?<=[.!?])\s+')
+
+def stream_reply(openai_client, on_sentence, **kwargs):
+    """
+    Run a streaming chat completion, passing each finished sentence to on_sentence as it arrives
+
+    Returns:
+    - The full reply text
+    """
+    parts = []
+    pending = ""
+    for chunk in openai_client.chat.completions.create(stream=True, **kwargs):
+        if not chunk.choices or not chunk.choices[0].delta.content:
+            continue
+        content = chunk.choices[0].delta.content
+        parts.append(content)
+        *sentences, pending = _SENTENCE_BREAK.split(pending + content)
+        for sentence in sentences:
+            on_sentence(sentence)
+    if pending.strip():
+        on_sentence(pending)
+    return "".join(parts)
+
+def _request_reply(openai_client, model, messages, on_sentence=None):
+    """Get the assistant reply to messages from the OpenAI API, streamed if on_sentence is given"""
+    if on_sentence:
+        return stream_reply(openai_client, on_sentence, model=model, messages=messages, user=OPENAI_USER)
+    response = openai_client.chat.completions.create(
+        model=model,
+        messages=messages,
+        user=OPENAI_USER,
+    )
+    return response.choices[0].message.content
+
+def _run_in_background(fn, *args):
+    """Start fn(*args) on a daemon thread and return a Future for its result"""
+    future = Future()
+
+    def run():
+        try:
+            future.set_result(fn(*args))
+        except Exception as e:
+            future.set_exception(e)
 
-def process_command(command_text, openai_client, prompt_path="dog_response.md", memory_limit=10):
-    """Process a command with OpenAI API using conversation history."""
-    global conversation_history
+    threading.Thread(target=run, daemon=True).start()
+    return future
+
+def complete_with_cache(openai_client, prompt_path, command_text, messages, model="gpt-4o", on_sentence=None):
+    """
+    Return the assistant reply to messages, trying the exact-match cache, then (for the prompts
+    in SEMANTIC_CACHE_PROMPTS) the semantic cache, before calling the OpenAI API
+
+    The semantic lookup's embedding request runs alongside the completion rather than before
+    it, so a miss costs no extra latency; a hit returns at once and drops the completion.
+
+    Parameters:
+    - on_sentence: If given, called with each sentence of the reply; API replies are streamed so
+      the first sentence arrives before the reply is complete, cached replies are passed whole.
+      Streamed replies skip the semantic cache, since their sentences are spoken as they arrive.
+    """
+    key = None
+    if RESPONSE_CACHE:
+        try:
+            key = response_cache.key(model, messages)
+            reply = response_cache.get(key)
+            if reply is not None:
+                if on_sentence:
+                    on_sentence(reply)
+                return reply
+        except sqlite3.Error as e:
+            print(f"Response cache unavailable: {e}")
+            key = None
+
+    if SEMANTIC_CACHE and prompt_path in SEMANTIC_CACHE_PROMPTS and not on_sentence:
+        completion = _run_in_background(_request_reply, openai_client, model, messages)
+        embedding, reply = _lookup_cached_reply(openai_client, prompt_path, command_text)
+        if reply is None:
+            reply = completion.result()
+            if embedding is not None:
+                semantic_cache.add(prompt_path, embedding, reply)
+    else:
+        reply = _request_reply(openai_client, model, messages, on_sentence)
+
+    if key is not None:
+        try:
+            response_cache.put(key, reply)
+        except sqlite3.Error as e:
+            print(f"Could not store reply in response cache: {e}")
+    return reply
+
+# Global conversation history: the system message, set on the first command, and a rolling
+# window of the latest user/assistant messages that evicts the oldest entry on append
+conversation_system = None
+conversation_history = deque()
+
+def process_command(command_text, openai_client, prompt_path="dog_response.md", memory_limit=10, tts_engine=None):
+    """
+    Process a command with OpenAI API using conversation history.
+
+    If tts_engine is given, the reply is streamed and each sentence is spoken as soon as it has
+    been generated, instead of after the whole reply.
+    """
+    global conversation_system, conversation_history
     
     try:
-        # Initialize conversation history with system prompt if empty
-        if not conversation_history:
-            with open(prompt_path, "r", encoding="utf-8") as f:
-                system_prompt = f.read()
-            conversation_history.append({"role": "system", "content": system_prompt})
+        # Initialize the system prompt on the first command
+        if conversation_system is None:
+            conversation_system = {"role": "system", "content": get_system_prompt(prompt_path)}
+
+        # Keep the system prompt plus the last (memory_limit - 1) messages
+        if conversation_history.maxlen != memory_limit - 1:
+            conversation_history = deque(conversation_history, maxlen=memory_limit - 1)
 
         # Append the new user message
         conversation_history.append({"role": "user", "content": command_text})
 
-        # Call the OpenAI API using the full conversation history
-        response = openai_client.chat.completions.create(
-            model="gpt-4o",
-            messages=conversation_history,
-        )
-        assistant_reply = response.choices[0].message.content
+        on_sentence = None
+        if tts_engine:
+            def on_sentence(sentence):
+                tts_engine.say(sentence)
+                tts_engine.runAndWait()
+
+        # Get the reply to the full conversation history
+        messages = [conversation_system, *conversation_history]
+        assistant_reply = complete_with_cache(openai_client, prompt_path, command_text, messages,
+                                              on_sentence=on_sentence)
 
         # Append the assistant's reply to the conversation history
         conversation_history.append({"role": "assistant", "content": assistant_reply})
 
-        # Limit conversation history to the last 'memory_limit' messages
-        if len(conversation_history) > memory_limit:
-            # Preserve system prompt and the last (memory_limit - 1) messages
-            conversation_history[:] = [conversation_history[0]] + conversation_history[-(memory_limit - 1):]
-
         return prompt_path, assistant_reply
     except Exception as e:
         print(f"Error processing command: {e}")
         return prompt_path, "I'm sorry, I couldn't process that request."
 
-def process_command_threaded(command_text, openai_client, prompt_paths=None, memory_limit=10):
-    """Process a command using multiple prompt templates in parallel."""
+def process_command_threaded(command_text, openai_client, prompt_paths=None, memory_limit=10, on_result=None):
+    """
+    Process a command using multiple prompt templates in parallel.
+
+    Parameters:
+    - on_result: If given, called with (prompt_path, reply) as soon as each prompt finishes, so
+      e.g. the actions prompt can start moving the robot before the spoken reply is ready
+
+    Returns:
+    - List of (prompt_path, reply) tuples in prompt_paths order
+    """
     if prompt_paths is None:
         prompt_paths = PROMPT_PATHS
         
-    from concurrent.futures import ThreadPoolExecutor
+    from concurrent.futures import ThreadPoolExecutor, as_completed
     
     def process_single_prompt(prompt_path):
         if prompt_path == "dog_response.md":
@@ -223,16 +719,11 @@ def process_command_threaded(command_text, openai_client, prompt_paths=None, mem
 
         local_conversation_history = []
         try:
-            with open(prompt_path, "r", encoding="utf-8") as f:
-                system_prompt = f.read()
-            local_conversation_history.append({"role": "system", "content": system_prompt})
+            local_conversation_history.append({"role": "system", "content": get_system_prompt(prompt_path)})
             local_conversation_history.append({"role": "user", "content": command_text})
 
-            response = openai_client.chat.completions.create(
-                model="gpt-4o",
-                messages=local_conversation_history,
-            )
-            assistant_reply = response.choices[0].message.content
+            assistant_reply = complete_with_cache(openai_client, prompt_path, command_text,
+                                                  local_conversation_history)
 
             return prompt_path, assistant_reply
 
@@ -240,22 +731,25 @@ def process_command_threaded(command_text, openai_client, prompt_paths=None, mem
             print(f"Error with prompt {prompt_path}: {e}")
             return prompt_path, "Error occurred"
 
-    # Run each prompt processing in parallel
+    # Run each prompt processing in parallel, handling each result as soon as it is ready
+    results = [None] * len(prompt_paths)
     with ThreadPoolExecutor(max_workers=min(3, len(prompt_paths))) as executor:
-        results = list(executor.map(process_single_prompt, prompt_paths))
+        futures = {executor.submit(process_single_prompt, path): i for i, path in enumerate(prompt_paths)}
+        for future in as_completed(futures):
+            results[futures[future]] = future.result()
+            if on_result:
+                on_result(*results[futures[future]])
 
     return results
 
 def flush_audio_queue(audio_queue):
     """Flush any lingering audio in the queue."""
-    while not audio_queue.empty():
-        try:
-            audio_queue.get_nowait()
-        except queue.Empty:
-            break
+    audio_queue.clear()
 
-def cleanup_audio(stream, p, tts_engine=None):
-    """Clean up audio resources."""
+def cleanup_audio(stream, p, tts_engine=None, capture_thread=None):
+    """Clean up audio resources (set the stop event first so the capture thread can exit)."""
+    if capture_thread:
+        capture_thread.join(timeout=1.0)
     if stream:
         stream.stop_stream()
         stream.close()
@@ -269,32 +763,19 @@ def setup_audio_processing():
     try:
         # Initialize components
         openai_client = init_openai_client()
+        preload_system_prompts()
         tts_engine = init_tts_engine()
-        p, stream, device_index, channels, multi_channel, recognizer = init_audio_stream()
+        p, stream, device_index, channels, multi_channel, recognizer, wake_recognizer = init_audio_stream()
         
         # Prepare audio queue and control event
-        audio_queue = queue.Queue()
+        audio_queue = AudioBuffer(AUDIO_QUEUE_MAXSIZE)
         stop_event = threading.Event()
         
-        # Stop the initial blocking stream to re-open in callback mode
-        stream.stop_stream()
-        stream.close()
-        
-        # Create the callback using partial to include extra parameters
-        callback = partial(audio_callback,
-                          multi_channel=multi_channel,
-                          channels=channels,
-                          stop_event=stop_event,
-                          audio_queue=audio_queue)
-        
-        # Reopen the stream in callback mode
-        stream = p.open(format=pyaudio.paInt16,
-                        channels=channels,
-                        rate=SAMPLE_RATE,
-                        input=True,
-                        frames_per_buffer=CHUNK,
-                        input_device_index=device_index,
-                        stream_callback=callback)
+        # Capture on a dedicated thread reading the blocking-mode stream
+        capture_thread = threading.Thread(target=capture_audio,
+                                          args=(stream, multi_channel, channels, stop_event, audio_queue),
+                                          daemon=True)
+        capture_thread.start()
         
         print("Audio processing initialized successfully")
         
@@ -303,7 +784,9 @@ def setup_audio_processing():
             "tts_engine": tts_engine,
             "pyaudio": p,
             "stream": stream,
+            "capture_thread": capture_thread,
             "recognizer": recognizer,
+            "wake_recognizer": wake_recognizer,
             "audio_queue": audio_queue,
             "stop_event": stop_event
         }
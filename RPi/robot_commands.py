@@ -2,11 +2,12 @@
 # File name   : robot_commands.py
 # Description : Robot command functions for interacting with the robot hardware
 
+import functools
 import json
 import logging
 import time
 import os
-from dotenv import load_dotenv
+from serial_manager import encode_json_command
 
 # Configure logging
 logger = logging.getLogger("robot_commands")
@@ -20,291 +21,106 @@ def initialize(serial_mgr):
     serial_manager = serial_mgr
     logger.info("Robot commands module initialized")
 
+def requires_serial(default=False):
+    """
+    Decorator for functions that need the serial manager
+    
+    The wrapped function receives the serial manager as its first argument. When none is
+    available the call is logged and short-circuits to default.
+    """
+    def decorator(fn):
+        @functools.wraps(fn)
+        def wrapper(*args, **kwargs):
+            sm = serial_manager
+            if not sm:
+                logger.error(f"Serial manager not available, can't run {fn.__name__}")
+                return default
+            return fn(sm, *args, **kwargs)
+        return wrapper
+    return decorator
+
+# Every fixed (var, val) opcode the command functions send, encoded once at import exactly as
+# SerialManager would serialize the equivalent 'json' command
+_CMD_BYTES = {
+    (var, val): encode_json_command({'var': var, 'val': val})
+    for var, vals in (("move", range(1, 7)), ("ges", range(1, 7)), ("funcMode", range(1, 8)))
+    for val in vals
+}
+
+# Coalescing key per opcode: a queued command is only replaced by a later one on the same axis,
+# so e.g. stopLR followed by stopFB sends both. Function modes are one-shot actions, so only a
+# repeat of the same action is collapsed.
+_COALESCE_KEYS = {
+    ("move", 1): "move_fb", ("move", 5): "move_fb", ("move", 3): "move_fb",
+    ("move", 2): "move_lr", ("move", 4): "move_lr", ("move", 6): "move_lr",
+    ("ges", 1): "ges_ud", ("ges", 2): "ges_ud", ("ges", 3): "ges_ud",
+    ("ges", 4): "ges_lr", ("ges", 5): "ges_lr", ("ges", 6): "ges_lr",
+}
+
 def setUpperIP(ipInput):
     global upperGlobalIP
     upperGlobalIP = ipInput
 
-def forward(speed=100):
-    if not serial_manager:
-        logger.error("Serial manager not available, can't send forward command")
-        return False
-    
-    command = {'var': "move", 'val': 1}
-    result = serial_manager.send_command_sync('json', command)
-    
-    if result and result.get('success'):
-        logger.info(f'Command sent: robot-forward (speed={speed})')
-        print('robot-forward')
-        return True
-    else:
-        error = result.get('error', 'Unknown error')
-        logger.error(f"Failed to send forward command: {error}")
-        return False
-
-def backward(speed=100):
-    if not serial_manager:
-        logger.error("Serial manager not available, can't send backward command")
-        return False
-    
-    command = {'var': "move", 'val': 5}
-    result = serial_manager.send_command_sync('json', command)
-    
-    if result and result.get('success'):
-        logger.info(f'Command sent: robot-backward (speed={speed})')
-        print('robot-backward')
-        return True
-    else:
-        error = result.get('error', 'Unknown error')
-        logger.error(f"Failed to send backward command: {error}")
-        return False
-
-def left(speed=100):
-    if not serial_manager:
-        logger.error("Serial manager not available, can't send left command")
-        return False
-    
-    command = {'var': "move", 'val': 2}
-    result = serial_manager.send_command_sync('json', command)
-    
-    if result and result.get('success'):
-        logger.info(f'Command sent: robot-left (speed={speed})')
-        print('robot-left')
-        return True
-    else:
-        error = result.get('error', 'Unknown error')
-        logger.error(f"Failed to send left command: {error}")
-        return False
-
-def right(speed=100):
-    if not serial_manager:
-        logger.error("Serial manager not available, can't send right command")
-        return False
-    
-    command = {'var': "move", 'val': 4}
-    result = serial_manager.send_command_sync('json', command)
-    
-    if result and result.get('success'):
-        logger.info(f'Command sent: robot-right (speed={speed})')
-        print('robot-right')
-        return True
-    else:
-        error = result.get('error', 'Unknown error')
-        logger.error(f"Failed to send right command: {error}")
-        return False
-
-def stopLR():
-    if not serial_manager:
-        logger.error("Serial manager not available, can't send stopLR command")
-        return False
-    
-    command = {'var': "move", 'val': 6}
-    result = serial_manager.send_command_sync('json', command)
-    
-    if result and result.get('success'):
-        logger.info('Command sent: robot-stop LR')
-        print('robot-stop')
-        return True
-    else:
-        error = result.get('error', 'Unknown error')
-        logger.error(f"Failed to send stopLR command: {error}")
-        return False
-
-def stopFB():
-    if not serial_manager:
-        logger.error("Serial manager not available, can't send stopFB command")
-        return False
-    
-    command = {'var': "move", 'val': 3}
-    result = serial_manager.send_command_sync('json', command)
-    
-    if result and result.get('success'):
-        logger.info('Command sent: robot-stop FB')
-        print('robot-stop')
-        return True
-    else:
-        error = result.get('error', 'Unknown error')
-        logger.error(f"Failed to send stopFB command: {error}")
-        return False
-
-def lookUp():
-    if not serial_manager:
-        return False
-    
-    command = {'var': "ges", 'val': 1}
-    result = serial_manager.send_command_sync('json', command)
-    
-    if result and result.get('success'):
-        print('robot-lookUp')
-        return True
-    return False
-
-def lookDown():
-    if not serial_manager:
-        return False
-    
-    command = {'var': "ges", 'val': 2}
-    result = serial_manager.send_command_sync('json', command)
-    
-    if result and result.get('success'):
-        print('robot-lookDown')
-        return True
-    return False
-
-def lookStopUD():
-    if not serial_manager:
-        return False
-    
-    command = {'var': "ges", 'val': 3}
-    result = serial_manager.send_command_sync('json', command)
-    
-    if result and result.get('success'):
-        print('robot-lookStopUD')
-        return True
-    return False
-
-def lookLeft():
-    if not serial_manager:
-        return False
-    
-    command = {'var': "ges", 'val': 4}
-    result = serial_manager.send_command_sync('json', command)
-    
-    if result and result.get('success'):
-        print('robot-lookLeft')
-        return True
-    return False
-
-def lookRight():
-    if not serial_manager:
-        return False
-    
-    command = {'var': "ges", 'val': 5}
-    result = serial_manager.send_command_sync('json', command)
-    
-    if result and result.get('success'):
-        print('robot-lookRight')
-        return True
-    return False
-
-def lookStopLR():
-    if not serial_manager:
-        return False
-    
-    command = {'var': "ges", 'val': 6}
-    result = serial_manager.send_command_sync('json', command)
+def _make_command(name, var, val, label):
+    """Build a command function that queues one fixed (var, val) opcode frame"""
+    payload = _CMD_BYTES[(var, val)]
+    coalesce_key = _COALESCE_KEYS.get((var, val), (var, val))
     
-    if result and result.get('success'):
-        print('robot-lookStopLR')
-        return True
-    return False
-
-def resetGyroAngles():
+    def command(sm, speed=100):
+        result = sm.send_command_async('raw_bytes', payload, coalesce_key=coalesce_key)
+        
+        if result.success:
+            logger.info(f'Command queued: {label}')
+            return True
+        logger.error(f"Failed to send {name} command: {result.error or 'Unknown error'}")
+        return False
+    
+    command.__name__ = command.__qualname__ = name
+    command.__doc__ = f"Queue the {var}={val} opcode ({label}); speed is accepted for compatibility and ignored"
+    return requires_serial()(command)
+
+# Movement
+forward = _make_command('forward', "move", 1, 'robot-forward')
+backward = _make_command('backward', "move", 5, 'robot-backward')
+left = _make_command('left', "move", 2, 'robot-left')
+right = _make_command('right', "move", 4, 'robot-right')
+stopLR = _make_command('stopLR', "move", 6, 'robot-stop LR')
+stopFB = _make_command('stopFB', "move", 3, 'robot-stop FB')
+
+# Head gestures
+lookUp = _make_command('lookUp', "ges", 1, 'robot-lookUp')
+lookDown = _make_command('lookDown', "ges", 2, 'robot-lookDown')
+lookStopUD = _make_command('lookStopUD', "ges", 3, 'robot-lookStopUD')
+lookLeft = _make_command('lookLeft', "ges", 4, 'robot-lookLeft')
+lookRight = _make_command('lookRight', "ges", 5, 'robot-lookRight')
+lookStopLR = _make_command('lookStopLR', "ges", 6, 'robot-lookStopLR')
+
+# Function modes
+steadyMode = _make_command('steadyMode', "funcMode", 1, 'robot-steady')
+stayLow = _make_command('stayLow', "funcMode", 2, 'robot-stayLow')
+handShake = _make_command('handShake', "funcMode", 3, 'robot-handshake')
+jump = _make_command('jump', "funcMode", 4, 'robot-jump')
+actionA = _make_command('actionA', "funcMode", 5, 'robot-actionA')
+actionB = _make_command('actionB', "funcMode", 6, 'robot-actionB')
+actionC = _make_command('actionC', "funcMode", 7, 'robot-actionC')
+
+@requires_serial()
+def resetGyroAngles(sm):
     """Reset the robot's internal gyroscope angle tracking"""
-    if not serial_manager:
-        logger.error("Serial manager not available, can't reset gyro angles")
-        return False
+    result = sm.send_command_sync('text', 'RESET_GYRO')
     
-    result = serial_manager.send_command_sync('text', 'RESET_GYRO')
-    
-    if result and result.get('success'):
+    if result.success:
         logger.info('Successfully reset gyroscope angles')
         return True
-    else:
-        error = result.get('error', 'Unknown error')
-        logger.error(f"Failed to reset gyro angles: {error}")
-        return False
-
-def steadyMode():
-    if not serial_manager:
-        return False
-    
-    command = {'var': "funcMode", 'val': 1}
-    result = serial_manager.send_command_sync('json', command)
-    
-    if result and result.get('success'):
-        print('robot-steady')
-        return True
-    return False
-
-def jump():
-    if not serial_manager:
-        return False
-    
-    command = {'var': "funcMode", 'val': 4}
-    result = serial_manager.send_command_sync('json', command)
-    
-    if result and result.get('success'):
-        print('robot-jump')
-        return True
+    logger.error(f"Failed to reset gyro angles: {result.error or 'Unknown error'}")
     return False
 
-def handShake():
-    if not serial_manager:
-        return False
-    
-    command = {'var': "funcMode", 'val': 3}
-    result = serial_manager.send_command_sync('json', command)
-    
-    if result and result.get('success'):
-        print('robot-handshake')
-        return True
-    return False
-
-def stayLow():
-    if not serial_manager:
-        return False
-    
-    command = {'var': "funcMode", 'val': 2}
-    result = serial_manager.send_command_sync('json', command)
-    
-    if result and result.get('success'):
-        print('robot-stayLow')
-        return True
-    return False
-
-def actionA():
-    if not serial_manager:
-        return False
-    
-    command = {'var': "funcMode", 'val': 5}
-    result = serial_manager.send_command_sync('json', command)
-    
-    if result and result.get('success'):
-        print('robot-actionA')
-        return True
-    return False
-
-def actionB():
-    if not serial_manager:
-        return False
-    
-    command = {'var': "funcMode", 'val': 6}
-    result = serial_manager.send_command_sync('json', command)
-    
-    if result and result.get('success'):
-        print('robot-actionB')
-        return True
-    return False
-
-def actionC():
-    if not serial_manager:
-        return False
-    
-    command = {'var': "funcMode", 'val': 7}
-    result = serial_manager.send_command_sync('json', command)
-    
-    if result and result.get('success'):
-        print('robot-actionC')
-        return True
-    return False
+# Posture names accepted by change_posture and the generated command each one sends
+_POSTURES = {"stay_low": stayLow, "shake_hands": handShake}
 
 def change_posture(posture):
-    if posture == "stay_low":
-        return stayLow()
-    elif posture == "shake_hands":
-        return handShake()
-    else:
-        return "Unknown posture"
+    command = _POSTURES.get(posture)
+    return command() if command else "Unknown posture"
 
 def eye_spy(action, user_guess=None):
     """
@@ -329,78 +145,102 @@ def robot_trivia(user_answer, correct_answer):
         return "Sorry, I encountered an error while playing trivia."
 
 
-def lightCtrl(colorName, cmdInput):
-    if not serial_manager:
-        return False
-        
-    colorNum = 0
-    if colorName == 'off':
-        colorNum = 0
-    elif colorName == 'blue':
-        colorNum = 1
-    elif colorName == 'red':
-        colorNum = 2
-    elif colorName == 'green':
-        colorNum = 3
-    elif colorName == 'yellow':
-        colorNum = 4
-    elif colorName == 'cyan':
-        colorNum = 5
-    elif colorName == 'magenta':
-        colorNum = 6
-    elif colorName == 'cyber':
-        colorNum = 7
-        
-    command = {'var': "light", 'val': colorNum}
-    result = serial_manager.send_command_sync('json', command)
+# Light color names and their firmware values, with the matching pre-encoded frame per value
+_COLOR_NUM = {'off': 0, 'blue': 1, 'red': 2, 'green': 3, 'yellow': 4, 'cyan': 5, 'magenta': 6, 'cyber': 7}
+_LIGHT_BYTES = tuple(encode_json_command({'var': "light", 'val': num}) for num in range(len(_COLOR_NUM)))
+
+@requires_serial()
+def lightCtrl(sm, colorName, cmdInput):
+    # Unknown color names turn the light off, as before
+    result = sm.send_command_async('raw_bytes', _LIGHT_BYTES[_COLOR_NUM.get(colorName, 0)], coalesce_key="light")
     
-    return result and result.get('success', False)
+    return result.success
 
-def buzzerCtrl(buzzerCtrl, cmdInput):
-    if not serial_manager:
-        return False
-        
-    command = {'var': "buzzer", 'val': buzzerCtrl}
-    result = serial_manager.send_command_sync('json', command)
+# Pre-encoded buzzer frames for the off (0) and on (1) values
+_BUZZER_BYTES = {val: encode_json_command({'var': "buzzer", 'val': val}) for val in (0, 1)}
+
+@requires_serial()
+def buzzerCtrl(sm, buzzerCtrl, cmdInput):
+    frame = _BUZZER_BYTES.get(buzzerCtrl) or encode_json_command({'var': "buzzer", 'val': buzzerCtrl})
+    result = sm.send_command_sync('raw_bytes', frame)
     
-    return result and result.get('success', False)
+    return result.success
 
-def testSerialConnection():
+@requires_serial()
+def batch(sm, commands):
+    """
+    Send several (var, val) commands back to back and wait once, for the last acknowledgment
+
+    Every command but the last is queued without waiting, so the UART round-trips overlap
+    instead of adding up; the worker sends in queue order, so the last acknowledgment means the
+    whole batch went out. Earlier failures are logged by the serial manager. Batched commands are
+    never coalesced, since e.g. forward-then-stop must send both.
+
+    Parameters:
+    - commands: Sequence of (var, val) pairs, e.g. [("move", 1), ("light", 2)]
+
+    Returns:
+    - bool: Whether the last command was acknowledged
+    """
+    if not commands:
+        return True
+    frames = [_CMD_BYTES.get((var, val)) or encode_json_command({'var': var, 'val': val})
+              for var, val in commands]
+    for frame in frames[:-1]:
+        sm.send_command_async('raw_bytes', frame)
+    result = sm.send_command_sync('raw_bytes', frames[-1])
+    if not result.success:
+        logger.error(f"Command batch failed: {result.error or 'Unknown error'}")
+    return result.success
+
+@requires_serial()
+def testSerialConnection(sm):
     """Simple test of serial connection with ping"""
-    if not serial_manager:
-        return False
-    
     try:
-        result = serial_manager.send_command_sync('text', 'PING', retry_count=1)
-        return result.get('success', False)
+        result = sm.send_command_sync('text', 'PING', retry_count=1)
+        return result.success
     except Exception as e:
         logger.error(f"Error testing serial connection: {e}")
         return False
 
-def getGyroData():
-    """Get gyroscope data from the robot"""
-    if not serial_manager:
-        return None
+@requires_serial(None)
+def getGyroData(sm, max_age=None):
+    """
+    Get gyroscope data from the robot
+    
+    Parameters:
+    - max_age: If given, return the cached packet when it is at most this many seconds old
+      instead of issuing a new GET_GYRO round-trip
+    """
+    if max_age is not None:
+        cached = sm.get_latest_gyro(max_age)
+        if cached:
+            return cached
     
     try:
-        result = serial_manager.send_command_sync('text', 'GET_GYRO', retry_count=1)
-        if result.get('success', False):
-            return result.get('data')
-        return None
+        result = sm.send_command_sync('text', 'GET_GYRO', retry_count=1)
+        return result.data if result.success else None
     except Exception as e:
         logger.error(f"Error getting gyro data: {e}")
         return None
 
-def getAccelData():
-    """Get accelerometer data from the robot"""
-    if not serial_manager:
-        return None
+@requires_serial(None)
+def getAccelData(sm, max_age=None):
+    """
+    Get accelerometer data from the robot
+    
+    Parameters:
+    - max_age: If given, return the cached packet when it is at most this many seconds old
+      instead of issuing a new GET_ACCEL round-trip
+    """
+    if max_age is not None:
+        cached = sm.get_latest_accel(max_age)
+        if cached:
+            return cached
     
     try:
-        result = serial_manager.send_command_sync('text', 'GET_ACCEL', retry_count=1)
-        if result.get('success', False):
-            return result.get('data')
-        return None
+        result = sm.send_command_sync('text', 'GET_ACCEL', retry_count=1)
+        return result.data if result.success else None
     except Exception as e:
         logger.error(f"Error getting accelerometer data: {e}")
         return None
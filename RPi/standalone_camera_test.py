@@ -8,9 +8,68 @@ import os
 import sys
 import time
 import datetime
+from concurrent.futures import ThreadPoolExecutor
 import cv2
 import numpy as np
 
+def open_camera(index=0):
+    """
+    Open the camera through V4L2, asking the sensor for MJPG frames
+    
+    With MJPG accepted and RGB conversion off, each read() returns the sensor's own JPEG as a
+    flat byte array, so screenshots can be written without a decode and re-encode.
+    
+    Parameters:
+    - index: Camera device index
+    
+    Returns:
+    - The opened cv2.VideoCapture
+    """
+    cap = cv2.VideoCapture(index, cv2.CAP_V4L2)
+    if not cap.isOpened():
+        # Not a V4L2 device; let OpenCV pick a backend
+        cap = cv2.VideoCapture(index)
+    cap.set(cv2.CAP_PROP_BUFFERSIZE, 1)  # Keep at most one queued frame so reads are fresh
+    mjpg = cv2.VideoWriter_fourcc(*'MJPG')
+    if cap.set(cv2.CAP_PROP_FOURCC, mjpg) and int(cap.get(cv2.CAP_PROP_FOURCC)) == mjpg:
+        cap.set(cv2.CAP_PROP_CONVERT_RGB, 0)
+    return cap
+
+def is_jpeg_buffer(frame):
+    """Whether a captured frame is still the sensor's compressed JPEG rather than a decoded image"""
+    return frame.ndim == 1 or frame.shape[0] == 1
+
+JPEG_QUALITY = 85  # Re-encode quality for decoded frames (OpenCV's default is 95)
+
+def save_frame(frame, filepath):
+    """
+    Write a captured frame to filepath as a JPEG
+    
+    MJPG frames are written as-is; decoded frames are encoded in memory at JPEG_QUALITY and
+    written with a single os.write().
+    
+    Parameters:
+    - frame: Frame returned by cap.read()
+    - filepath: Destination path
+    
+    Returns:
+    - bool: Whether the frame was written
+    """
+    if is_jpeg_buffer(frame):
+        data = frame.tobytes()
+    else:
+        ok, buf = cv2.imencode('.jpg', frame, [int(cv2.IMWRITE_JPEG_QUALITY), JPEG_QUALITY,
+                                               int(cv2.IMWRITE_JPEG_OPTIMIZE), 1])
+        if not ok:
+            return False
+        data = buf.tobytes()
+    fd = os.open(filepath, os.O_WRONLY | os.O_CREAT | os.O_TRUNC, 0o644)
+    try:
+        os.write(fd, data)
+    finally:
+        os.close(fd)
+    return True
+
 def capture_screenshots(num_screenshots=1, delay=1, save_dir=None):
     """
     Capture screenshots from the camera
@@ -32,7 +91,7 @@ def capture_screenshots(num_screenshots=1, delay=1, save_dir=None):
     
     # Initialize camera (use 0 for default camera)
     print("Opening camera...")
-    cap = cv2.VideoCapture(0)
+    cap = open_camera(0)
     
     # Check if camera opened successfully
     if not cap.isOpened():
@@ -41,31 +100,57 @@ def capture_screenshots(num_screenshots=1, delay=1, save_dir=None):
     
     saved_paths = []
     
+    # Encode and write on a background thread so each save overlaps the next capture; at most
+    # one frame is in flight, so memory stays bounded
+    pool = ThreadPoolExecutor(max_workers=1)
+    pending = None
+    
+    def finish(pending):
+        future, filepath, n = pending
+        if future.result():
+            print(f"Saved: {filepath}")
+            saved_paths.append(filepath)
+        else:
+            print(f"Error: Could not encode frame {n}")
+    
+    # Timestamp the batch once; a per-frame monotonic offset keeps names unique at any frame rate
+    prefix = datetime.datetime.now().strftime("%Y%m%d_%H%M%S")
+    t0 = time.monotonic_ns()
+    
     try:
         for i in range(num_screenshots):
             # Capture frame
             print(f"Capturing image {i+1}/{num_screenshots}...")
             ret, frame = cap.read()
+            t_last = time.monotonic()
             
             if not ret:
                 print(f"Error: Could not capture frame {i+1}")
                 continue
                 
             # Generate filename with timestamp
-            timestamp = datetime.datetime.now().strftime("%Y%m%d_%H%M%S")
-            filename = f"screenshot_{timestamp}_{i+1}.jpg"
+            filename = f"screenshot_{prefix}_{i+1}_{(time.monotonic_ns() - t0) // 1_000_000}ms.jpg"
             filepath = os.path.join(save_dir, filename)
             
-            # Save image
-            cv2.imwrite(filepath, frame)
-            print(f"Saved: {filepath}")
-            saved_paths.append(filepath)
+            # Save image; OpenCV reuses the frame buffer on the next read(), so hand off a copy
+            if pending:
+                finish(pending)
+            pending = (pool.submit(save_frame, frame.copy(), filepath), filepath, i+1)
             
-            # Wait before next capture
+            # Wait before next capture by draining frames instead of sleeping, so the driver
+            # never queues stale images and the next read() returns a current one
             if i < num_screenshots - 1:
-                time.sleep(delay)
+                while time.monotonic() - t_last < delay:
+                    if not cap.grab():
+                        # Camera stopped delivering; wait out the rest of the delay instead of spinning
+                        time.sleep(max(0.0, delay - (time.monotonic() - t_last)))
+                        break
+    
+        if pending:
+            finish(pending)
     
     finally:
+        pool.shutdown(wait=True)
         # Release camera
         cap.release()
         print("Camera released")
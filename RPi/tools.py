@@ -1,25 +1,32 @@
 #!/usr/bin/env/python3
 # File name   : tools.py
 # Description : Camera and LLM vision tools for the robot
+import asyncio
 import os
 import sys
 import time
 import json
-import base64
 import datetime
+import functools
+import importlib.util
 import logging
 import atexit
+import contextlib
+import threading
 from dotenv import load_dotenv
 import random
 
+# Also write the log to tools.log; off by default so normal runs do not write every line to the SD card
+LOG_TO_FILE = False
+
 # Configure logging
+_log_handlers = [logging.StreamHandler()]
+if LOG_TO_FILE:
+    _log_handlers.append(logging.FileHandler("tools.log"))
 logging.basicConfig(
     level=logging.INFO,
     format='%(asctime)s - %(name)s - %(levelname)s - %(message)s',
-    handlers=[
-        logging.StreamHandler(),
-        logging.FileHandler("tools.log")
-    ]
+    handlers=_log_handlers
 )
 logger = logging.getLogger("tools")
 
@@ -42,9 +49,19 @@ except ImportError as e:
 
 # Initialize OpenAI client
 try:
-    from openai import OpenAI
+    import httpx
+    from openai import AsyncOpenAI, OpenAI
+
+    # One long-lived pooled HTTP client so repeated vision calls reuse the same TCP+TLS session;
+    # HTTP/2 is used when the optional h2 package is installed
+    _http2 = importlib.util.find_spec("h2") is not None
+    _http_limits = httpx.Limits(max_keepalive_connections=4, keepalive_expiry=60)
+    _http_timeout = httpx.Timeout(60.0, connect=5.0)
+    _http_client = httpx.Client(http2=_http2, limits=_http_limits, timeout=_http_timeout)
+    atexit.register(_http_client.close)
+
     # Initialize with API key from environment variables
-    client = OpenAI(api_key=os.environ.get("OPENAI_API_KEY"))
+    client = OpenAI(api_key=os.environ.get("OPENAI_API_KEY"), http_client=_http_client)
     openai_available = True
 except ImportError:
     logger.warning("OpenAI library not installed. Vision features will be disabled.")
@@ -53,6 +70,13 @@ except Exception as e:
     logger.error(f"Error initializing OpenAI client: {e}")
     openai_available = False
 
+# Prefer pybase64 (SIMD libbase64, installed by setup.py) for encoding images, falling back to
+# the standard library; both expose the same b64encode()
+try:
+    import pybase64 as _b64
+except ImportError:
+    import base64 as _b64
+
 # Add numpy and OpenCV imports
 try:
     import numpy as np
@@ -60,11 +84,61 @@ try:
 except ImportError:
     logger.warning("NumPy or OpenCV is not installed. Camera functionality will be limited.")
 
+# Longest time takeScreenshot spends discarding frames that queued up while the camera was idle
+STALE_FRAME_DRAIN = 0.05
+# A grab() that blocks longer than this waited for the sensor, so it holds a fresh frame
+FRESH_GRAB_TIME = 0.005
+
+# Capture size requested from the sensor; 720 px already fits VISION_SHORT_SIDE, so frames
+# reach the model without a resize
+CAMERA_WIDTH = 1280
+CAMERA_HEIGHT = 720
+
+def open_camera(index=0):
+    """
+    Open the camera through V4L2 with MJPG frames at CAMERA_WIDTH x CAMERA_HEIGHT
+    
+    MJPG keeps USB transfers small and is decoded by libjpeg, instead of OpenCV converting raw
+    YUYV at full sensor resolution. The one-frame driver buffer means reads never return old frames.
+    """
+    cam = cv2.VideoCapture(index, cv2.CAP_V4L2)
+    if not cam.isOpened():
+        # Not a V4L2 device; let OpenCV pick a backend
+        cam = cv2.VideoCapture(index)
+    if not cam.isOpened():
+        return cam
+    if not cam.set(cv2.CAP_PROP_BUFFERSIZE, 1):
+        logger.warning("Camera backend ignored CAP_PROP_BUFFERSIZE; frames may be stale")
+    # FOURCC before the size: the driver picks the resolutions available for the format
+    if not cam.set(cv2.CAP_PROP_FOURCC, cv2.VideoWriter_fourcc(*'MJPG')):
+        logger.warning("Camera does not accept MJPG; using its default pixel format")
+    cam.set(cv2.CAP_PROP_FRAME_WIDTH, CAMERA_WIDTH)
+    cam.set(cv2.CAP_PROP_FRAME_HEIGHT, CAMERA_HEIGHT)
+    return cam
+
+def grab_fresh_frame(cam):
+    """
+    Read the newest frame, first draining frames the driver buffered since the last read
+    
+    Buffered frames are returned by grab() at once; the drain stops at the first grab() that has
+    to wait for the sensor, or after STALE_FRAME_DRAIN seconds.
+    
+    Returns:
+    - tuple: (ret, frame) as from cam.read()
+    """
+    drain_until = time.monotonic() + STALE_FRAME_DRAIN
+    while True:
+        started = time.monotonic()
+        if not cam.grab():
+            return False, None
+        if time.monotonic() - started > FRESH_GRAB_TIME or started > drain_until:
+            return cam.retrieve()
+
 # Initialize camera globally for faster access
 print("Initializing camera...")
 camera = None
 try:
-    camera = cv2.VideoCapture(0)
+    camera = open_camera(0)
     if not camera.isOpened():
         print("Warning: Could not open camera on startup")
     else:
@@ -72,8 +146,74 @@ try:
 except Exception as e:
     print(f"Error initializing camera: {e}")
 
+class CameraGrabber:
+    """
+    Background thread that keeps calling grab() on the shared camera
+    
+    The driver never queues stale frames, so a screenshot waits at most for the grab in progress
+    and then decodes that frame. Frames are decoded (retrieve()) only on demand, so the thread
+    costs no JPEG/YUV decode per frame. All camera access goes through claimed(), since
+    cv2.VideoCapture is not thread-safe; a plain lock is not fair and the grab loop would keep
+    re-taking it, so the loop waits on cond while any caller is queued for the camera.
+    """
+    def __init__(self):
+        self.cond = threading.Condition()
+        self.waiting = 0  # Callers queued for the camera; only changed under waiting_lock
+        self.waiting_lock = threading.Lock()
+        self.grabbed = False  # Whether the camera holds a grabbed, not yet superseded frame
+        self.stop_event = threading.Event()
+        self.thread = None
+    
+    def start(self):
+        self.thread = threading.Thread(target=self._run, name="camera-grabber", daemon=True)
+        self.thread.start()
+    
+    def stop(self):
+        self.stop_event.set()
+        if self.thread:
+            self.thread.join(1.0)
+    
+    @contextlib.contextmanager
+    def claimed(self):
+        """Hold the camera, making the grab loop hand it over before its next grab"""
+        with self.waiting_lock:
+            self.waiting += 1
+        try:
+            with self.cond:
+                yield
+        finally:
+            with self.waiting_lock:
+                self.waiting -= 1
+            with self.cond:
+                self.cond.notify_all()
+    
+    def _run(self):
+        while not self.stop_event.is_set():
+            with self.cond:
+                # Waiting releases the camera to the queued callers
+                if not self.cond.wait_for(lambda: not self.waiting, 0.1):
+                    continue
+                ok = camera is not None and camera.isOpened() and camera.grab()
+                self.grabbed = ok
+            if not ok:
+                # Camera missing or not delivering; takeScreenshot reopens it
+                self.stop_event.wait(0.1)
+    
+    def read(self):
+        """Decode the newest grabbed frame; returns (ret, frame) as from cv2.VideoCapture.read()"""
+        with self.claimed():
+            if self.grabbed:
+                return camera.retrieve()
+            # Nothing grabbed yet (just started or reopened); read directly
+            return grab_fresh_frame(camera)
+
+_grabber = CameraGrabber()
+if camera is not None and camera.isOpened():
+    _grabber.start()
+
 # Function to clean up resources when the script exits
 def cleanup():
+    _grabber.stop()
     if camera is not None and camera.isOpened():
         camera.release()
         print("Camera released during cleanup")
@@ -81,25 +221,33 @@ def cleanup():
 # Register the cleanup function to be called when the program exits
 atexit.register(cleanup)
 
+# Resolved once at import instead of on every call
+_HERE = os.path.dirname(os.path.abspath(__file__))
+TOOL_DESCRIPTIONS_PATH = os.path.join(_HERE, "tool_descriptions.json")
+DOG_EYES_PROMPT_PATH = os.path.join(os.path.dirname(_HERE), "dog_eyes.md")
+
 # Load tool descriptions
+@functools.lru_cache(maxsize=1)
 def load_tool_descriptions():
-    """Load tool descriptions from JSON file"""
+    """Load tool descriptions from JSON file (parsed once and cached; treat the result as read-only)"""
     try:
-        tool_path = os.path.join(os.path.dirname(__file__), "tool_descriptions.json")
-        with open(tool_path, 'r') as file:
+        with open(TOOL_DESCRIPTIONS_PATH, 'r') as file:
             return json.load(file)
     except Exception as e:
         logger.error(f"Error loading tool descriptions: {e}")
         return {"tools": []}
 
+@functools.lru_cache(maxsize=1)
 def read_dog_eyes_prompt():
     """
     Read the prompt content from dog_eyes.md file
     
+    The file is read once and cached for the rest of the run; call reload_prompt() after editing it.
+    
     Returns:
     - str: The content of the file or a default prompt if file cannot be read
     """
-    prompt_path = os.path.join(os.path.dirname(os.path.dirname(__file__)), "dog_eyes.md")
+    prompt_path = DOG_EYES_PROMPT_PATH
     
     try:
         if not os.path.exists(prompt_path):
@@ -114,6 +262,11 @@ def read_dog_eyes_prompt():
         logger.error(f"Error reading dog_eyes.md: {e}")
         return "Please describe what you see in this image in detail, focusing on objects and their positions."
 
+def reload_prompt():
+    """Drop the cached dog_eyes.md prompt and read it again"""
+    read_dog_eyes_prompt.cache_clear()
+    return read_dog_eyes_prompt()
+
 def encode_image(image_path):
     """
     Encode an image as base64
@@ -126,39 +279,108 @@ def encode_image(image_path):
     """
     try:
         with open(image_path, "rb") as image_file:
-            return base64.b64encode(image_file.read()).decode("utf-8")
+            return _b64.b64encode(image_file.read()).decode("utf-8")
     except Exception as e:
         logger.error(f"Error encoding image {image_path}: {e}")
         return None
 
-def takeScreenshot(num_screenshots=1, delay=1, save_dir=None):
+JPEG_QUALITY = 85
+# Frames sent to the vision model: it resamples images to at most 768 px on the short side, so
+# larger frames only cost upload bytes
+VISION_SHORT_SIDE = 768
+VISION_JPEG_QUALITY = 80
+
+def shrink_for_vision(frame, max_side=VISION_SHORT_SIDE):
+    """Downscale a frame so its short side is at most max_side pixels (smaller frames are returned as-is)"""
+    h, w = frame.shape[:2]
+    scale = max_side / min(h, w)
+    if scale >= 1:
+        return frame
+    return cv2.resize(frame, (int(w * scale), int(h * scale)), interpolation=cv2.INTER_AREA)
+
+def frame_to_jpeg(frame, quality=JPEG_QUALITY):
     """
-    Capture screenshots using the pre-initialized camera
+    JPEG encode a frame in memory
     
     Parameters:
-    - num_screenshots: Number of screenshots to take
-    - delay: Time in seconds between screenshots
-    - save_dir: Directory to save screenshots (defaults to 'screenshots')
+    - frame: BGR image as returned by the camera
+    - quality: JPEG quality (0-100)
     
     Returns:
-    - List of saved screenshot paths
+    - numpy.ndarray: JPEG data as a flat uint8 buffer, or None if encoding failed
     """
+    ok, buf = cv2.imencode('.jpg', frame, [int(cv2.IMWRITE_JPEG_QUALITY), quality])
+    return buf if ok else None
+
+def frame_to_b64(frame, quality=JPEG_QUALITY):
+    """
+    JPEG encode a frame in memory and base64 encode it, without touching the disk
+    
+    Returns:
+    - str: Base64 encoded JPEG, or None if encoding failed
+    """
+    jpeg = frame_to_jpeg(frame, quality)
+    if jpeg is None:
+        return None
+    # b64encode reads the imencode buffer in place; tobytes() would copy the whole JPEG first
+    return _b64.b64encode(memoryview(jpeg).cast('B')).decode("ascii")
+
+def _ensure_camera():
+    """Make sure the global camera is open and its grabber thread is running"""
     global camera
     
-    # Set up default save directory
-    if save_dir is None:
-        save_dir = 'screenshots'
+    with _grabber.claimed():
+        if camera is None or not camera.isOpened():
+            print("Camera not available, attempting to initialize...")
+            camera = open_camera(0)
+            _grabber.grabbed = False
+            if not camera.isOpened():
+                print("Error: Could not open camera")
+                return False
+    if _grabber.thread is None:
+        _grabber.start()
+    return True
+
+def capture_frame():
+    """
+    Capture a single frame from the camera without saving it
     
-    # Create directory if it doesn't exist
-    os.makedirs(save_dir, exist_ok=True)
+    Returns:
+    - numpy.ndarray: The newest BGR frame, or None if the camera is unavailable
+    """
+    if not _ensure_camera():
+        return None
+    ret, frame = _grabber.read()
+    return frame if ret else None
+
+def takeScreenshot(num_screenshots=1, delay=1, save_dir=None, save_to_disk=False):
+    """
+    Capture screenshots using the pre-initialized camera
     
+    Parameters:
+    - num_screenshots: Number of screenshots to take
+    - delay: Time in seconds between screenshots
+    - save_dir: Directory to save screenshots (defaults to 'screenshots'); only used with save_to_disk
+    - save_to_disk: Write each frame to save_dir as a JPEG; by default the frames are only
+      returned in memory and nothing touches the SD card
+    
+    Returns:
+    - List of saved screenshot paths with save_to_disk, otherwise list of captured frames
+    """
     # Check if camera is initialized and open
-    if camera is None or not camera.isOpened():
-        print("Camera not available, attempting to initialize...")
-        camera = cv2.VideoCapture(0)
-        if not camera.isOpened():
-            print("Error: Could not open camera")
-            return []
+    if not _ensure_camera():
+        return []
+    
+    if save_to_disk:
+        # Set up default save directory
+        if save_dir is None:
+            save_dir = 'screenshots'
+        
+        # Create directory if it doesn't exist
+        os.makedirs(save_dir, exist_ok=True)
+        
+        # Timestamp formatted once per call; the index keeps the filenames apart
+        prefix = os.path.join(save_dir, f"screenshot_{datetime.datetime.now().strftime('%Y%m%d_%H%M%S')}_")
     
     saved_paths = []
     
@@ -166,21 +388,20 @@ def takeScreenshot(num_screenshots=1, delay=1, save_dir=None):
         for i in range(num_screenshots):
             # Capture frame
             print(f"Capturing image {i+1}/{num_screenshots}...")
-            ret, frame = camera.read()
+            ret, frame = _grabber.read()
             
             if not ret:
                 print(f"Error: Could not capture frame {i+1}")
                 continue
-                
-            # Generate filename with timestamp
-            timestamp = datetime.datetime.now().strftime("%Y%m%d_%H%M%S")
-            filename = f"screenshot_{timestamp}_{i+1}.jpg"
-            filepath = os.path.join(save_dir, filename)
             
-            # Save image
-            cv2.imwrite(filepath, frame)
-            print(f"Saved: {filepath}")
-            saved_paths.append(filepath)
+            if not save_to_disk:
+                saved_paths.append(frame)
+            else:
+                # Save image
+                filepath = f"{prefix}{i+1}.jpg"
+                cv2.imwrite(filepath, frame)
+                print(f"Saved: {filepath}")
+                saved_paths.append(filepath)
             
             # Wait before next capture
             if i < num_screenshots - 1:
@@ -191,14 +412,77 @@ def takeScreenshot(num_screenshots=1, delay=1, save_dir=None):
     
     return saved_paths
 
-def sendImageToLLM(image_path, custom_prompt=None, model="gpt-4o"):
+# Upload images as raw JPEG bytes through the Files API (purpose "vision") and reference them by
+# file ID, instead of inlining them as base64 data URIs, which are a third larger. Costs one
+# extra HTTPS request per image, so it only pays off on a slow uplink; off by default.
+USE_BINARY_UPLOAD = False
+
+def _read_jpeg(image_path, frame, quality=JPEG_QUALITY):
+    """JPEG bytes for a frame (encoded in memory) or an image file; None on failure"""
+    if frame is not None:
+        jpeg = frame_to_jpeg(frame, quality)
+        return jpeg.tobytes() if jpeg is not None else None
+    try:
+        with open(image_path, "rb") as image_file:
+            return image_file.read()
+    except Exception as e:
+        logger.error(f"Error reading image {image_path}: {e}")
+        return None
+
+def _delete_uploaded_file(file_id):
+    try:
+        client.files.delete(file_id)
+    except Exception as e:
+        logger.warning(f"Could not delete uploaded image {file_id}: {e}")
+
+def _describe_uploaded_image(jpeg, prompt, model):
+    """Upload JPEG bytes as a vision file, ask the model about it and return the reply text"""
+    uploaded = client.files.create(file=("frame.jpg", jpeg, "image/jpeg"), purpose="vision")
+    try:
+        response = client.responses.create(
+            model=model,
+            input=[
+                {
+                    "role": "user",
+                    "content": [
+                        {"type": "input_text", "text": prompt},
+                        {"type": "input_image", "file_id": uploaded.id},
+                    ],
+                }
+            ],
+        )
+        return response.output_text
+    finally:
+        # Uploaded images are only needed for this one request; delete off the reply path
+        threading.Thread(target=_delete_uploaded_file, args=(uploaded.id,), daemon=True).start()
+
+def _build_vision_messages(prompt, *base64_images):
+    """Build the chat messages for one or more base64 JPEG images and their prompt, in a single user turn"""
+    return [
+        {
+            "role": "user",
+            "content": [{"type": "text", "text": prompt}] + [
+                {
+                    "type": "image_url",
+                    "image_url": {
+                        "url": f"data:image/jpeg;base64,{base64_image}",
+                    },
+                }
+                for base64_image in base64_images
+            ],
+        }
+    ]
+
+def sendImageToLLM(image_path, custom_prompt=None, model="gpt-4o", frame=None, jpeg_quality=JPEG_QUALITY):
     """
     Send an image to OpenAI's GPT-4 Vision model for analysis
     
     Parameters:
-    - image_path: Path to the image file
+    - image_path: Path to the image file (ignored when frame is given)
     - custom_prompt: Optional custom prompt to use instead of dog_eyes.md
     - model: OpenAI model to use (defaults to GPT-4 Vision)
+    - frame: Optional camera frame to encode in memory instead of reading image_path
+    - jpeg_quality: JPEG quality used to encode frame
     
     Returns:
     - str: The model's response or error message
@@ -207,38 +491,34 @@ def sendImageToLLM(image_path, custom_prompt=None, model="gpt-4o"):
         return "Error: OpenAI library not available. Cannot process image."
     
     # Check if image exists
-    if not os.path.exists(image_path):
+    if frame is None and not os.path.exists(image_path):
         logger.error(f"Image file not found: {image_path}")
         return f"Error: Image file not found: {image_path}"
     
     try:
+        # Get prompt from dog_eyes.md or use custom prompt
+        prompt = custom_prompt if custom_prompt else read_dog_eyes_prompt()
+        
+        if USE_BINARY_UPLOAD:
+            jpeg = _read_jpeg(image_path, frame, jpeg_quality)
+            if not jpeg:
+                return "Error: Could not encode image"
+            logger.info(f"Uploading image {image_path or 'from camera'} to OpenAI API")
+            response = _describe_uploaded_image(jpeg, prompt, model)
+            logger.info("Successfully received response from OpenAI API")
+            return response
+        
         # Encode the image
-        base64_image = encode_image(image_path)
+        base64_image = frame_to_b64(frame, jpeg_quality) if frame is not None else encode_image(image_path)
         if not base64_image:
             return "Error: Could not encode image"
         
-        # Get prompt from dog_eyes.md or use custom prompt
-        prompt = custom_prompt if custom_prompt else read_dog_eyes_prompt()
-        
-        logger.info(f"Sending image {image_path} to OpenAI API")
+        logger.info(f"Sending image {image_path or 'from camera'} to OpenAI API")
         
         # Send request to OpenAI
         completion = client.chat.completions.create(
             model=model,
-            messages=[
-                {
-                    "role": "user",
-                    "content": [
-                        {"type": "text", "text": prompt},
-                        {
-                            "type": "image_url",
-                            "image_url": {
-                                "url": f"data:image/jpeg;base64,{base64_image}",
-                            },
-                        },
-                    ],
-                }
-            ],
+            messages=_build_vision_messages(prompt, base64_image),
         )
         
         # Extract and return the response
@@ -250,26 +530,195 @@ def sendImageToLLM(image_path, custom_prompt=None, model="gpt-4o"):
         logger.error(f"Error in sendImageToLLM: {e}", exc_info=True)
         return f"Error processing image with OpenAI: {str(e)}"
 
-def view_surroundings():
+# Recent view_surroundings descriptions keyed by a perceptual hash of the frame, so an unchanged
+# scene is not sent to the model again
+VISION_CACHE_SIZE = 8
+VISION_CACHE_TTL = 30.0  # Seconds a cached description stays valid
+VISION_HASH_DISTANCE = 6  # Maximum differing hash bits (of 64) for two frames to count as the same view
+_vision_cache = []  # [(dhash, description, monotonic timestamp, motion epoch)], newest last
+# Bumped by every movement tool; a description cached before the robot moved never matches again
+_motion_epoch = 0
+
+def frame_dhash(frame):
+    """64-bit difference hash of a frame: whether each pixel of a 9x8 grayscale thumbnail is brighter than its left neighbour"""
+    gray = cv2.cvtColor(frame, cv2.COLOR_BGR2GRAY) if frame.ndim == 3 else frame
+    small = cv2.resize(gray, (9, 8), interpolation=cv2.INTER_AREA)
+    return int.from_bytes(np.packbits(small[:, 1:] > small[:, :-1]).tobytes(), "big")
+
+def _cached_view(dhash):
+    """Return a still-valid cached description for a frame hash, or None"""
+    now = time.monotonic()
+    _vision_cache[:] = [entry for entry in _vision_cache
+                        if now - entry[2] <= VISION_CACHE_TTL and entry[3] == _motion_epoch]
+    for cached_hash, description, _, _ in reversed(_vision_cache):
+        if bin(dhash ^ cached_hash).count("1") <= VISION_HASH_DISTANCE:
+            return description
+    return None
+
+def _cache_view(dhash, description):
+    _vision_cache.append((dhash, description, time.monotonic(), _motion_epoch))
+    del _vision_cache[:-VISION_CACHE_SIZE]
+
+def sendImagesToLLM(images, custom_prompt=None, model="gpt-4o", jpeg_quality=JPEG_QUALITY):
+    """
+    Send several images to OpenAI's vision model in one request, so it sees them together
+    
+    Parameters:
+    - images: Camera frames and/or image file paths, in order
+    - custom_prompt: Optional custom prompt to use instead of dog_eyes.md
+    - model: OpenAI model to use (defaults to GPT-4 Vision)
+    - jpeg_quality: JPEG quality used to encode frames
+    
+    Returns:
+    - str: The model's response or error message
+    """
+    if not openai_available:
+        return "Error: OpenAI library not available. Cannot process image."
+    
+    try:
+        base64_images = [encode_image(image) if isinstance(image, str) else frame_to_b64(image, jpeg_quality)
+                         for image in images]
+        if not base64_images or not all(base64_images):
+            return "Error: Could not encode image"
+        
+        prompt = custom_prompt if custom_prompt else read_dog_eyes_prompt()
+        logger.info(f"Sending {len(base64_images)} images to OpenAI API in one request")
+        completion = client.chat.completions.create(
+            model=model,
+            messages=_build_vision_messages(prompt, *base64_images),
+        )
+        response = completion.choices[0].message.content
+        logger.info("Successfully received response from OpenAI API")
+        return response
+    
+    except Exception as e:
+        logger.error(f"Error in sendImagesToLLM: {e}", exc_info=True)
+        return f"Error processing images with OpenAI: {str(e)}"
+
+def view_surroundings(save_to_disk=False, max_side=VISION_SHORT_SIDE, jpeg_quality=VISION_JPEG_QUALITY,
+                      num_frames=1, frame_interval=0.1):
     """
     Tool function that captures a photo and sends it to LLM for analysis
     
+    Parameters:
+    - save_to_disk: Also save the photo under screenshots/ (for debugging); by default the frame
+      is encoded in memory and never written to the SD card
+    - max_side: Short-side size in pixels the frame is downscaled to before sending
+    - jpeg_quality: JPEG quality of the frame sent to the model
+    - num_frames: Frames to capture, frame_interval seconds apart; more than one are sent together
+      in a single request so the model gets temporal context
+    
     Returns:
     - A description of what the robot sees from the LLM
     """
-    # Take screenshot
-    screenshots = takeScreenshot(1)
+    if num_frames > 1 and not save_to_disk:
+        frames = [shrink_for_vision(frame, max_side) for frame in takeScreenshot(num_frames, frame_interval)]
+        if not frames:
+            return "Error: Failed to capture any images of surroundings."
+        description = sendImagesToLLM(frames, jpeg_quality=jpeg_quality)
+        logger.info(f"Received description from LLM: {description}")
+        return description
+    
+    if save_to_disk:
+        # Take screenshot
+        screenshots = takeScreenshot(1, save_to_disk=True)
+        
+        # Check if screenshots were taken successfully
+        if not screenshots:
+            return "Error: Failed to capture any images of surroundings."
+        
+        # Send the most recent screenshot to LLM
+        image_path = screenshots[-1]
+        logger.info(f"Sending image {image_path} to LLM for analysis")
+        description = sendImageToLLM(image_path)
+    else:
+        frame = capture_frame()
+        if frame is None:
+            return "Error: Failed to capture any images of surroundings."
+        frame = shrink_for_vision(frame, max_side)
+        
+        # Same view as a recent call (and the robot has not moved since): reuse its description
+        dhash = frame_dhash(frame)
+        cached = _cached_view(dhash)
+        if cached is not None:
+            logger.info("Scene unchanged, reusing cached description")
+            return cached
+        
+        logger.info("Sending camera frame to LLM for analysis")
+        description = sendImageToLLM(None, frame=frame, jpeg_quality=jpeg_quality)
+        if not description.startswith("Error"):
+            _cache_view(dhash, description)
+    
+    # Get and return description
+    logger.info(f"Received description from LLM: {description}")
+    return description
+
+# AsyncOpenAI client for the event loop that created it; httpx async connections cannot be
+# shared across loops, so each asyncio.run() gets its own pooled client
+_async_client = (None, None)
+
+def _get_async_client():
+    global _async_client
+    loop = asyncio.get_running_loop()
+    if _async_client[0] is not loop:
+        http_client = httpx.AsyncClient(http2=_http2, limits=_http_limits, timeout=_http_timeout)
+        _async_client = (loop, AsyncOpenAI(api_key=os.environ.get("OPENAI_API_KEY"), http_client=http_client))
+    return _async_client[1]
+
+async def sendImageToLLMAsync(base64_image, custom_prompt=None, model="gpt-4o"):
+    """
+    Send a base64 encoded JPEG to OpenAI's vision model without blocking the event loop
+    
+    Parameters:
+    - base64_image: Base64 encoded JPEG image
+    - custom_prompt: Optional custom prompt to use instead of dog_eyes.md
+    - model: OpenAI model to use (defaults to GPT-4 Vision)
+    
+    Returns:
+    - str: The model's response or error message
+    """
+    if not openai_available:
+        return "Error: OpenAI library not available. Cannot process image."
+    
+    try:
+        prompt = custom_prompt if custom_prompt else read_dog_eyes_prompt()
+        completion = await _get_async_client().chat.completions.create(
+            model=model,
+            messages=_build_vision_messages(prompt, base64_image),
+        )
+        return completion.choices[0].message.content
+    except Exception as e:
+        logger.error(f"Error in sendImageToLLMAsync: {e}", exc_info=True)
+        return f"Error processing image with OpenAI: {str(e)}"
+
+async def view_surroundings_async(max_side=VISION_SHORT_SIDE, jpeg_quality=VISION_JPEG_QUALITY):
+    """
+    Async view_surroundings for look/decide/move loops running on an event loop
     
-    # Check if screenshots were taken successfully
-    if not screenshots:
+    Capture and encoding run in a worker thread and the request is awaited, so the loop can
+    start moving or capturing the next frame while this description is in flight (the camera
+    grabber keeps the next frame current meanwhile).
+    
+    Returns:
+    - A description of what the robot sees from the LLM
+    """
+    frame = await asyncio.to_thread(capture_frame)
+    if frame is None:
         return "Error: Failed to capture any images of surroundings."
+    frame = shrink_for_vision(frame, max_side)
     
-    # Send the most recent screenshot to LLM
-    image_path = screenshots[-1]
-    logger.info(f"Sending image {image_path} to LLM for analysis")
+    dhash = frame_dhash(frame)
+    cached = _cached_view(dhash)
+    if cached is not None:
+        logger.info("Scene unchanged, reusing cached description")
+        return cached
     
-    # Get and return description
-    description = sendImageToLLM(image_path)
+    base64_image = await asyncio.to_thread(frame_to_b64, frame, jpeg_quality)
+    if not base64_image:
+        return "Error: Could not encode image"
+    description = await sendImageToLLMAsync(base64_image)
+    if not description.startswith("Error"):
+        _cache_view(dhash, description)
     logger.info(f"Received description from LLM: {description}")
     return description
 
@@ -277,7 +726,7 @@ def test_camera(num_screenshots=1, delay=1, save_dir=None):
     """
     Test camera functionality by taking screenshots
     """
-    return takeScreenshot(num_screenshots, delay, save_dir)
+    return takeScreenshot(num_screenshots, delay, save_dir, save_to_disk=True)
 
 def move_distance(distance_cm, speed=70, timeout=30):
     """
@@ -296,6 +745,8 @@ def move_distance(distance_cm, speed=70, timeout=30):
         logger.error(error_msg)
         return error_msg
     
+    global _motion_epoch
+    _motion_epoch += 1
     logger.info(f"Moving {distance_cm} cm at speed {speed}")
     
     try:
@@ -303,67 +754,33 @@ def move_distance(distance_cm, speed=70, timeout=30):
         FORWARD_SPEED_CM_PER_SEC = 15
         BACKWARD_SPEED_CM_PER_SEC = 20
         
-        # Calculate expected movement time based on distance and speed
+        # Calculate expected movement time based on distance and speed, capped by the timeout
         if distance_cm >= 0:
-            # Forward movement
-            logger.info(f"Starting forward movement: {distance_cm} cm")
+            direction, start_command = "forward", robot.forward
             expected_time = distance_cm / FORWARD_SPEED_CM_PER_SEC
-            
-            # Try to move forward with up to 3 retries
-            success = False
-            for attempt in range(1, 4):
-                if robot.forward(speed):
-                    success = True
-                    logger.debug(f"Forward command sent successfully on attempt {attempt}")
-                    break
-                logger.warning(f"Forward command failed, retrying ({attempt}/3)")
-                time.sleep(0.2)  # Short delay before retry
-                
-            if not success:
-                return "Failed to send forward movement command after 3 attempts"
-                
         else:
-            # Backward movement
-            logger.info(f"Starting backward movement: {abs(distance_cm)} cm")
+            direction, start_command = "backward", robot.backward
             expected_time = abs(distance_cm) / BACKWARD_SPEED_CM_PER_SEC
-            
-            # Try to move backward with up to 3 retries
-            success = False
-            for attempt in range(1, 4):
-                if robot.backward(speed):
-                    success = True
-                    logger.debug(f"Backward command sent successfully on attempt {attempt}")
-                    break
-                logger.warning(f"Backward command failed, retrying ({attempt}/3)")
-                time.sleep(0.2)  # Short delay before retry
-                
-            if not success:
-                return "Failed to send backward movement command after 3 attempts"
-        
-        # Cap the movement time by the timeout
         movement_time = min(expected_time, timeout)
-        logger.info(f"Moving for {movement_time:.2f} seconds")
-        
-        # Wait for the calculated time
-        time.sleep(movement_time)
-        
-        # Stop movement with retries
-        stop_success = False
-        for attempt in range(1, 200):
-            if distance_cm >= 0:
-                if robot.stopFB():
-                    stop_success = True
-                    logger.info("Forward movement stopped")
-                    break
-            else:
-                if robot.stopFB():
-                    stop_success = True
-                    logger.info("Backward movement stopped")
-                    break
-            time.sleep(0.05)
-                
-            logger.warning(f"Stop command failed, retrying ({attempt}/3)")
-            time.sleep(0.1)  # Short delay before retry
+        
+        # Motion commands report whether they were queued; a refusal (no serial manager)
+        # would not change on a retry
+        started = start_command(speed)
+        # Time the move from the start command, so the logging below does not stretch it
+        stop_deadline = time.monotonic() + movement_time
+        if not started:
+            return f"Failed to send {direction} movement command"
+        logger.info(f"Moving {direction} {abs(distance_cm)} cm for {movement_time:.2f} seconds")
+        
+        # Wait out the rest of the calculated time
+        remaining = stop_deadline - time.monotonic()
+        if remaining > 0:
+            time.sleep(remaining)
+        
+        # Stop movement
+        stop_success = robot.stopFB()
+        if stop_success:
+            logger.info(f"{direction.capitalize()} movement stopped")
         
         if not stop_success:
             return f"Warning: Movement completed but failed to send stop command. Moved approximately {distance_cm} cm."
@@ -384,6 +801,64 @@ def move_distance(distance_cm, speed=70, timeout=30):
         logger.error(error_msg, exc_info=True)
         return error_msg
 
+class GyroReader:
+    """
+    Background thread that keeps requesting gyro packets into a latest-sample slot
+    
+    Runs only while a rotation is in progress. The control loop reads the slot instead of doing
+    its own blocking GET_GYRO round-trip, so the next request is already on the wire while the
+    loop evaluates the previous sample. Every stored sample gets a sequence number, letting
+    readers wait for a newer one instead of re-checking the same packet.
+    """
+    def __init__(self):
+        self.cond = threading.Condition()
+        self.latest = None  # Newest gyro packet
+        self.seq = 0  # Incremented for every stored packet
+        self.stop_event = threading.Event()
+        self.thread = None
+    
+    def start(self):
+        if self.thread and self.thread.is_alive():
+            return
+        self.stop_event.clear()
+        self.thread = threading.Thread(target=self._run, name="gyro-reader", daemon=True)
+        self.thread.start()
+    
+    def stop(self):
+        self.stop_event.set()
+        if self.thread:
+            self.thread.join(1.0)
+            self.thread = None
+    
+    def _run(self):
+        while not self.stop_event.is_set():
+            gyro_data = robot.getGyroData()
+            if not gyro_data:
+                self.stop_event.wait(0.05)
+                continue
+            with self.cond:
+                self.latest = gyro_data
+                self.seq += 1
+                self.cond.notify_all()
+    
+    def read(self, after_seq=0, timeout=0.5):
+        """
+        Return (seq, packet) for the newest sample, waiting up to timeout for one newer than after_seq
+        
+        packet is None if nothing has been read yet; seq equals after_seq if no newer sample arrived.
+        """
+        with self.cond:
+            self.cond.wait_for(lambda: self.seq > after_seq, timeout)
+            return self.seq, self.latest
+
+_gyro_reader = GyroReader()
+
+# Expected turn rate in gyro degrees per second, the same figure the timed turns in the top-level
+# robot.py use (turnRightConstant); only the starting estimate, refined from the samples
+TURN_RATE = 90.0
+# Seconds from deciding to stop until the motors actually stop (serial queue plus firmware)
+STOP_LATENCY = 0.05
+
 def rotate_to_angle(target_angle, speed=100, timeout=20):
     """
     Rotate the robot to reach a specified angle using gyroscope feedback
@@ -403,6 +878,8 @@ def rotate_to_angle(target_angle, speed=100, timeout=20):
         logger.error(error_msg)
         return {"success": False, "error": error_msg}
     
+    global _motion_epoch
+    _motion_epoch += 1
     logger.info(f"Rotating to angle {target_angle}° at speed {speed}")
     
     # Reset gyroscope angles to start from zero with retries
@@ -443,75 +920,60 @@ def rotate_to_angle(target_angle, speed=100, timeout=20):
     
     start_time = time.time()
     last_print_time = start_time
-    print_interval = 0.5  # Print debug info every 0.5 seconds
+    print_interval = 0.5  # Log progress every 0.5 seconds
+    debug = logger.isEnabledFor(logging.DEBUG)  # Checked once, not on every loop iteration
     
     try:
+        # Determine direction and send command once; the firmware keeps turning until stopLR(),
+        # so the loop below only watches the gyro - FIXED DIRECTION LOGIC
+        if target_angle < 0:
+            # Turn LEFT (counter-clockwise) for negative target angle
+            # This was incorrectly set to right() before
+            rotation_success = robot.left(speed)
+        else:
+            # Turn RIGHT (clockwise) for positive target angle
+            # This was incorrectly set to left() before
+            rotation_success = robot.right(speed)
+        
+        if not rotation_success:
+            error_msg = "Failed to send rotation command"
+            logger.error(error_msg)
+            return {"success": False, "error": error_msg}
+        
+        _gyro_reader.start()
+        seq = _gyro_reader.seq
+        direction = 1 if target_angle >= 0 else -1
+        turn_rate = TURN_RATE
+        prev_change, prev_time = 0.0, time.monotonic()
         while time.time() - start_time < timeout:
-            # Determine direction and send command - FIXED DIRECTION LOGIC
-            rotation_success = False
-            for attempt in range(1, 4):
-                if target_angle < 0:
-                    # Turn LEFT (counter-clockwise) for negative target angle
-                    # This was incorrectly set to right() before
-                    if robot.left(speed):
-                        rotation_success = True
-                        if attempt > 1:
-                            logger.info(f"Rotation command sent successfully on attempt {attempt}")
-                        break
-                else:
-                    # Turn RIGHT (clockwise) for positive target angle
-                    # This was incorrectly set to left() before
-                    if robot.right(speed):
-                        rotation_success = True
-                        if attempt > 1:
-                            logger.info(f"Rotation command sent successfully on attempt {attempt}")
-                        break
-                logger.warning(f"Rotation command failed, retrying ({attempt}/3)")
-                time.sleep(0.05)  # Short delay before retry
-            
-            if not rotation_success:
-                error_msg = "Failed to send rotation command after 3 attempts"
-                logger.error(error_msg)
-                return {"success": False, "error": error_msg}
-            
-            # Wait a short time for rotation to have an effect
-            time.sleep(0.05)
-            
-            # Get current gyroscope data with retries
-            gyro_data = None
-            for attempt in range(1, 4):
-                gyro_data = robot.getGyroData()
-                if gyro_data:
-                    break
-                time.sleep(0.05)
-                
-            if not gyro_data:
+            # Wait for a gyro sample newer than the last one evaluated
+            new_seq, gyro_data = _gyro_reader.read(seq)
+            if new_seq == seq:
                 logger.warning("Failed to get gyro data during rotation")
                 continue
+            seq = new_seq
                 
             # Invert the current angle for correct direction processing
             current_angle = -gyro_data['angle_z']
             angle_change = current_angle - start_angle
             
             # Print debug info periodically
-            if time.time() - last_print_time > print_interval:
-                debug_msg = f"Current: {current_angle:.2f}° (inverted), Change: {angle_change:.2f}°, Target: {target_angle}°"
-                logger.info(debug_msg)
-                print(debug_msg)
+            if debug and time.time() - last_print_time > print_interval:
+                logger.debug("Current: %.2f° (inverted), Change: %.2f°, Target: %s°",
+                             current_angle, angle_change, target_angle)
                 last_print_time = time.time()
             
-            # UPDATED STOPPING CONDITION: Check if we've exceeded the target angle
-            if (target_angle >= 0 and angle_change >= target_angle) or \
-               (target_angle < 0 and angle_change <= target_angle):
-                # Stop rotation with retries
-                stop_success = False
-                for attempt in range(1, 4):
-                    if robot.stopLR():
-                        stop_success = True
-                        break
-                    time.sleep(0.05)
-                
-                if not stop_success:
+            # Smooth the measured turn rate, then stop as soon as the angle still to go would be
+            # covered before a stop issued now takes effect (next sample plus STOP_LATENCY)
+            now = time.monotonic()
+            sample_dt = now - prev_time
+            if sample_dt > 0:
+                turn_rate = 0.5 * turn_rate + 0.5 * abs(angle_change - prev_change) / sample_dt
+            prev_change, prev_time = angle_change, now
+            remaining = direction * (target_angle - angle_change)
+            if remaining <= turn_rate * (sample_dt + STOP_LATENCY):
+                # Stop rotation
+                if not robot.stopLR():
                     logger.warning("Failed to send stop command after reaching target angle")
                 
                 logger.info(f"Target angle reached! Final angle: {current_angle}° (inverted)")
@@ -523,19 +985,10 @@ def rotate_to_angle(target_angle, speed=100, timeout=20):
                     "time": time.time() - start_time
                 }
             
-            # Small delay to prevent CPU overload
-            time.sleep(0.01)
-            
         # If we get here, we've timed out
-        # Stop rotation with retries
-        stop_success = False
-        while True:
-            if robot.stopLR():
-                stop_success = True
-                break
-            time.sleep(0.02)
-        
-        if not stop_success:
+        # Stop rotation
+        _gyro_reader.stop()
+        if not robot.stopLR():
             logger.warning("Failed to send stop command after timeout")
         
         # Get final angle with retries
@@ -568,11 +1021,8 @@ def rotate_to_angle(target_angle, speed=100, timeout=20):
     except Exception as e:
         # Ensure robot stops if there's an error
         try:
-            for attempt in range(1, 4):
-                if robot.stopLR():
-                    logger.info("Emergency stop after error")
-                    break
-                time.sleep(0.05)
+            if robot.stopLR():
+                logger.info("Emergency stop after error")
         except:
             pass
             
@@ -582,6 +1032,8 @@ def rotate_to_angle(target_angle, speed=100, timeout=20):
             "success": False,
             "error": str(e)
         }
+    finally:
+        _gyro_reader.stop()
 
 # Add at the top with other imports
 import random
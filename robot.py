@@ -6,7 +6,8 @@ import json
 import serial
 import sys
 
-ser = serial.Serial("/dev/ttyS0",115200)
+# Bounded timeouts so a stalled UART raises instead of blocking the caller forever
+ser = serial.Serial("/dev/ttyS0",115200, timeout=0.05, write_timeout=0.05)
 dataCMD = json.dumps({'var':"", 'val':0, 'ip':""})
 upperGlobalIP = 'UPPER IP'
 
@@ -19,109 +20,108 @@ turnLeftConstant = 90
 moveForwardConstant = 15
 moveBackwardConstant = 20
 
+# Serialized command frames, encoded once at import instead of on every call
+_CMD = {
+	'forward': json.dumps({'var':"move", 'val':1}).encode(),
+	'backward': json.dumps({'var':"move", 'val':5}).encode(),
+	'left': json.dumps({'var':"move", 'val':2}).encode(),
+	'right': json.dumps({'var':"move", 'val':4}).encode(),
+	'stopLR': json.dumps({'var':"move", 'val':6}).encode(),
+	'stopFB': json.dumps({'var':"move", 'val':3}).encode(),
+	'lookUp': json.dumps({'var':"ges", 'val':1}).encode(),
+	'lookDown': json.dumps({'var':"ges", 'val':2}).encode(),
+	'lookStopUD': json.dumps({'var':"ges", 'val':3}).encode(),
+	'lookLeft': json.dumps({'var':"ges", 'val':4}).encode(),
+	'lookRight': json.dumps({'var':"ges", 'val':5}).encode(),
+	'lookStopLR': json.dumps({'var':"ges", 'val':6}).encode(),
+	'steadyMode': json.dumps({'var':"funcMode", 'val':1}).encode(),
+	'jump': json.dumps({'var':"funcMode", 'val':4}).encode(),
+	'handShake': json.dumps({'var':"funcMode", 'val':3}).encode(),
+}
+
+def send_batch(*names):
+	"""
+	Send several fixed commands in one serial write
+
+	Parameters:
+	- names: Command names from _CMD, e.g. send_batch('stopLR', 'stopFB')
+	"""
+	ser.write(b''.join(_CMD[name] for name in names))
+	ser.flush()
+
 def setUpperIP(ipInput):
 	global upperGlobalIP
 	upperGlobalIP = ipInput
 
 def forward(speed=100):
-	dataCMD = json.dumps({'var':"move", 'val':1})
-	ser.write(dataCMD.encode())
+	ser.write(_CMD['forward'])
 	print('robot-forward')
 
 def backward(speed=100):
-	dataCMD = json.dumps({'var':"move", 'val':5})
-	ser.write(dataCMD.encode())
+	ser.write(_CMD['backward'])
 	print('robot-backward')
 
 def left(speed=100):
-	dataCMD = json.dumps({'var':"move", 'val':2})
-	ser.write(dataCMD.encode())
+	ser.write(_CMD['left'])
 	print('robot-left')
 
 def right(speed=100):
-	dataCMD = json.dumps({'var':"move", 'val':4})
-	ser.write(dataCMD.encode())
+	ser.write(_CMD['right'])
 	print('robot-right')
 
 def stopLR():
-	dataCMD = json.dumps({'var':"move", 'val':6})
-	ser.write(dataCMD.encode())
+	ser.write(_CMD['stopLR'])
 	print('robot-stop')
 
 def stopFB():
-	dataCMD = json.dumps({'var':"move", 'val':3})
-	ser.write(dataCMD.encode())
+	ser.write(_CMD['stopFB'])
 	print('robot-stop')
 
 
 
 def lookUp():
-	dataCMD = json.dumps({'var':"ges", 'val':1})
-	ser.write(dataCMD.encode())
+	ser.write(_CMD['lookUp'])
 	print('robot-lookUp')
 
 def lookDown():
-	dataCMD = json.dumps({'var':"ges", 'val':2})
-	ser.write(dataCMD.encode())
+	ser.write(_CMD['lookDown'])
 	print('robot-lookDown')
 
 def lookStopUD():
-	dataCMD = json.dumps({'var':"ges", 'val':3})
-	ser.write(dataCMD.encode())
+	ser.write(_CMD['lookStopUD'])
 	print('robot-lookStopUD')
 
 def lookLeft():
-	dataCMD = json.dumps({'var':"ges", 'val':4})
-	ser.write(dataCMD.encode())
+	ser.write(_CMD['lookLeft'])
 	print('robot-lookLeft')
 
 def lookRight():
-	dataCMD = json.dumps({'var':"ges", 'val':5})
-	ser.write(dataCMD.encode())
+	ser.write(_CMD['lookRight'])
 	print('robot-lookRight')
 
 def lookStopLR():
-	dataCMD = json.dumps({'var':"ges", 'val':6})
-	ser.write(dataCMD.encode())
+	ser.write(_CMD['lookStopLR'])
 	print('robot-lookStopLR')
 
 
 
 def steadyMode():
-	dataCMD = json.dumps({'var':"funcMode", 'val':1})
-	ser.write(dataCMD.encode())
+	ser.write(_CMD['steadyMode'])
 	print('robot-steady')
 
 def jump():
-	dataCMD = json.dumps({'var':"funcMode", 'val':4})
-	ser.write(dataCMD.encode())
+	ser.write(_CMD['jump'])
 	print('robot-jump')
 
 def handShake():
-	dataCMD = json.dumps({'var':"funcMode", 'val':3})
-	ser.write(dataCMD.encode())
+	ser.write(_CMD['handShake'])
 	print('robot-handshake')
 
+colorNums = {'off': 0, 'blue': 1, 'red': 2, 'green': 3, 'yellow': 4, 'cyan': 5, 'magenta': 6, 'cyber': 7}
+_LIGHT_FRAMES = {name: json.dumps({'var':"light", 'val':num}).encode() for name, num in colorNums.items()}
+
 def lightCtrl(colorName, cmdInput):
-	colorNum = 0
-	if colorName == 'off':
-		colorNum = 0
-	elif colorName == 'blue':
-		colorNum = 1
-	elif colorName == 'red':
-		colorNum = 2
-	elif colorName == 'green':
-		colorNum = 3
-	elif colorName == 'yellow':
-		colorNum = 4
-	elif colorName == 'cyan':
-		colorNum = 5
-	elif colorName == 'magenta':
-		colorNum = 6
-	elif colorName == 'cyber':
-		colorNum = 7
-	dataCMD = json.dumps({'var':"light", 'val':colorNum})
-	ser.write(dataCMD.encode())
+	ser.write(_LIGHT_FRAMES.get(colorName, _LIGHT_FRAMES['off']))
 
 
 def buzzerCtrl(buzzerCtrl, cmdInput):
@@ -191,6 +191,3 @@ if __name__ == '__main__':
     handShake()
 
     sys.exit()
-    while 1:
-        time.sleep(1)
-        pass
@@ -1,34 +1,132 @@
+import asyncio
+import hashlib
+import importlib.util
+import json
 import os
 import queue
+import re
 import threading
 import time
+import httpx
 import numpy as np
 import pyaudio
 import pyttsx3
-from openai import OpenAI
+from openai import AsyncOpenAI
 from vosk import Model, KaldiRecognizer
 from dotenv import load_dotenv
+from collections import OrderedDict, deque
 from functools import partial
 
+# Prefer orjson for parsing Vosk's JSON results, falling back to the standard library
+try:
+    import orjson
+
+    _loads = orjson.loads
+except ImportError:
+    _loads = json.loads
+
 # Global Configuration
 WAKE_WORD = "hello robot"  # wake word (in lower-case for matching)
 SAMPLE_RATE = 16000          # <-- use 48 kHz
-CHUNK = 4096
+CHUNK = 8000                 # 0.5 s frames: half the AcceptWaveform calls and result parses of 4096
 MODEL_PATH = "./vosk-model-small-en-us-0.15"  # path to Vosk model directory
-
+COMMAND_MODEL_PATH = "./vosk-model-en-us-0.22"  # larger model for command transcription, used if present
+WAKE_GRAMMAR = json.dumps([WAKE_WORD, "[unk]"])  # vocabulary of the wake-word recognizer
+PROMPT_PATHS = ["dog_response.md", "dog_actions.md"]
+# Words that can make a command physical; commands without any only get the spoken-reply prompt
+ACTION_KEYWORDS = frozenset("""
+    move go walk run come forward forwards back backward backwards turn rotate spin left right
+    stop halt stay sit stand low lie down up shake hand paw jump roll look fetch follow step dance
+""".split())
+AUDIO_QUEUE_MAXSIZE = 10    # ~5 s of CHUNK-sized frames; older audio is dropped when full
+RESPONSE_CACHE = True       # reuse replies to exactly repeated requests (same history too)
+RESPONSE_CACHE_SIZE = 512   # entries kept; least recently used are evicted
+SEMANTIC_CACHE = True       # reuse replies to near-identical earlier commands
+EMBEDDING_MODEL = "text-embedding-3-small"
+SEMANTIC_CACHE_THRESHOLD = 0.95  # cosine similarity needed for a hit; strict so "turn left" never answers "turn right"
+SEMANTIC_CACHE_SIZE = 256   # entries kept per prompt
+# Prompts whose reply depends on the command alone; dog_response.md replies also depend on the
+# conversation history, so a similar command there can need a different answer
+SEMANTIC_CACHE_PROMPTS = frozenset(["dog_actions.md"])
+SILENCE_TIMEOUT = 0.8       # seconds without new words that end a command
+HISTORY_SUMMARY_MODEL = "gpt-4o-mini"  # folds evicted history into a running summary; None disables it
+HISTORY_SUMMARY_MAX_TOKENS = 200
+
+
+OPENAI_MAX_RETRIES = 2     # SDK retries with exponential backoff on 429/5xx/connection errors
+
+_openai_client = None
 
 def init_openai_client():
-    load_dotenv("./.env")
-    api_key = os.getenv("OPENAI_API_KEY")
-    return OpenAI(api_key=api_key)
+    """
+    Return the process-wide AsyncOpenAI client, creating it on first use.
+
+    The prompts of process_command_threaded run concurrently on this one client, so they share its
+    httpx connection pool (HTTP/2 when the h2 package is installed) instead of each paying a TCP
+    and TLS handshake. Async connections belong to the event loop that opened them, so only use
+    the client from the one loop main() runs every turn on.
+    """
+    global _openai_client
+    if _openai_client is None:
+        load_dotenv("./.env")
+        api_key = os.getenv("OPENAI_API_KEY")
+        http_client = httpx.AsyncClient(
+            http2=importlib.util.find_spec("h2") is not None,
+            timeout=30.0,
+            limits=httpx.Limits(max_keepalive_connections=8, max_connections=16),
+        )
+        _openai_client = AsyncOpenAI(api_key=api_key, http_client=http_client, max_retries=OPENAI_MAX_RETRIES)
+    return _openai_client
+
+
+_model = None
+
+def get_model():
+    """Load the Vosk model on first use and share it between all recognizers."""
+    global _model
+    if _model is None:
+        _model = Model(MODEL_PATH)
+    return _model
 
 
 def init_vosk_recognizer():
-    model = Model(MODEL_PATH)
-    recognizer = KaldiRecognizer(model, SAMPLE_RATE)
+    recognizer = KaldiRecognizer(get_model(), SAMPLE_RATE)
     return recognizer
 
 
+_command_recognizer = None  # recognizer on the COMMAND_MODEL_PATH model, once loaded
+
+def load_command_model_async():
+    """
+    Load the large command model in a background thread, if it is installed.
+
+    Loading it takes tens of seconds and gigabytes of RAM, so startup does not wait for it; until
+    it is ready, commands are transcribed with the small model.
+    """
+    if not os.path.isdir(COMMAND_MODEL_PATH):
+        return
+
+    def load():
+        global _command_recognizer
+        try:
+            _command_recognizer = KaldiRecognizer(Model(COMMAND_MODEL_PATH), SAMPLE_RATE)
+            print(f"Command model loaded from {COMMAND_MODEL_PATH}")
+        except Exception as e:
+            print(f"Could not load command model {COMMAND_MODEL_PATH}: {e}")
+
+    threading.Thread(target=load, daemon=True).start()
+
+
+def init_wake_recognizer():
+    """
+    Initialize a recognizer restricted to the wake word.
+
+    Decoding against a two-entry grammar (the wake word and "[unk]" for everything else) is far
+    cheaper than open-vocabulary decoding, and wake-word listening runs most of the time.
+    """
+    return KaldiRecognizer(get_model(), SAMPLE_RATE, WAKE_GRAMMAR)
+
+
 def init_tts_engine():
     engine = pyttsx3.init()
     engine.setProperty('rate', 180)  # adjust speech rate if desired
@@ -36,6 +134,59 @@ def init_tts_engine():
     return engine
 
 
+class SpeechWorker:
+    """
+    Speak text on a dedicated thread so callers are not blocked while the robot talks.
+
+    say() only queues the text and runAndWait() blocks until everything queued so far has been
+    spoken, like the pyttsx3 engine itself, which is only ever used from the worker thread. While
+    speaking, audio_queue (if given) is muted so the recognizer does not hear the robot.
+    """
+
+    def __init__(self, engine, audio_queue=None):
+        self.engine = engine
+        self.audio_queue = audio_queue
+        self.queue = queue.Queue()
+        self.thread = threading.Thread(target=self._run, daemon=True)
+        self.thread.start()
+
+    def _run(self):
+        while True:
+            text = self.queue.get()
+            try:
+                if text is None:
+                    return
+                if self.audio_queue:
+                    self.audio_queue.muted = True
+                self.engine.say(text)
+                self.engine.runAndWait()
+            except Exception as e:
+                print(f"Error speaking text: {e}")
+            finally:
+                if self.audio_queue and self.queue.empty():
+                    # Drop anything captured around the end of the speech as well
+                    self.audio_queue.clear()
+                    self.audio_queue.muted = False
+                self.queue.task_done()
+
+    def say(self, text):
+        """Queue text to be spoken"""
+        if text:
+            if self.audio_queue:
+                self.audio_queue.muted = True  # from now on, not only once the worker picks it up
+            self.queue.put(text)
+
+    def runAndWait(self):
+        """Block until all queued text has been spoken"""
+        self.queue.join()
+
+    def stop(self, timeout=5.0):
+        """Finish the queued speech and stop the worker thread"""
+        self.queue.put(None)
+        self.thread.join(timeout)
+        self.engine.stop()
+
+
 def init_audio_stream():
     p = pyaudio.PyAudio()
     
@@ -68,8 +219,7 @@ def init_audio_stream():
                         frames_per_buffer=CHUNK,
                         input_device_index=device_index)
         
-        recognizer = KaldiRecognizer(Model(MODEL_PATH), SAMPLE_RATE)
-        return p, stream, device_index, channels, multi_channel, recognizer
+        return p, stream, device_index, channels, multi_channel, init_vosk_recognizer(), init_wake_recognizer()
     except OSError as e:
         print(f"Error opening audio stream: {e}")
         print("Trying default audio device...")
@@ -83,146 +233,425 @@ def init_audio_stream():
                             input=True,
                             frames_per_buffer=CHUNK,
                             input_device_index=device_index)
-            recognizer = KaldiRecognizer(Model(MODEL_PATH), SAMPLE_RATE)
-            return p, stream, device_index, channels, multi_channel, recognizer
+            return p, stream, device_index, channels, multi_channel, init_vosk_recognizer(), init_wake_recognizer()
         except OSError as e:
             print(f"Failed to open audio stream with default device: {e}")
             raise
 
-def audio_callback(in_data, frame_count, time_info, status, multi_channel, channels, stop_event, audio_queue):
-    """Callback function for continuous audio capture."""
-    if multi_channel:
-        # Downmix to single channel (use first channel)
-        audio_data = np.frombuffer(in_data, dtype=np.int16)
-        mono_data = audio_data[0::channels]
-        in_data = mono_data.tobytes()
-    if stop_event.is_set():
-        return (None, pyaudio.paContinue)
-    audio_queue.put(in_data)
+class AudioBuffer:
+    """
+    Single-producer/single-consumer buffer of audio frames from the PortAudio callback to the recognizer.
+
+    Backed by a bounded deque, whose append() and popleft() are atomic without taking a lock, so
+    the callback never contends with the consumer; once full, the oldest frame is dropped to keep
+    the most recent audio. An Event wakes a consumer waiting on an empty buffer.
+    """
+
+    def __init__(self, maxlen=AUDIO_QUEUE_MAXSIZE):
+        self.frames = deque(maxlen=maxlen)
+        self.data_ready = threading.Event()
+        self.muted = False  # set by SpeechWorker while the robot talks, so it does not hear itself
+
+    def push(self, frame):
+        """Append a frame (producer side); frames are dropped while muted"""
+        if self.muted:
+            return
+        self.frames.append(frame)
+        self.data_ready.set()
+
+    def pop(self, timeout=None):
+        """Remove and return the oldest frame, or None if nothing arrived within timeout seconds"""
+        deadline = None if timeout is None else time.monotonic() + timeout
+        while True:
+            try:
+                return self.frames.popleft()
+            except IndexError:
+                pass
+            self.data_ready.clear()
+            if self.frames:
+                # A frame was pushed between popleft() and clear()
+                continue
+            remaining = None if deadline is None else deadline - time.monotonic()
+            if remaining is not None and remaining <= 0:
+                return None
+            if not self.data_ready.wait(remaining):
+                return None
+
+    def clear(self):
+        """Discard all buffered frames"""
+        self.frames.clear()
+
+
+# Scratch buffer for the downmixed channel, reused for every chunk by the (single) consumer
+_mono_buf = np.empty(CHUNK, dtype=np.int16)
+
+def downmix(data, channels):
+    """Return the first channel of interleaved int16 audio as bytes (mono audio is returned as-is)."""
+    if channels == 1:
+        return data
+    # One strided copy into the scratch buffer, then one copy out to the returned bytes
+    frames = np.frombuffer(data, dtype=np.int16).reshape(-1, channels)
+    mono = _mono_buf[:len(frames)]
+    np.copyto(mono, frames[:, 0])
+    return mono.tobytes()
+
+
+def audio_callback(in_data, frame_count, time_info, status, stop_event, audio_queue):
+    """
+    Callback function for continuous audio capture.
+
+    Runs on PortAudio's audio thread, so it only queues the raw frames; downmixing is left to
+    the consumer (see downmix()).
+    """
+    if not stop_event.is_set():
+        audio_queue.push(in_data)
     return (None, pyaudio.paContinue)
 
 
-def wait_for_wake_word(recognizer, audio_queue):
-    """Listen until the wake word is detected."""
+def wait_for_wake_word(recognizer, audio_queue, channels=1):
+    """Listen until the wake word is detected, using the grammar-restricted wake recognizer."""
     print("Listening for wake word...")
-    text = ""
+    # Vosk's English models emit lower-case text, so no per-chunk lower() is needed.
+    # Only the end of the previous final result is kept, to catch a wake word split across two
+    # results without building up a transcript.
+    tail = ""
     while True:
-        data = audio_queue.get()  # Blocking call
-        if recognizer.AcceptWaveform(data):
+        data = audio_queue.pop()  # Blocking call
+        if recognizer.AcceptWaveform(downmix(data, channels)):
             result = recognizer.Result()  # JSON string
-            result_text = eval(result).get("text", "")
-            text += (" " + result_text).strip()
-            if WAKE_WORD in text.lower():
+            result_text = _loads(result).get("text", "")
+            window = f"{tail} {result_text}" if tail else result_text
+            if WAKE_WORD in window:
                 break
-            text = ""
+            tail = window[-len(WAKE_WORD):]
         else:
             partial_result = recognizer.PartialResult()
-            partial_text = eval(partial_result).get("partial", "").lower()
+            partial_text = _loads(partial_result).get("partial", "")
             if WAKE_WORD in partial_text:
                 # Low latency wake-up
-                text = WAKE_WORD
                 recognizer.Reset()
                 break
     return True
 
 
-def listen_for_command(recognizer, audio_queue, tts_engine):
+def listen_for_command(recognizer, audio_queue, tts_engine, channels=1):
     """After wake word detection, capture the spoken command."""
+    # Queued, not waited for: the prompt is muted out of the audio while it plays and listening
+    # starts the moment it ends
     tts_engine.say("Waiting for command")
-    tts_engine.runAndWait()
     recognizer.Reset()  # Start fresh for command capture
     command_text = ""
-    silence_duration = 0
     max_command_time = 10.0  # seconds
-    start_time = time.time()
+    poll_interval = 0.5  # seconds to wait for a frame
+    deadline = time.monotonic() + max_command_time
+    # Frames arrive continuously whether or not anyone speaks, so silence is measured from the
+    # last new recognized word rather than from the last frame; None until the first word
+    last_speech_time = None
+    last_partial = ""
 
-    while time.time() - start_time < max_command_time:
-        try:
-            data = audio_queue.get(timeout=0.5)
-        except queue.Empty:
-            silence_duration += 0.5
-            if silence_duration >= 1.0:  # 1 second of silence
-                break
-            continue
+    while True:
+        now = time.monotonic()
+        if now >= deadline:
+            break
+        if last_speech_time is not None and now - last_speech_time >= SILENCE_TIMEOUT:
+            # Words stopped before Kaldi's own endpoint fired: take what it has so far
+            command_text = _loads(recognizer.FinalResult()).get("text", "")
+            break
 
-        silence_duration = 0  # reset silence timer
+        data = audio_queue.pop(timeout=poll_interval)
+        if data is None:
+            if audio_queue.muted:
+                # Still speaking: neither silence nor the time limit count yet
+                deadline = time.monotonic() + max_command_time
+            continue
 
-        if recognizer.AcceptWaveform(data):
+        if recognizer.AcceptWaveform(downmix(data, channels)):
             result = recognizer.Result()
-            result_text = eval(result).get("text", "")
+            result_text = _loads(result).get("text", "")
             command_text += (" " + result_text).strip()
             # Assuming one final result is enough
             break
         else:
-            # Optionally process partial results if needed
-            _ = eval(recognizer.PartialResult()).get("partial", "")
+            partial_text = _loads(recognizer.PartialResult()).get("partial", "")
+            if partial_text and partial_text != last_partial:
+                last_speech_time = time.monotonic()
+                last_partial = partial_text
     return command_text.strip()
 
-conversation_history = []
+class SemanticCache:
+    """Replies to earlier commands per prompt path, looked up by embedding similarity."""
+
+    def __init__(self, threshold=SEMANTIC_CACHE_THRESHOLD, max_entries=SEMANTIC_CACHE_SIZE):
+        self.threshold = threshold
+        self.max_entries = max_entries
+        self.entries = {}  # prompt_path -> (unit embeddings, shape (n, d), list of n replies)
+
+    async def embed(self, openai_client, text):
+        response = await openai_client.embeddings.create(model=EMBEDDING_MODEL, input=text)
+        vector = np.asarray(response.data[0].embedding, dtype=np.float32)
+        return vector / np.linalg.norm(vector)
+
+    def lookup(self, prompt_path, embedding):
+        vectors, replies = self.entries.get(prompt_path, (None, None))
+        if not replies:
+            return None
+        scores = vectors @ embedding
+        best = int(np.argmax(scores))
+        return replies[best] if scores[best] >= self.threshold else None
+
+    def add(self, prompt_path, embedding, reply):
+        vectors, replies = self.entries.get(prompt_path, (np.empty((0, embedding.size), np.float32), []))
+        vectors = np.vstack((vectors, embedding))[-self.max_entries:]
+        replies = (replies + [reply])[-self.max_entries:]
+        self.entries[prompt_path] = (vectors, replies)
+
+semantic_cache = SemanticCache()
+
+# Exact-match tier in front of the semantic cache: response_cache_key(...) -> reply
+response_cache = OrderedDict()
+
 
-def process_command(command_text, openai_client, prompt_path="dog_response.md", memory_limit=10):
+def response_cache_key(model, messages):
+    """
+    Hash a request into an exact-match cache key.
+
+    The whole message list is hashed, so a conversational reply is only reused when the history
+    it answered is the same too. User messages are lower-cased and stripped for the key only.
+    """
+    normalized = [
+        {"role": "user", "content": message["content"].lower().strip()}
+        if message["role"] == "user" else message
+        for message in messages
+    ]
+    payload = json.dumps({"m": model, "msgs": normalized}, sort_keys=True, separators=(',', ':'))
+    return hashlib.sha256(payload.encode()).digest()
+
+
+# Whitespace that follows sentence-ending punctuation
+_SENTENCE_BREAK = re.compile(r'(?<=[.!?])\s+')
+
+async def stream_reply(openai_client, on_sentence, **kwargs):
+    """Run a streaming chat completion, awaiting on_sentence with each finished sentence; returns the full reply."""
+    parts = []
+    pending = ""
+    async for chunk in await openai_client.chat.completions.create(stream=True, **kwargs):
+        if not chunk.choices or not chunk.choices[0].delta.content:
+            continue
+        content = chunk.choices[0].delta.content
+        parts.append(content)
+        *sentences, pending = _SENTENCE_BREAK.split(pending + content)
+        for sentence in sentences:
+            await on_sentence(sentence)
+    if pending.strip():
+        await on_sentence(pending)
+    return "".join(parts)
+
+
+async def request_reply(openai_client, model, messages, on_sentence=None):
+    """Get the reply to messages from the OpenAI API, streamed if on_sentence is given."""
+    if on_sentence:
+        return await stream_reply(openai_client, on_sentence, model=model, messages=messages)
+    response = await openai_client.chat.completions.create(
+        model=model,
+        messages=messages,
+    )
+    return response.choices[0].message.content
+
+
+async def lookup_similar_reply(openai_client, prompt_path, command_text):
+    """Return (embedding, cached reply or None); embedding is None if the embedding request failed."""
+    try:
+        embedding = await semantic_cache.embed(openai_client, command_text)
+    except Exception as e:
+        print(f"Semantic cache unavailable: {e}")
+        return None, None
+    return embedding, semantic_cache.lookup(prompt_path, embedding)
+
+
+async def complete_with_cache(openai_client, prompt_path, command_text, messages, model="gpt-4o", on_sentence=None):
+    """
+    Return the reply to messages, trying an exact match of the request, then (for the prompts in
+    SEMANTIC_CACHE_PROMPTS) a near-identical earlier command, before calling the OpenAI API.
+
+    The completion is started alongside the semantic lookup's embedding request, so a miss costs
+    no extra round-trip; a hit cancels it.
+
+    If on_sentence (a coroutine function) is given it is awaited with each sentence of the reply:
+    API replies are streamed so the first sentence arrives before the reply is complete, cached
+    ones are passed whole. Streamed replies skip the semantic tier, since they are spoken as they
+    arrive.
+    """
+    key = response_cache_key(model, messages)
+    if RESPONSE_CACHE:
+        reply = response_cache.get(key)
+        if reply is not None:
+            response_cache.move_to_end(key)
+            if on_sentence:
+                await on_sentence(reply)
+            return reply
+
+    if SEMANTIC_CACHE and prompt_path in SEMANTIC_CACHE_PROMPTS and not on_sentence:
+        completion = asyncio.create_task(request_reply(openai_client, model, messages))
+        embedding, reply = await lookup_similar_reply(openai_client, prompt_path, command_text)
+        if reply is not None:
+            completion.cancel()
+        else:
+            reply = await completion
+            if embedding is not None:
+                semantic_cache.add(prompt_path, embedding, reply)
+    else:
+        reply = await request_reply(openai_client, model, messages, on_sentence)
+
+    if RESPONSE_CACHE:
+        response_cache[key] = reply
+        if len(response_cache) > RESPONSE_CACHE_SIZE:
+            response_cache.popitem(last=False)
+    return reply
+
+
+_system_prompts = {}  # prompt_path -> (mtime, contents)
+
+def get_system_prompt(prompt_path):
+    """Return the contents of a prompt file, re-reading it only after it has been edited."""
+    mtime = os.stat(prompt_path).st_mtime
+    cached = _system_prompts.get(prompt_path)
+    if cached is None or cached[0] != mtime:
+        with open(prompt_path, "r", encoding="utf-8") as f:
+            cached = _system_prompts[prompt_path] = (mtime, f.read())
+    return cached[1]
+
+
+# Conversation memory: the system message, set on the first command, and a rolling window of
+# the latest user/assistant messages that evicts the oldest entry on append. Only touched from
+# the event loop thread, so it needs no lock.
+conversation_system = None
+conversation_history = deque()
+conversation_summary = None  # running summary of the messages evicted from conversation_history
+summary_task = None  # pending fold_history() task, if any
+
+
+async def summarize_history(openai_client, previous_summary, messages):
+    """Fold evicted history messages (oldest first) into the running summary and return it."""
+    lines = [f"Summary so far: {previous_summary}"] if previous_summary else []
+    lines += [f"{message['role']}: {message['content']}" for message in messages if message.get("content")]
+    response = await openai_client.chat.completions.create(
+        model=HISTORY_SUMMARY_MODEL,
+        messages=[
+            {"role": "system", "content": "Summarize this conversation between a user and a robot dog in a few "
+                                          "sentences. Keep names, preferences and anything the user asked the "
+                                          "robot to remember; drop small talk."},
+            {"role": "user", "content": "\n".join(lines)},
+        ],
+        max_tokens=HISTORY_SUMMARY_MAX_TOKENS,
+    )
+    return response.choices[0].message.content
+
+
+async def fold_history(openai_client, evicted, previous_task):
+    """Fold evicted messages into conversation_summary once any earlier fold has finished."""
+    global conversation_summary
+    if previous_task is not None:
+        await previous_task  # folds never raise, so order is kept without error handling here
+    try:
+        conversation_summary = await summarize_history(openai_client, conversation_summary, evicted)
+    except Exception as e:
+        print(f"Could not summarize evicted history: {e}")
+
+
+def append_history(message, evicted):
+    """Append message to conversation_history, collecting the message the full deque drops."""
+    if len(conversation_history) == conversation_history.maxlen:
+        evicted.append(conversation_history[0])
+    conversation_history.append(message)
+
+
+async def process_command(command_text, openai_client, prompt_path="dog_response.md", memory_limit=10, tts_engine=None):
     """Send the command to the OpenAI API and retrieve the response using conversation history.
 
     Parameters:
         command_text (str): The user's command text.
-        openai_client: An initialized OpenAI client.
+        openai_client: The AsyncOpenAI client from init_openai_client().
         prompt_path (str): File path to the system prompt.
-        memory_limit (int): Maximum number of messages to retain (including system prompt).
+        memory_limit (int): Maximum number of messages to retain (including system prompt); older
+            ones are folded into a running summary when HISTORY_SUMMARY_MODEL is set.
+        tts_engine: If given (a SpeechWorker), the reply is streamed and each sentence is queued
+            to be spoken as soon as it has been generated.
 
     Returns:
-        tuple: (assistant_reply, updated conversation_history)
+        tuple: (prompt_path, assistant_reply)
     """
+    global conversation_system, conversation_history, summary_task
+
     try:
-        # Initialize conversation history with system prompt if empty.
-        if not conversation_history:
-            with open(prompt_path, "r", encoding="utf-8") as f:
-                system_prompt = f.read()
-            conversation_history.append({"role": "system", "content": system_prompt})
+        # Initialize the system prompt on the first command.
+        if conversation_system is None:
+            conversation_system = {"role": "system", "content": get_system_prompt(prompt_path)}
+
+        # Keep the system prompt plus the last (memory_limit - 1) messages; older ones are
+        # folded into conversation_summary.
+        evicted = []
+        if conversation_history.maxlen != memory_limit - 1:
+            excess = len(conversation_history) - (memory_limit - 1)
+            evicted.extend(list(conversation_history)[:max(excess, 0)])
+            conversation_history = deque(conversation_history, maxlen=memory_limit - 1)
 
         # Append the new user message.
-        conversation_history.append({"role": "user", "content": command_text})
+        append_history({"role": "user", "content": command_text}, evicted)
+
+        on_sentence = None
+        if tts_engine:
+            async def on_sentence(sentence):
+                tts_engine.say(sentence)
 
         # Call the OpenAI API using the full conversation history.
-        response = openai_client.chat.completions.create(
-            model="gpt-4o",  # or "gpt-4" if available
-            messages=conversation_history,
-        )
-        assistant_reply = response.choices[0].message.content
+        messages = [conversation_system, *conversation_history]
+        if conversation_summary:
+            messages.insert(1, {"role": "system", "content": f"Earlier in this conversation: {conversation_summary}"})
+        assistant_reply = await complete_with_cache(openai_client, prompt_path, command_text, messages,
+                                                    on_sentence=on_sentence)
 
         # Append the assistant's reply to the conversation history.
-        conversation_history.append({"role": "assistant", "content": assistant_reply})
+        append_history({"role": "assistant", "content": assistant_reply}, evicted)
 
-        # Limit conversation history to the last 'memory_limit' messages.
-        # Always keep the initial system prompt at index 0.
-        if len(conversation_history) > memory_limit:
-            # Preserve system prompt and the last (memory_limit - 1) messages.
-            conversation_history[:] = [conversation_history[0]] + conversation_history[-(memory_limit - 1):]
+        # Not awaited, so the turn ends and listening resumes at once. The task runs on the
+        # shared event loop during the next turn, whose request uses the summary as it was.
+        if evicted and HISTORY_SUMMARY_MODEL:
+            summary_task = asyncio.create_task(fold_history(openai_client, evicted, summary_task))
 
         return prompt_path, assistant_reply
     except Exception as e:
         print(f"Error processing command: {e}")
-        return "I'm sorry, I couldn't process that request."
+        apology = "I'm sorry, I couldn't process that request."
+        if tts_engine:
+            tts_engine.say(apology)
+        return prompt_path, apology
 
 
-import threading
-from concurrent.futures import ThreadPoolExecutor
-def process_command_threaded(command_text, openai_client, prompt_paths, memory_limit=10):
-    def process_single_prompt(prompt_path):
+def needs_action_prompt(command_text):
+    """Whether a command might ask for a movement; only clearly conversational ones skip dog_actions.md."""
+    return not ACTION_KEYWORDS.isdisjoint(re.findall(r"[a-z]+", command_text.lower()))
+
+
+async def process_command_threaded(command_text, openai_client, prompt_paths, memory_limit=10, tts_engine=None):
+    """
+    Process a command with several prompts concurrently on one event loop.
+
+    Returns:
+        list: (prompt_path, reply) tuples in prompt_paths order; the whole call takes as long as
+        the slowest prompt.
+    """
+    async def process_single_prompt(prompt_path):
         if prompt_path == "dog_response.md":
-            return process_command(command_text, openai_client, prompt_path, memory_limit)
+            # Spoken sentence by sentence while it streams, if tts_engine is given
+            return await process_command(command_text, openai_client, prompt_path, memory_limit, tts_engine)
 
         local_conversation_history = []
         try:
-            with open(prompt_path, "r", encoding="utf-8") as f:
-                system_prompt = f.read()
-            local_conversation_history.append({"role": "system", "content": system_prompt})
+            local_conversation_history.append({"role": "system", "content": get_system_prompt(prompt_path)})
             local_conversation_history.append({"role": "user", "content": command_text})
 
-            response = openai_client.chat.completions.create(
-                model="gpt-4o",
-                messages=local_conversation_history,
-            )
-            assistant_reply = response.choices[0].message.content
+            assistant_reply = await complete_with_cache(openai_client, prompt_path, command_text,
+                                                        local_conversation_history)
 
             return prompt_path, assistant_reply
 
@@ -230,36 +659,36 @@ def process_command_threaded(command_text, openai_client, prompt_paths, memory_l
             print(f"Error with prompt {prompt_path}: {e}")
             return prompt_path, "Error occurred"
 
-    # Run each prompt processing in parallel
-    with ThreadPoolExecutor(max_workers=min(3, len(prompt_paths))) as executor:
-        results = list(executor.map(process_single_prompt, prompt_paths))
-
-    return results
+    return list(await asyncio.gather(*(process_single_prompt(path) for path in prompt_paths)))
 
 
 
 def flush_audio_queue(audio_queue):
     """Flush any lingering audio in the queue."""
-    while not audio_queue.empty():
-        try:
-            audio_queue.get_nowait()
-        except queue.Empty:
-            break
+    audio_queue.clear()
 
 
 def main():
     # Initialize components
     openai_client = init_openai_client()
+    for prompt_path in PROMPT_PATHS:
+        try:
+            get_system_prompt(prompt_path)  # read at startup so the first command does not wait on disk
+        except OSError as e:
+            print(f"Could not preload prompt {prompt_path}: {e}")
     tts_engine = init_tts_engine()
+    load_command_model_async()
     
     try:
-        p, stream, device_index, channels, multi_channel, recognizer = init_audio_stream()
+        p, stream, device_index, channels, multi_channel, recognizer, wake_recognizer = init_audio_stream()
     except Exception as e:
         print(f"Fatal error initializing audio: {e}")
         return
 
     # Prepare audio queue and control event
-    audio_queue = queue.Queue()
+    audio_queue = AudioBuffer(AUDIO_QUEUE_MAXSIZE)
+    # All speech goes through a worker thread, so the main loop never blocks on runAndWait()
+    tts_engine = SpeechWorker(tts_engine, audio_queue)
     stop_event = threading.Event()  # Using a queue.Event() instead of threading.Event() for clarity
 
     # Stop the initial blocking stream to re-open in callback mode
@@ -268,8 +697,6 @@ def main():
 
     # Create the callback using partial to include extra parameters
     callback = partial(audio_callback,
-                       multi_channel=multi_channel,
-                       channels=channels,
                        stop_event=stop_event,
                        audio_queue=audio_queue)
 
@@ -281,34 +708,36 @@ def main():
                     input_device_index=device_index,
                     stream_callback=callback)
 
+    # One event loop for every turn, so the client's pooled connections stay usable
+    loop = asyncio.new_event_loop()
+
     print("Voice assistant is now listening for the wake phrase...")
 
     try:
         while True:
             # 1. Wait for the wake word.
-            wait_for_wake_word(recognizer, audio_queue)
+            # Full open-vocabulary decoding starts only once the wake word has been heard
+            wait_for_wake_word(wake_recognizer, audio_queue, channels)
             print("Wake word detected. Awaiting command...")
 
             # 2. Listen for and transcribe the command.
-            command_text = listen_for_command(recognizer, audio_queue, tts_engine)
+            command_text = listen_for_command(_command_recognizer or recognizer, audio_queue, tts_engine, channels)
             if not command_text:
                 print("No command heard within the time limit. Returning to wake word listening.")
                 continue
             print(f"Transcribed command: '{command_text}'")
 
             # 3. Process the command via OpenAI.
-            assistant_reply = process_command_threaded(command_text, openai_client, ["dog_response.md", "dog_actions.md"])
+            # The dog_response.md reply is spoken while it streams in; the actions prompt is only
+            # asked when the command might be a movement
+            prompt_paths = PROMPT_PATHS if needs_action_prompt(command_text) else PROMPT_PATHS[:1]
+            assistant_reply = loop.run_until_complete(
+                process_command_threaded(command_text, openai_client, prompt_paths, tts_engine=tts_engine))
             print(f"Assistant response: {assistant_reply}")
 
-            for prompt_path, reply in assistant_reply:
-                if prompt_path != "dog_response.md":
-                    continue
-                tts_engine.say(reply)
-                tts_engine.runAndWait()
-
             print("Listening for the wake phrase again...")
             flush_audio_queue(audio_queue)
-            recognizer.Reset()
+            wake_recognizer.Reset()
     except KeyboardInterrupt:
         print("Exiting voice assistant.")
     finally:
@@ -316,6 +745,8 @@ def main():
         stream.close()
         p.terminate()
         tts_engine.stop()
+        loop.run_until_complete(openai_client.close())
+        loop.close()
 
 
 if __name__ == '__main__':